@@ -2,7 +2,7 @@
 Configuration settings for the application
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -11,21 +11,121 @@ class Settings(BaseSettings):
     # MongoDB Configuration
     MONGODB_URI: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "pothole_detection"
+    MONGODB_MAX_POOL_SIZE: int = 100  # Connections per server per worker
+    MONGODB_MIN_POOL_SIZE: int = 0  # Connections kept open while idle
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None  # Close pooled connections idle this long
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None  # Fail a checkout after waiting this long
+    
+    # Read Routing for list endpoints (reports, zones, repairs)
+    LIST_READ_PREFERENCE: str = "primary"  # primary, primaryPreferred, secondary, secondaryPreferred or nearest
+    LIST_READ_CONCERN: str = "local"  # local, majority or available
+    LIST_READ_MAX_STALENESS_SECONDS: int = -1  # Skip secondaries lagging more than this (min 90, -1 = off)
+    READ_PREFERENCE_OVERRIDES: Dict[str, str] = {}  # Per-route mode, e.g. {"zones": "nearest"}
+    MONGODB_COMMAND_METRICS: bool = True  # Time every command by collection and name for /metrics
     
     # JWT Configuration
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_CACHE_MAX_ENTRIES: int = 10000  # Validated tokens cached per worker
+    JWT_CACHE_TTL_SECONDS: float = 300.0  # Longest a token is trusted without re-decoding (0 = off)
+    
+    # Password Hashing
+    BCRYPT_ROUNDS: int = 12  # Cost factor for new hashes; existing hashes keep their own
+    PASSWORD_HASH_WORKERS: int = 2  # Threads hashing in parallel per worker, 0 = all cores
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued or running hashes before logins get 503
     
     # File Upload Configuration
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE_MB: int = 10
     
+    # Report Admission Control
+    REPORT_MAX_CONCURRENT: int = 4  # Submissions decoding and verifying at once per worker
+    REPORT_MAX_QUEUED: int = 32  # Submissions waiting for a slot before new ones get 503
+    REPORT_QUEUE_TIMEOUT_SECONDS: float = 10.0  # Longest wait for a slot before 503
+    REPORT_PIXEL_BUDGET_MEGAPIXELS: float = 100.0  # Total image size decoded at once; larger images get 413
+    REPORT_RATE_PER_MINUTE: float = 10.0  # Sustained submissions per user per worker (0 = off)
+    REPORT_RATE_BURST: int = 5  # Submissions a user may make back to back
+    
     # API Configuration
     API_V1_PREFIX: str = "/api"
     CORS_ORIGINS: List[str] = ["*"]
     
+    # Risk Zone Clustering
+    CLUSTERING_WORKERS: int = 1  # Process pool size for recalculation, 0 = all cores
+    CLUSTERING_TILE_KM: float = 20.0  # Tile edge length for parallel clustering
+    
+    # Zone Pyramid (map zoom level -> aggregation radius in km)
+    ZONE_PYRAMID_LEVELS: Dict[int, float] = {4: 100.0, 7: 20.0, 10: 3.0}
+    ZONE_DETAIL_ZOOM: int = 13  # From this zoom on, individual zones are returned
+    
+    # Background Zone Recalculation
+    ZONE_RECALC_DEBOUNCE_SECONDS: float = 5.0  # Quiet period before a triggered run starts
+    ZONE_RECALC_MAX_DELAY_SECONDS: float = 30.0  # Upper bound on debounce under steady triggers
+    ZONE_RECALC_LEASE_SECONDS: int = 300  # Cross-worker lock expiry; renewed while a run is in progress
+    
+    # Zone Spatial Index
+    ZONE_INDEX_CELL_KM: float = 2.0  # Grid cell size of the in-memory zone index
+    ZONE_INDEX_REFRESH_SECONDS: float = 60.0  # Reload interval to pick up other workers' runs
+    ZONE_INDEX_DEFAULT_RADIUS_KM: float = 0.5  # Extent assumed for zones stored without radius_km
+    
+    # Response Caching
+    ZONE_CACHE_MAX_ENTRIES: int = 256  # Encoded zone listings kept per worker
+    COLLECTION_VERSION_TTL_SECONDS: float = 1.0  # How long a worker trusts its known data versions
+    COLLECTION_VERSION_CHANGE_STREAM: bool = False  # Push version changes between workers (replica set only)
+    
+    # Live Change Events (GET /api/events)
+    EVENT_STREAM_ENABLED: bool = True  # Publish report, zone and repair changes to event streams
+    EVENT_STREAM_POLL_SECONDS: float = 1.0  # How often a worker picks up events written by other workers
+    EVENT_STREAM_BUFFER: int = 256  # Events buffered per stream before a slow client is disconnected
+    EVENT_STREAM_MAX_SUBSCRIBERS: int = 1000  # Open streams per worker before new ones get 503
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive comment interval on idle streams
+    EVENT_STREAM_MAX_SECONDS: float = 300.0  # Streams end after this long; clients reconnect and resume
+    EVENT_STREAM_TICKET_SECONDS: int = 30  # Lifetime of a single-use ticket for opening a stream
+    
+    # Runtime Metrics
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: float = 0.5  # How often event-loop lag is sampled (0 = off)
+    METRICS_MULTIPROC_DIR: Optional[str] = None  # Shared by all workers so /metrics reports them combined
+    METRICS_SHARE_INTERVAL_SECONDS: float = 5.0  # How often each worker publishes its metrics there
+    
+    # On-Demand Profiling (X-Profile header, authorities only)
+    PROFILE_ENABLED: bool = True  # Let authorities profile a request with X-Profile: 1
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of all requests profiled at random (0 = header only)
+    PROFILE_INTERVAL_MS: float = 5.0  # Stack sampling interval
+    PROFILE_TRACEMALLOC: bool = True  # Also trace allocations (slows the whole worker while a profile runs)
+    PROFILE_TRACEMALLOC_FRAMES: int = 16  # Stack depth recorded per allocation
+    PROFILE_MAX_CONCURRENT: int = 2  # Requests profiled at once per worker; others run unprofiled
+    PROFILE_DIR: str = "profiles"  # Where profile artifacts are written
+    PROFILE_MAX_ARTIFACTS: int = 50  # Profiles kept on disk; the oldest are deleted
+    
+    # Response Compression
+    COMPRESSION_ENABLED: bool = True  # gzip / brotli for clients that send Accept-Encoding
+    COMPRESSION_MIN_BYTES: int = 1024  # Smaller bodies are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1 (fastest) to 9 (smallest)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 (fastest) to 11 (smallest); brotli is optional
+    
+    # Write-Behind Batching (history/audit inserts)
+    WRITE_BEHIND_ENABLED: bool = False  # Buffer history inserts and write them in batches
+    WRITE_BEHIND_FLUSH_MS: int = 50  # Longest a buffered document waits before being written
+    WRITE_BEHIND_MAX_BATCH: int = 500  # Documents per insert_many; a full batch flushes early
+    WRITE_BEHIND_MAX_QUEUE: int = 10000  # Beyond this many buffered documents, inserts go direct
+    
+    # Bulk Export
+    EXPORT_BATCH_SIZE: int = 1000  # Documents fetched, encoded and sent per chunk
+    
+    # Dashboard Counters
+    STATS_RECONCILE_INTERVAL_SECONDS: float = 3600.0  # Recount from collections to fix drift (0 = off)
+    
+    # Production Server (gunicorn.conf.py)
+    WEB_BIND: str = "0.0.0.0:8000"
+    WEB_WORKERS: int = 0  # Worker processes, 0 = one per CPU core
+    WEB_GRACEFUL_TIMEOUT_SECONDS: int = 60  # How long shutdown waits for in-flight requests
+    WEB_MAX_REQUESTS: int = 10000  # Recycle a worker after this many requests (0 = never)
+    WEB_MAX_REQUESTS_JITTER: int = 1000  # Random extra requests so workers do not recycle together
+    WEB_PRELOAD_APP: bool = True  # Import the app in the master before forking workers
+    WEB_PRELOAD_MODULES: List[str] = ["numpy", "cv2", "PIL.Image"]  # Imported before forking, shared by workers
+    
     # Environment
     ENVIRONMENT: str = "development"
     
@@ -2,8 +2,45 @@
 MongoDB database connection and management
 """
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from typing import Callable, Dict, Optional
 from app.config import settings
+from app.utils.mongo_metrics import CommandMetricsListener, PoolMetricsListener
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+
+def client_options() -> Dict:
+    """Connection pool options for AsyncIOMotorClient from settings"""
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "event_listeners": [PoolMetricsListener()]
+    }
+    if settings.MONGODB_COMMAND_METRICS:
+        options["event_listeners"].append(CommandMetricsListener())
+    if settings.MONGODB_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    return options
+
+
+def list_read_preference(route: str):
+    """Read preference for a list route: override, else LIST_READ_PREFERENCE"""
+    mode = settings.READ_PREFERENCE_OVERRIDES.get(route, settings.LIST_READ_PREFERENCE)
+    if mode not in READ_PREFERENCE_MODES:
+        raise ValueError(f"Unknown read preference for {route}: {mode}")
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCE_MODES[mode](max_staleness=settings.LIST_READ_MAX_STALENESS_SECONDS)
 
 
 class Database:
@@ -12,11 +49,15 @@ class Database:
     client: Optional[AsyncIOMotorClient] = None
     database: Optional[AsyncIOMotorDatabase] = None
     
+    def __init__(self):
+        self._read_views: Dict[str, AsyncIOMotorDatabase] = {}
+    
     async def connect_db(self):
         """Connect to MongoDB"""
         try:
-            self.client = AsyncIOMotorClient(settings.MONGODB_URI)
+            self.client = AsyncIOMotorClient(settings.MONGODB_URI, **client_options())
             self.database = self.client[settings.MONGODB_DB_NAME]
+            self._read_views = {}
             
             # Test connection
             await self.client.admin.command('ping')
@@ -29,6 +70,22 @@ class Database:
             print(f"❌ Error connecting to MongoDB: {e}")
             raise
     
+    def read_view(self, route: str) -> AsyncIOMotorDatabase:
+        """Database handle with the read preference and concern of a list route"""
+        read_preference = list_read_preference(route)
+        if read_preference == Primary() and settings.LIST_READ_CONCERN == "local":
+            # Client defaults; no separate handle needed
+            return self.database
+        
+        view = self._read_views.get(route)
+        if view is None or view.client is not self.database.client:
+            view = self.database.with_options(
+                read_preference=read_preference,
+                read_concern=ReadConcern(settings.LIST_READ_CONCERN)
+            )
+            self._read_views[route] = view
+        return view
+    
     async def close_db(self):
         """Close MongoDB connection"""
         if self.client:
@@ -42,19 +99,43 @@ class Database:
             await self.database.users.create_index("email", unique=True)
             
             # Pothole reports collection indexes
-            await self.database.pothole_reports.create_index("status")
-            await self.database.pothole_reports.create_index("user_id")
-            await self.database.pothole_reports.create_index([("location.latitude", 1), ("location.longitude", 1)])
+            # Keyset pagination: equality filters, then (report_date, _id)
+            for prefix in ([], ["status"], ["user_id"], ["user_id", "status"]):
+                await self.database.pothole_reports.create_index(
+                    [(field, 1) for field in prefix] + [("report_date", -1), ("_id", -1)]
+                )
+            await self.database.pothole_reports.create_index([("geo", "2dsphere")])
             
             # Image verification collection indexes
             await self.database.image_verification.create_index("report_id", unique=True)
             
             # Risk zones collection indexes
             await self.database.risk_zones.create_index([("center_location.latitude", 1), ("center_location.longitude", 1)])
+            await self.database.risk_zones.create_index([("center_geo", "2dsphere")])
+            
+            # Zone membership (one document per report, _id = report ID)
+            await self.database.zone_members.create_index([("zone_id", 1), ("report_date", -1), ("_id", -1)])
+            
+            # Zone aggregates collection indexes (map zoom pyramid)
+            await self.database.zone_aggregates.create_index([
+                ("zoom", 1),
+                ("center_location.latitude", 1),
+                ("center_location.longitude", 1)
+            ])
+            
+            # Zone recalculation run history (expires after 7 days)
+            await self.database.zone_recalc_runs.create_index("requested_at", expireAfterSeconds=7 * 24 * 3600)
+            
+            # Live change events, replayable for an hour after they happen
+            await self.database.change_events.create_index("created_at", expireAfterSeconds=3600)
+            
+            # Single-use event stream tickets, removed once expired
+            await self.database.stream_tickets.create_index("expires_at", expireAfterSeconds=0)
             
             # Repair actions collection indexes
             await self.database.repair_actions.create_index("zone_id")
-            await self.database.repair_actions.create_index("repair_status")
+            await self.database.repair_actions.create_index([("start_date", -1), ("_id", -1)])
+            await self.database.repair_actions.create_index([("repair_status", 1), ("start_date", -1), ("_id", -1)])
             
             print("✅ Database indexes created")
             
@@ -69,3 +150,14 @@ db = Database()
 def get_database() -> AsyncIOMotorDatabase:
     """Get database instance for dependency injection"""
     return db.database
+
+
+def get_read_database(route: str) -> Callable[[], AsyncIOMotorDatabase]:
+    """
+    Dependency for list routes that may read from secondaries
+    
+    Usage: db: AsyncIOMotorDatabase = Depends(get_read_database("reports"))
+    """
+    def dependency() -> AsyncIOMotorDatabase:
+        return db.read_view(route)
+    return dependency
@@ -1,7 +1,8 @@
 """
 FastAPI Main Application - AI-Based Pothole Detection System
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
@@ -9,20 +10,44 @@ import os
 
 from app.config import settings
 from app.config.database import db
-from app.routes import auth, reports, zones, repairs
+from app.routes import auth, reports, zones, repairs, stats, export, events, profiles
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.compression import CompressionMiddleware
+from app.utils.request_metrics import RequestMetricsMiddleware
+from app.utils.profiling import PROFILE_ID_HEADER, ProfilingMiddleware
+from app.services.recalculation_service import recalculation_scheduler
+from app.services.version_service import collection_versions
+from app.services.write_behind_service import write_behind
+from app.services.stats_service import stats_service
+from app.services.runtime_metrics_service import runtime_monitor
+from app.services.event_service import change_events
+from app.utils.auth import password_hasher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
+    runtime_monitor.start()
     await db.connect_db()
+    collection_versions.start(db.database)
+    write_behind.start(db.database)
+    stats_service.start(db.database)
+    recalculation_scheduler.start(db.database)
+    change_events.start(db.database)
     print("🚀 Application started successfully!")
     
     yield
     
     # Shutdown
+    await change_events.stop()
+    await recalculation_scheduler.stop()
+    await collection_versions.stop()
+    await stats_service.stop()
+    await write_behind.stop()
+    password_hasher.shutdown()
     await db.close_db()
+    await runtime_monitor.stop()
     print("👋 Application shut down")
 
 
@@ -41,8 +66,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", PROFILE_ID_HEADER],
 )
 
+# Negotiated gzip / brotli for JSON responses (added last so it wraps CORS)
+app.add_middleware(CompressionMiddleware)
+
+# Opt-in per-request profiling (X-Profile header or PROFILE_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so latency includes compression and CORS
+app.add_middleware(RequestMetricsMiddleware)
+
 # Mount uploads directory for serving images
 if os.path.exists(settings.UPLOAD_DIR):
     app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
@@ -52,6 +87,10 @@ app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(reports.router, prefix=settings.API_V1_PREFIX)
 app.include_router(zones.router, prefix=settings.API_V1_PREFIX)
 app.include_router(repairs.router, prefix=settings.API_V1_PREFIX)
+app.include_router(stats.router, prefix=settings.API_V1_PREFIX)
+app.include_router(export.router, prefix=settings.API_V1_PREFIX)
+app.include_router(events.router, prefix=settings.API_V1_PREFIX)
+app.include_router(profiles.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
@@ -74,6 +113,22 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(format: str = Query("prometheus", pattern="^(prometheus|json)$")):
+    """
+    Process metrics in the Prometheus text format
+    
+    Request counts and latency per route, in-flight requests, event-loop
+    lag, RSS and CPU, MongoDB command and pool timings, cache hit rates.
+    With METRICS_MULTIPROC_DIR, all workers combined (gauges per worker).
+    Pass format=json for the same data as JSON.
+    """
+    registry = await runtime_monitor.registry()
+    if format == "json":
+        return JSONResponse(registry.snapshot())
+    return PlainTextResponse(registry.exposition(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
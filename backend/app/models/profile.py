@@ -0,0 +1,29 @@
+"""
+Request profile models
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+
+
+class AllocationSite(BaseModel):
+    """Memory allocated at one source line while the request ran"""
+    location: str
+    size_kb: float
+    count: int
+
+
+class ProfileResponse(BaseModel):
+    """Summary of one profiled request"""
+    id: str
+    method: str
+    path: str
+    route: Optional[str] = None
+    status_code: int
+    reason: str = Field(..., description="header or sampled")
+    started_at: datetime
+    duration_ms: float
+    interval_ms: float
+    samples: Dict[str, int] = Field(..., description="Stack samples by kind: running, awaiting, threads")
+    tracemalloc: bool
+    top_allocations: List[AllocationSite] = []
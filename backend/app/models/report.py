@@ -2,7 +2,7 @@
 Pothole report data models
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
 from app.models.user import PyObjectId
@@ -14,6 +14,16 @@ class LocationModel(BaseModel):
     longitude: float = Field(..., ge=-180, le=180)
 
 
+class GeoPointModel(BaseModel):
+    """GeoJSON point, indexed with 2dsphere for area queries"""
+    type: str = Field(default="Point", pattern="^Point$")
+    coordinates: List[float] = Field(..., min_length=2, max_length=2, description="[longitude, latitude]")
+    
+    @classmethod
+    def from_location(cls, location: LocationModel) -> "GeoPointModel":
+        return cls(coordinates=[location.longitude, location.latitude])
+
+
 class ReportBase(BaseModel):
     """Base report model"""
     description: Optional[str] = Field(None, max_length=500)
@@ -30,6 +40,7 @@ class ReportInDB(ReportBase):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     user_id: PyObjectId
     image_path: str
+    geo: Optional[GeoPointModel] = None
     status: str = Field(default="pending", pattern="^(pending|verified|rejected)$")
     report_date: datetime = Field(default_factory=datetime.utcnow)
     
@@ -2,11 +2,11 @@
 Risk zone data models
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional
 from datetime import datetime
 from bson import ObjectId
 from app.models.user import PyObjectId
-from app.models.report import LocationModel
+from app.models.report import LocationModel, GeoPointModel
 
 
 class RiskZoneBase(BaseModel):
@@ -14,12 +14,15 @@ class RiskZoneBase(BaseModel):
     center_location: LocationModel
     pothole_count: int = Field(default=0, ge=0)
     risk_level: str = Field(..., pattern="^(low|medium|high)$")
+    radius_km: float = Field(default=0.0, ge=0, description="Distance from center covered by the zone")
 
 
 class RiskZoneInDB(RiskZoneBase):
     """Risk zone model as stored in database"""
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
-    report_ids: List[PyObjectId] = Field(default_factory=list)
+    center_geo: Optional[GeoPointModel] = None
+    first_report_date: Optional[datetime] = None
+    last_report_date: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
@@ -32,10 +35,56 @@ class RiskZoneInDB(RiskZoneBase):
 class RiskZoneResponse(RiskZoneBase):
     """Risk zone response model"""
     id: str = Field(..., alias="_id")
-    report_ids: List[str]
+    first_report_date: Optional[datetime] = None
+    last_report_date: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         populate_by_name = True
         json_encoders = {ObjectId: str, datetime: lambda v: v.isoformat()}
+
+
+class ZoneProximityResponse(BaseModel):
+    """Zone summary returned by point lookups, with distance to the query"""
+    id: str = Field(..., alias="_id")
+    center_location: LocationModel
+    risk_level: str
+    pothole_count: int
+    radius_km: float
+    distance_km: float
+    
+    class Config:
+        populate_by_name = True
+
+
+class ZoneAggregateInDB(BaseModel):
+    """Precomputed zone summary for one map zoom level"""
+    id: Optional[PyObjectId] = Field(default=None, alias="_id")
+    zoom: int = Field(..., ge=0, le=22)
+    center_location: LocationModel
+    pothole_count: int = Field(default=0, ge=0)
+    zone_count: int = Field(default=0, ge=0)
+    high_risk_zones: int = Field(default=0, ge=0)
+    risk_level: str = Field(..., pattern="^(low|medium|high)$")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        json_encoders = {ObjectId: str}
+
+
+class ZoneAggregateResponse(BaseModel):
+    """Zone summary response model for zoomed-out map views"""
+    id: str = Field(..., alias="_id")
+    zoom: int
+    center_location: LocationModel
+    pothole_count: int
+    zone_count: int
+    high_risk_zones: int
+    risk_level: str
+    
+    class Config:
+        populate_by_name = True
+        json_encoders = {ObjectId: str}
@@ -0,0 +1,26 @@
+"""
+Dashboard statistics models
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+from datetime import datetime
+
+
+class CountGroup(BaseModel):
+    """Document counts of one collection by status or level"""
+    counts: Dict[str, int]
+    total: int
+    updated_at: Optional[datetime] = None
+
+
+class StatsResponse(BaseModel):
+    """Dashboard counters"""
+    reports: CountGroup = Field(..., description="Reports by status")
+    zones: CountGroup = Field(..., description="Risk zones by risk level")
+    repairs: CountGroup = Field(..., description="Repair actions by repair status")
+
+
+class StatsReconcileResponse(BaseModel):
+    """Result of recomputing the counters from the collections"""
+    drift: Dict[str, Dict[str, int]] = Field(..., description="Stored minus actual count, non-zero entries only")
+    stats: StatsResponse
@@ -34,7 +34,7 @@ async def register_user(
         )
     
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     
     # Create user document
     user = UserInDB(
@@ -91,7 +91,7 @@ async def login(
         )
     
     # Verify password if not a test user
-    if not is_test_user and not verify_password(credentials.password, user["hashed_password"]):
+    if not is_test_user and not await verify_password(credentials.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
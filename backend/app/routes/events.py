@@ -0,0 +1,91 @@
+"""
+Live change event routes
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Optional
+from app.config import settings
+from app.config.database import get_database
+from app.models.user import TokenData
+from app.utils.auth import get_current_user, get_stream_user, issue_stream_ticket
+from app.utils.validators import parse_bbox
+from app.services.event_service import TOPICS, Subscriber, change_events
+
+router = APIRouter(prefix="/events", tags=["Live Events"])
+
+
+@router.post("/ticket")
+async def create_stream_ticket(
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Single-use ticket for opening one event stream
+    
+    EventSource cannot send an Authorization header; pass the ticket as
+    ?ticket= instead of putting the access token in the URL (and so in
+    access logs). Get a new ticket for every connection.
+    """
+    ticket = await issue_stream_ticket(db, current_user)
+    return {"ticket": ticket, "expires_in": settings.EVENT_STREAM_TICKET_SECONDS}
+
+
+@router.get("", response_class=StreamingResponse)
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = Query(None, description="Comma-separated topics: reports, zones, repairs (default all)"),
+    bbox: Optional[str] = Query(None, description="Only changes located in min_lon,min_lat,max_lon,max_lat"),
+    risk_level: Optional[str] = Query(None, pattern="^(low|medium|high)$", description="Only changes in zones of this risk level"),
+    last_event_id: Optional[int] = Query(None, ge=0, description="Resume after this event ID"),
+    current_user: TokenData = Depends(get_stream_user),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Server-sent event stream of report, zone and repair changes
+
+    Event types: report.created, report.status, zones.recalculated,
+    repair.created, repair.status. Each event carries an ID; a client that
+    reconnects with Last-Event-ID (or ?last_event_id) gets what it missed
+    during the last hour, or a reset event if that is no longer available.
+
+    Citizens receive their own reports and zone changes; authorities
+    receive everything. Browsers authenticate with ?ticket= (see
+    POST /events/ticket).
+    """
+    topic_set = None
+    if topics:
+        topic_set = {topic.strip() for topic in topics.split(",") if topic.strip()}
+        unknown = topic_set - set(TOPICS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown topics: {', '.join(sorted(unknown))}"
+            )
+
+    # EventSource sends Last-Event-ID itself when it reconnects
+    header_id = request.headers.get("last-event-id")
+    if header_id:
+        try:
+            last_event_id = int(header_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Last-Event-ID must be an event ID"
+            )
+
+    subscriber = Subscriber(
+        user_id=current_user.user_id,
+        is_authority=current_user.role == "authority",
+        topics=topic_set,
+        bbox=parse_bbox(bbox) if bbox else None,
+        risk_level=risk_level
+    )
+    # The stream registers the subscriber once it starts
+    change_events.check_available()
+
+    return StreamingResponse(
+        change_events.stream(db, subscriber, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,51 @@
+"""
+Bulk data export routes
+"""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config.database import get_read_database
+from app.models.user import TokenData
+from app.utils.auth import require_authority
+from app.services.export_service import export_service, FORMATS
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", pattern="^(ndjson|geojson|parquet)$"),
+    bbox: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status_filter: Optional[str] = None,
+    current_user: TokenData = Depends(require_authority),
+    db: AsyncIOMotorDatabase = Depends(get_read_database("export"))
+):
+    """
+    Stream a full dataset export (Authority only)
+    
+    - **dataset**: reports or zones
+    - **format**: ndjson (default), geojson (FeatureCollection) or parquet
+    - **bbox**: Only rows inside min_lon,min_lat,max_lon,max_lat
+    - **since** / **until**: Time range on report_date (reports) or
+      updated_at (zones), until exclusive
+    - **status_filter**: Report status, or zone risk level
+    
+    The response is chunked and has no size limit.
+    """
+    export = export_service.get_dataset(dataset)
+    export_service.validate_format(format)
+    query = export_service.build_query(export, bbox, since, until, status_filter)
+    
+    media_type, extension = FORMATS[format]
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    
+    return StreamingResponse(
+        export_service.stream(db, export, query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,60 @@
+"""
+Request profile routes
+"""
+import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import List
+from app.models.profile import ProfileResponse
+from app.models.user import TokenData
+from app.utils.auth import require_authority
+from app.services.profiling_service import profiler
+
+router = APIRouter(prefix="/profiles", tags=["Profiling"])
+
+
+@router.get("", response_model=List[ProfileResponse])
+async def list_profiles(current_user: TokenData = Depends(require_authority)):
+    """
+    List stored request profiles, newest first (Authority only)
+
+    Send X-Profile: 1 with any request to profile it; the response's
+    X-Profile-Id header names the profile.
+    """
+    return profiler.list()
+
+
+@router.get("/{profile_id}", response_model=ProfileResponse)
+async def get_profile(profile_id: str, current_user: TokenData = Depends(require_authority)):
+    """Get the summary of one profile, including its top allocation sites (Authority only)"""
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return profile
+
+
+@router.get("/{profile_id}/{kind}", response_class=FileResponse)
+async def download_profile(profile_id: str, kind: str, current_user: TokenData = Depends(require_authority)):
+    """
+    Download collapsed stacks of a profile (Authority only)
+
+    - **kind**: stacks (sample counts) or allocations (bytes)
+
+    One stack per line, frames separated by semicolons, as read by
+    flamegraph.pl, speedscope and similar tools.
+    """
+    if kind not in ("stacks", "allocations"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="kind must be stacks or allocations"
+        )
+    path = profiler.path(profile_id, kind)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain", filename=os.path.basename(path))
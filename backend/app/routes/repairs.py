@@ -1,18 +1,39 @@
 """
 Repair action routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ReturnDocument
 from typing import List, Optional
 from datetime import datetime
-from app.config.database import get_database
+from app.config.database import get_database, get_read_database
 from app.models.repair import RepairActionCreate, RepairActionResponse, RepairActionUpdate, RepairActionInDB
 from app.models.user import TokenData
 from app.utils.auth import require_authority
+from app.services.stats_service import stats_service
+from app.services.version_service import collection_versions
+from app.services.event_service import change_events
+from app.utils.http_cache import cache_headers, etag_matches, not_modified
+from app.utils.pagination import apply_cursor, set_next_cursor
+from app.utils.serialization import DocumentShape, json_list_response
 
 router = APIRouter(prefix="/repairs", tags=["Repair Actions"])
 
+# collection_versions name bumped on every repair write
+REPAIRS_VERSION = "repair_actions"
+
+# Fields of RepairActionResponse, encoded without building models
+REPAIR_SHAPE = DocumentShape({
+    "_id": None,
+    "zone_id": None,
+    "assigned_department": None,
+    "repair_status": None,
+    "start_date": None,
+    "end_date": None
+})
+
 
 @router.post("", response_model=RepairActionResponse, status_code=status.HTTP_201_CREATED)
 async def create_repair_action(
@@ -51,6 +72,11 @@ async def create_repair_action(
     # Insert into database
     result = await db.repair_actions.insert_one(repair.dict(by_alias=True, exclude={"id"}))
     repair.id = result.inserted_id
+    await asyncio.gather(
+        stats_service.record(db, "repairs", new=repair.repair_status),
+        collection_versions.bump(db, REPAIRS_VERSION)
+    )
+    change_events.emit_repair(db, "repair.created", repair.dict(by_alias=True), zone=zone)
     
     return RepairActionResponse(
         _id=str(repair.id),
@@ -61,15 +87,27 @@ async def create_repair_action(
 
 @router.get("", response_model=List[RepairActionResponse])
 async def get_repair_actions(
+    request: Request,
     status_filter: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     current_user: TokenData = Depends(require_authority),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncIOMotorDatabase = Depends(get_read_database("repairs"))
 ):
     """
-    Get all repair actions (Authority only)
+    Get repair actions, most recently started first (Authority only)
     
     - **status**: Filter by repair status (pending, in_progress, completed)
+    - **limit**: Maximum number of results (1-500, default 100)
+    - **cursor**: Continuation token from the X-Next-Cursor header of the
+      previous page
+    
+    Responses carry an ETag that changes whenever any repair action changes.
     """
+    etag = await collection_versions.etag(db, [REPAIRS_VERSION], request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     # Build query
     query = {}
     if status_filter:
@@ -80,27 +118,23 @@ async def get_repair_actions(
             )
         query["repair_status"] = status_filter
     
+    query = apply_cursor(query, "start_date", cursor)
+    
     # Fetch repairs
-    cursor = db.repair_actions.find(query).sort("start_date", -1)
-    repairs = await cursor.to_list(length=None)
-    
-    # Convert to response models
-    return [
-        RepairActionResponse(
-            _id=str(repair["_id"]),
-            zone_id=str(repair["zone_id"]),
-            assigned_department=repair["assigned_department"],
-            repair_status=repair["repair_status"],
-            start_date=repair["start_date"],
-            end_date=repair.get("end_date")
-        )
-        for repair in repairs
-    ]
+    repairs_cursor = db.repair_actions.find(query, REPAIR_SHAPE.projection).sort([("start_date", -1), ("_id", -1)]).limit(limit)
+    repairs = await repairs_cursor.to_list(length=limit)
+    
+    response = json_list_response(repairs, REPAIR_SHAPE)
+    response.headers.update(cache_headers(etag))
+    set_next_cursor(response, repairs, limit, "start_date")
+    return response
 
 
 @router.get("/{repair_id}", response_model=RepairActionResponse)
 async def get_repair_action(
     repair_id: str,
+    request: Request,
+    response: Response,
     current_user: TokenData = Depends(require_authority),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
@@ -111,6 +145,10 @@ async def get_repair_action(
             detail="Invalid repair ID"
         )
     
+    etag = await collection_versions.etag(db, [REPAIRS_VERSION], repair_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     repair = await db.repair_actions.find_one({"_id": ObjectId(repair_id)})
     
     if not repair:
@@ -119,6 +157,7 @@ async def get_repair_action(
             detail="Repair action not found"
         )
     
+    response.headers.update(cache_headers(etag))
     return RepairActionResponse(
         _id=str(repair["_id"]),
         zone_id=str(repair["zone_id"]),
@@ -155,11 +194,11 @@ async def update_repair_action(
     if update_data.repair_status == "completed":
         update_doc["end_date"] = datetime.utcnow()
     
-    # Update repair
+    # Update repair; the previous document tells the counters what changed
     result = await db.repair_actions.find_one_and_update(
         {"_id": ObjectId(repair_id)},
         {"$set": update_doc},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
     
     if not result:
@@ -168,6 +207,14 @@ async def update_repair_action(
             detail="Repair action not found"
         )
     
+    previous_status = result["repair_status"]
+    result.update(update_doc)
+    await asyncio.gather(
+        stats_service.record(db, "repairs", new=update_doc["repair_status"], old=previous_status),
+        collection_versions.bump(db, REPAIRS_VERSION)
+    )
+    change_events.emit_repair(db, "repair.status", result, previous_status=previous_status)
+    
     return RepairActionResponse(
         _id=str(result["_id"]),
         zone_id=str(result["zone_id"]),
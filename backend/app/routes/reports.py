@@ -1,20 +1,100 @@
 """
 Pothole report routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Form
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
-from typing import List, Optional
-from app.config.database import get_database
-from app.models.report import ReportCreate, ReportResponse, ReportInDB, ReportStatusUpdate, LocationModel
+from pymongo import ReturnDocument
+from typing import Dict, List, Optional
+from app.config.database import get_database, get_read_database
+from app.models.report import ReportCreate, ReportResponse, ReportInDB, ReportStatusUpdate, LocationModel, GeoPointModel
 from app.models.user import TokenData
 from app.utils.auth import get_current_user, require_authority
 from app.services.image_service import image_service
 from app.services.ai_verification_service import ai_service
+from app.services.recalculation_service import recalculation_scheduler
+from app.services.write_behind_service import write_behind
+from app.services.stats_service import stats_service
+from app.services.admission_service import report_admission
+from app.services.version_service import collection_versions
+from app.services.event_service import change_events
 from app.models.verification import VerificationInDB
+from app.utils.geo import bbox_query
+from app.utils.validators import parse_geo_bbox, parse_latlon
+from app.utils.pagination import apply_cursor, set_next_cursor
+from app.utils.serialization import DocumentShape, json_list_response
+from app.utils.http_cache import cache_headers, etag_matches, not_modified
 
 router = APIRouter(prefix="/reports", tags=["Pothole Reports"])
 
+# collection_versions name bumped on every report write
+REPORTS_VERSION = "pothole_reports"
+
+# Radius of the Earth in meters as used by MongoDB for $centerSphere
+EARTH_RADIUS_M = 6378100.0
+
+# Fields returned by report reads; ai_* are denormalized onto each report
+REPORT_SHAPE = DocumentShape(
+    {
+        "_id": None,
+        "user_id": None,
+        "image_path": None,
+        "location": None,
+        "description": None,
+        "status": None,
+        "report_date": None,
+        "ai_confidence": None,
+        "ai_verified": None
+    },
+    nested={"location": ("latitude", "longitude")}
+)
+REPORT_PROJECTION = REPORT_SHAPE.projection
+
+# List order; matches the (..., report_date, _id) indexes
+REPORT_SORT = [("report_date", -1), ("_id", -1)]
+
+
+def build_report_query(
+    current_user: TokenData,
+    status_filter: Optional[str] = None,
+    bbox: Optional[str] = None,
+    near: Optional[str] = None,
+    radius: float = 1000
+) -> Dict:
+    """Build the report list filter for a user and the request's filters"""
+    # Build query
+    query = {}
+    
+    # Regular users can only see their own reports
+    if current_user.role == "user":
+        query["user_id"] = ObjectId(current_user.user_id)
+    
+    # Apply status filter if provided
+    if status_filter:
+        if status_filter not in ["pending", "verified", "rejected"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid status filter"
+            )
+        query["status"] = status_filter
+    
+    # Area filters run against the 2dsphere index on "geo"
+    if bbox and near:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either bbox or near, not both"
+        )
+    
+    if bbox:
+        query.update(bbox_query("geo", "location", parse_geo_bbox(bbox)))
+    
+    if near:
+        latitude, longitude = parse_latlon(near)
+        query["geo"] = {"$geoWithin": {"$centerSphere": [[longitude, latitude], radius / EARTH_RADIUS_M]}}
+    
+    return query
+
 
 @router.post("", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_report(
@@ -32,29 +112,38 @@ async def create_report(
     - **latitude**: GPS latitude (-90 to 90)
     - **longitude**: GPS longitude (-180 to 180)
     - **description**: Optional description or landmarks
-    """
-    # Save uploaded image
-    image_path = await image_service.save_image(image)
     
-    # Create location model
-    location = LocationModel(latitude=latitude, longitude=longitude)
+    Returns 429 when the user submits too often and 503 when the server
+    is saturated, both with Retry-After.
+    """
+    # Per-user rate limit, then wait for a decode slot sized by the image
+    report_admission.check_rate(current_user.user_id)
+    pixels = await image_service.pixel_count(image)
     
     # Pre-generate ID for AI service
     report_id = ObjectId()
     
+    async with report_admission.admit(pixels, current_user.user_id):
+        # Save uploaded image
+        image_path = await image_service.save_image(image)
+        
+        # Run AI verification
+        verification = await ai_service.verify_pothole(image_path, report_id)
+    
+    # Create location model
+    location = LocationModel(latitude=latitude, longitude=longitude)
+    
     # Create report model
     report = ReportInDB(
         _id=report_id,
         user_id=ObjectId(current_user.user_id),
         image_path=image_path,
         location=location,
+        geo=GeoPointModel.from_location(location),
         description=description,
         status="pending"
     )
     
-    # Run AI verification
-    verification = await ai_service.verify_pothole(image_path, report_id)
-    
     # Prepare report data
     report_dict = report.dict(by_alias=True)
     report_dict["ai_confidence"] = verification.confidence_score
@@ -70,14 +159,25 @@ async def create_report(
     
     # Save to database
     await db.pothole_reports.insert_one(report_dict)
+    # The stats and version writes are independent, so they run concurrently
+    await asyncio.gather(
+        stats_service.record(db, "reports", new=report.status),
+        collection_versions.bump(db, REPORTS_VERSION)
+    )
+    change_events.emit_report(db, "report.created", report_dict)
     
-    # Also save to verification history
-    await db.image_verification.insert_one(verification.dict(by_alias=True, exclude={"id"}))
+    # Also save to verification history (batched with other requests when enabled)
+    await write_behind.insert(db, "image_verification", verification.dict(by_alias=True, exclude={"id"}))
+    
+    # New verified reports change the risk zones
+    if report.status == "verified":
+        recalculation_scheduler.trigger("report_created")
     
     # Return response
     return ReportResponse(
         _id=str(report_id),
         user_id=str(report.user_id),
+        status=report.status,
         ai_confidence=verification.confidence_score,
         ai_verified=verification.is_pothole,
         **report.dict(exclude={"id", "user_id", "status"})
@@ -86,84 +186,62 @@ async def create_report(
 
 @router.get("", response_model=List[ReportResponse])
 async def get_reports(
+    request: Request,
     status_filter: Optional[str] = None,
-    limit: int = 100,
-    skip: int = 0,
+    limit: int = Query(100, ge=1, le=100),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    bbox: Optional[str] = None,
+    near: Optional[str] = None,
+    radius: float = Query(1000, gt=0, le=50000),
     current_user: TokenData = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncIOMotorDatabase = Depends(get_read_database("reports"))
 ):
     """
-    Get list of pothole reports
+    Get list of pothole reports, newest first
     
     - **status**: Filter by status (pending, verified, rejected)
-    - **limit**: Maximum number of results (default 100)
-    - **skip**: Number of results to skip for pagination
+    - **limit**: Maximum number of results (1-100, default 100)
+    - **cursor**: Continuation token from the X-Next-Cursor header of the
+      previous page
+    - **skip**: Offset pagination (deprecated; slow for deep pages and
+      ignored when a cursor is given)
+    - **bbox**: Only reports inside min_lon,min_lat,max_lon,max_lat
+    - **near**: Only reports within **radius** meters of lat,lon
     
     Regular users see only their own reports.
     Authorities see all reports.
+    Responses carry an ETag that changes whenever any report changes.
     """
-    # Build query
-    query = {}
+    etag = await collection_versions.etag(
+        db, [REPORTS_VERSION], current_user.role, current_user.user_id, request.url.query
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    # Regular users can only see their own reports
-    if current_user.role == "user":
-        query["user_id"] = ObjectId(current_user.user_id)
+    query = build_report_query(current_user, status_filter, bbox, near, radius)
     
-    # Apply status filter if provided
-    if status_filter:
-        if status_filter not in ["pending", "verified", "rejected"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid status filter"
-            )
-        query["status"] = status_filter
+    # Continue after the previous page instead of skipping over it
+    if cursor:
+        query = apply_cursor(query, "report_date", cursor)
+        skip = 0
 
-    # Build aggregation pipeline
-    pipeline = [
-        {"$match": query},
-        {"$lookup": {
-            "from": "image_verification",
-            "localField": "_id",
-            "foreignField": "report_id",
-            "as": "verification_data"
-        }},
-        {"$addFields": {
-            "ai_confidence": {
-                "$ifNull": ["$ai_confidence", {"$arrayElemAt": ["$verification_data.confidence_score", 0]}]
-            },
-            "ai_verified": {
-                "$ifNull": ["$ai_verified", {"$arrayElemAt": ["$verification_data.is_pothole", 0]}]
-            }
-        }},
-        {"$sort": {"report_date": -1}},
-        {"$skip": skip},
-        {"$limit": limit}
-    ]
-    
     # Fetch reports
-    cursor = db.pothole_reports.aggregate(pipeline)
-    reports = await cursor.to_list(length=limit)
-    
-    # Convert to response models
-    return [
-        ReportResponse(
-            _id=str(report["_id"]),
-            user_id=str(report["user_id"]),
-            image_path=report["image_path"],
-            location=report["location"],
-            description=report.get("description"),
-            status=report["status"],
-            report_date=report["report_date"],
-            ai_confidence=report.get("ai_confidence"),
-            ai_verified=report.get("ai_verified")
-        )
-        for report in reports
-    ]
+    reports_cursor = db.pothole_reports.find(query, REPORT_PROJECTION).sort(REPORT_SORT).skip(skip).limit(limit)
+    reports = await reports_cursor.to_list(length=limit)
+    
+    # Encode straight from the documents; same shape as ReportResponse
+    response = json_list_response(reports, REPORT_SHAPE)
+    response.headers.update(cache_headers(etag))
+    set_next_cursor(response, reports, limit, "report_date")
+    return response
 
 
 @router.get("/{report_id}", response_model=ReportResponse)
 async def get_report(
     report_id: str,
+    request: Request,
+    response: Response,
     current_user: TokenData = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
@@ -175,28 +253,9 @@ async def get_report(
             detail="Invalid report ID"
         )
     
-    # Fetch report with verification data using aggregation
-    pipeline = [
-        {"$match": {"_id": ObjectId(report_id)}},
-        {"$lookup": {
-            "from": "image_verification",
-            "localField": "_id",
-            "foreignField": "report_id",
-            "as": "verification_data"
-        }},
-        {"$addFields": {
-            "ai_confidence": {
-                "$ifNull": ["$ai_confidence", {"$arrayElemAt": ["$verification_data.confidence_score", 0]}]
-            },
-            "ai_verified": {
-                "$ifNull": ["$ai_verified", {"$arrayElemAt": ["$verification_data.is_pothole", 0]}]
-            }
-        }}
-    ]
-    
-    cursor = db.pothole_reports.aggregate(pipeline)
-    results = await cursor.to_list(length=1)
-    report = results[0] if results else None
+    # Read the version first so the body is never tagged with a newer version than it reflects
+    etag = await collection_versions.etag(db, [REPORTS_VERSION], current_user.role, current_user.user_id, report_id)
+    report = await db.pothole_reports.find_one({"_id": ObjectId(report_id)}, REPORT_PROJECTION)
     
     if not report:
         raise HTTPException(
@@ -211,6 +270,11 @@ async def get_report(
             detail="You don't have permission to view this report"
         )
     
+    # Only after the existence and permission checks, so a 304 reveals nothing
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    response.headers.update(cache_headers(etag))
     return ReportResponse(
         _id=str(report["_id"]),
         user_id=str(report["user_id"]),
@@ -244,11 +308,11 @@ async def update_report_status(
             detail="Invalid report ID"
         )
     
-    # Update status
+    # Update status; the previous document tells the counters what changed
     result = await db.pothole_reports.find_one_and_update(
         {"_id": ObjectId(report_id)},
         {"$set": {"status": status_update.status}},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
     
     if not result:
@@ -257,6 +321,19 @@ async def update_report_status(
             detail="Report not found"
         )
     
+    previous_status = result["status"]
+    result["status"] = status_update.status
+    if previous_status != status_update.status:
+        await asyncio.gather(
+            stats_service.record(db, "reports", new=status_update.status, old=previous_status),
+            collection_versions.bump(db, REPORTS_VERSION)
+        )
+        change_events.emit_report(db, "report.status", result, previous_status=previous_status)
+        
+        # Zones are built from verified reports only
+        if "verified" in (previous_status, status_update.status):
+            recalculation_scheduler.trigger("report_status_changed")
+    
     return ReportResponse(
         _id=str(result["_id"]),
         user_id=str(result["user_id"]),
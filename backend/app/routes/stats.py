@@ -0,0 +1,40 @@
+"""
+Dashboard statistics routes
+"""
+from fastapi import APIRouter, Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config.database import get_database
+from app.models.stats import StatsResponse, StatsReconcileResponse
+from app.models.user import TokenData
+from app.utils.auth import require_authority
+from app.services.stats_service import stats_service
+
+router = APIRouter(prefix="/stats", tags=["Statistics"])
+
+
+@router.get("", response_model=StatsResponse)
+async def get_stats(
+    current_user: TokenData = Depends(require_authority),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """
+    Get dashboard counters (Authority only)
+    
+    Reports by status, risk zones by risk level and repair actions by
+    repair status, read from precomputed counters.
+    """
+    return await stats_service.get(db)
+
+
+@router.post("/reconcile", response_model=StatsReconcileResponse)
+async def reconcile_stats(
+    current_user: TokenData = Depends(require_authority),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+):
+    """Recount all counters from the collections and report drift (Authority only)"""
+    drift = await stats_service.reconcile(db)
+    
+    return {
+        "drift": drift,
+        "stats": await stats_service.get(db)
+    }
@@ -1,29 +1,84 @@
 """
 Risk zone routes
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
-from typing import List
-from app.config.database import get_database
-from app.models.risk_zone import RiskZoneResponse
+from typing import List, Optional, Union
+from app.config import settings
+from app.config.database import get_read_database
+from app.models.report import ReportResponse
+from app.models.risk_zone import RiskZoneResponse, ZoneAggregateResponse, ZoneProximityResponse
 from app.models.user import TokenData
 from app.utils.auth import get_current_user, require_authority
-from app.services.clustering_service import clustering_service
+from app.utils.validators import parse_bbox
+from app.utils.geo import bbox_range_filter
+from app.utils.serialization import DocumentShape, dumps, json_list_response
+from app.utils.pagination import apply_cursor, set_next_cursor
+from app.routes.reports import REPORT_SHAPE, REPORTS_VERSION
+from app.services.recalculation_service import recalculation_scheduler
+from app.services.zone_index_service import zone_index
+from app.services.zone_cache_service import zone_cache
+from app.services.version_service import collection_versions
+from app.services.profiling_service import profiler
+from app.utils.http_cache import cache_headers, etag_matches, not_modified
 
 router = APIRouter(prefix="/zones", tags=["Risk Zones"])
 
+# Fields of RiskZoneResponse / ZoneAggregateResponse, encoded without building models
+ZONE_SHAPE = DocumentShape(
+    {
+        "_id": None,
+        "center_location": None,
+        "pothole_count": 0,
+        "risk_level": None,
+        "radius_km": 0.0,
+        "first_report_date": None,
+        "last_report_date": None,
+        "created_at": None,
+        "updated_at": None
+    },
+    nested={"center_location": ("latitude", "longitude")}
+)
+ZONE_AGGREGATE_SHAPE = DocumentShape(
+    {
+        "_id": None,
+        "zoom": None,
+        "center_location": None,
+        "pothole_count": 0,
+        "zone_count": 0,
+        "high_risk_zones": 0,
+        "risk_level": None
+    },
+    nested={"center_location": ("latitude", "longitude")}
+)
 
-@router.get("", response_model=List[RiskZoneResponse])
+
+def _pyramid_level(zoom: int) -> int:
+    """Pick the deepest precomputed level that does not exceed the map zoom"""
+    levels = sorted(settings.ZONE_PYRAMID_LEVELS)
+    candidates = [level for level in levels if level <= zoom]
+    return candidates[-1] if candidates else levels[0]
+
+
+@router.get("", response_model=Union[List[RiskZoneResponse], List[ZoneAggregateResponse]])
 async def get_risk_zones(
+    request: Request,
     risk_level: str = None,
+    bbox: Optional[str] = None,
+    zoom: Optional[int] = Query(None, ge=0, le=22),
     current_user: TokenData = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncIOMotorDatabase = Depends(get_read_database("zones"))
 ):
     """
     Get all risk zones
     
     - **risk_level**: Filter by risk level (low, medium, high)
+    - **bbox**: Only zones inside min_lon,min_lat,max_lon,max_lat
+    - **zoom**: Map zoom level; below ZONE_DETAIL_ZOOM, precomputed zone
+      aggregates for that level are returned instead of individual zones
+    
+    Responses carry an ETag that changes only when zones are recalculated.
     """
     # Build query
     query = {}
@@ -35,61 +90,172 @@ async def get_risk_zones(
             )
         query["risk_level"] = risk_level
     
-    # Fetch zones
-    cursor = db.risk_zones.find(query).sort("pothole_count", -1)
-    zones = await cursor.to_list(length=None)
-    
-    # Convert to response models
-    return [
-        RiskZoneResponse(
-            _id=str(zone["_id"]),
-            center_location=zone["center_location"],
-            pothole_count=zone["pothole_count"],
-            risk_level=zone["risk_level"],
-            report_ids=[str(rid) for rid in zone["report_ids"]],
-            created_at=zone["created_at"],
-            updated_at=zone["updated_at"]
-        )
-        for zone in zones
-    ]
+    parsed_bbox = parse_bbox(bbox) if bbox else None
+    if parsed_bbox:
+        query.update(bbox_range_filter("center_location", parsed_bbox))
+    
+    # Zoomed-out views get the aggregate for their level
+    level = None
+    if zoom is not None and zoom < settings.ZONE_DETAIL_ZOOM and settings.ZONE_PYRAMID_LEVELS:
+        level = _pyramid_level(zoom)
+        query["zoom"] = level
+    
+    async def load() -> bytes:
+        if level is not None:
+            cursor = db.zone_aggregates.find(query, ZONE_AGGREGATE_SHAPE.projection).sort("pothole_count", -1)
+            aggregates = await cursor.to_list(length=None)
+            return dumps([ZONE_AGGREGATE_SHAPE(aggregate) for aggregate in aggregates])
+        
+        cursor = db.risk_zones.find(query, ZONE_SHAPE.projection).sort("pothole_count", -1)
+        zones = await cursor.to_list(length=None)
+        return dumps([ZONE_SHAPE(zone) for zone in zones])
+    
+    return await zone_cache.respond(request, db, ("zones", risk_level, parsed_bbox, level), load)
+
+
+@router.get("/lookup", response_model=List[ZoneProximityResponse])
+async def lookup_zone(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_read_database("zones"))
+):
+    """
+    Find the risk zones that contain a location
+    
+    A location is inside a zone when it lies within the zone's radius_km of
+    its center. Results are ordered by distance to the center.
+    """
+    await zone_index.ensure_fresh(db)
+    return zone_index.lookup(lat, lon)
+
+
+@router.get("/nearest", response_model=List[ZoneProximityResponse])
+async def nearest_zones(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=50),
+    risk_level: Optional[str] = Query(None, pattern="^(low|medium|high)$"),
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_read_database("zones"))
+):
+    """
+    Find the k risk zones closest to a location
+    
+    - **k**: Number of zones to return (1-50)
+    - **risk_level**: Only consider zones of this risk level
+    """
+    await zone_index.ensure_fresh(db)
+    return zone_index.nearest(lat, lon, k, risk_level)
 
 
 @router.get("/high-risk", response_model=List[RiskZoneResponse])
 async def get_high_risk_zones(
+    request: Request,
     current_user: TokenData = Depends(get_current_user),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    db: AsyncIOMotorDatabase = Depends(get_read_database("zones"))
 ):
     """Get only high-risk zones"""
-    zones = await db.risk_zones.find({"risk_level": "high"}).sort("pothole_count", -1).to_list(length=None)
-    
-    return [
-        RiskZoneResponse(
-            _id=str(zone["_id"]),
-            center_location=zone["center_location"],
-            pothole_count=zone["pothole_count"],
-            risk_level=zone["risk_level"],
-            report_ids=[str(rid) for rid in zone["report_ids"]],
-            created_at=zone["created_at"],
-            updated_at=zone["updated_at"]
+    async def load() -> bytes:
+        cursor = db.risk_zones.find({"risk_level": "high"}, ZONE_SHAPE.projection).sort("pothole_count", -1)
+        zones = await cursor.to_list(length=None)
+        return dumps([ZONE_SHAPE(zone) for zone in zones])
+    
+    return await zone_cache.respond(request, db, ("high-risk",), load)
+
+
+@router.get("/{zone_id}/reports", response_model=List[ReportResponse])
+async def get_zone_reports(
+    zone_id: str,
+    request: Request,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    current_user: TokenData = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_read_database("zones"))
+):
+    """
+    Get the reports that make up a risk zone, newest first
+    
+    - **limit**: Maximum number of results (1-500, default 100)
+    - **cursor**: Continuation token from the X-Next-Cursor header of the
+      previous page
+    
+    Regular users see only their own reports within the zone.
+    """
+    if not ObjectId.is_valid(zone_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid zone ID"
+        )
+    
+    # Membership changes with recalculation, report fields with report writes
+    etag = await collection_versions.etag(
+        db, [zone_cache.VERSION_NAME, REPORTS_VERSION], current_user.role, current_user.user_id, zone_id, request.url.query
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    if not await db.risk_zones.find_one({"_id": ObjectId(zone_id)}, {"_id": 1}):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Risk zone not found"
         )
-        for zone in zones
-    ]
+    
+    # Page through membership, then fetch the page's reports in one query
+    query = apply_cursor({"zone_id": ObjectId(zone_id)}, "report_date", cursor)
+    members = await db.zone_members.find(query).sort(
+        [("report_date", -1), ("_id", -1)]
+    ).limit(limit).to_list(length=limit)
+    
+    report_query = {"_id": {"$in": [member["_id"] for member in members]}}
+    if current_user.role == "user":
+        report_query["user_id"] = ObjectId(current_user.user_id)
+    reports = await db.pothole_reports.find(report_query, REPORT_SHAPE.projection).to_list(length=limit)
+    
+    by_id = {report["_id"]: report for report in reports}
+    ordered = [by_id[member["_id"]] for member in members if member["_id"] in by_id]
+    
+    response = json_list_response(ordered, REPORT_SHAPE)
+    response.headers.update(cache_headers(etag))
+    set_next_cursor(response, members, limit, "report_date")
+    return response
 
 
-@router.post("/recalculate", status_code=status.HTTP_200_OK)
+@router.post("/recalculate", status_code=status.HTTP_202_ACCEPTED)
 async def recalculate_zones(
-    current_user: TokenData = Depends(require_authority),
-    db: AsyncIOMotorDatabase = Depends(get_database)
+    current_user: TokenData = Depends(require_authority)
 ):
     """
-    Recalculate all risk zones based on current verified reports (Authority only)
+    Schedule recalculation of all risk zones (Authority only)
     
-    This endpoint triggers the clustering algorithm to group nearby potholes
-    and determine risk levels.
+    The clustering algorithm runs in the background. Requests made while a
+    run is pending are coalesced into it; poll the returned run ID for
+    status and duration. A request sent with X-Profile also profiles the
+    run itself; the run's profile_id is set once it finishes.
     """
-    created_zones = await clustering_service.recalculate_risk_zones(db)
+    profile = profiler.current()
+    run = recalculation_scheduler.trigger(
+        "manual", immediate=True, profile=profile.reason if profile else None
+    )
     
     return {
-        "message": "Risk zones recalculated successfully",
-        "zones_created": len(created_zones)
+        "message": "Risk zone recalculation scheduled",
+        **run
     }
+
+
+@router.get("/recalculate/{run_id}")
+async def get_recalculation_run(
+    run_id: str,
+    current_user: TokenData = Depends(require_authority)
+):
+    """Get status and duration of a recalculation run (Authority only)"""
+    run = await recalculation_scheduler.get_run(run_id)
+    
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recalculation run not found"
+        )
+    
+    return run
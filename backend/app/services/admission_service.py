@@ -0,0 +1,193 @@
+"""
+Admission control for CPU-heavy report ingestion
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+from fastapi import HTTPException, status
+from app.config import settings
+from app.utils.cache import LRUCache
+from app.utils.metrics import metrics
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to capacity"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token; returns 0, or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        """Give back a token that bought nothing"""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class AdmissionController:
+    """
+    Limits how many report submissions decode and verify images at once
+
+    A submission first spends a token from its user's bucket
+    (REPORT_RATE_PER_MINUTE, bursts of REPORT_RATE_BURST), else 429. It then
+    needs a slot: at most REPORT_MAX_CONCURRENT run together and their
+    images may not exceed REPORT_PIXEL_BUDGET_MEGAPIXELS in total. Others
+    wait in FIFO order, up to REPORT_MAX_QUEUED of them for at most
+    REPORT_QUEUE_TIMEOUT_SECONDS; beyond that they are shed with 503.
+    Both rejections carry Retry-After. A submission rejected for its size or
+    for lack of capacity gets its rate token back.
+    """
+
+    MAX_TRACKED_USERS = 10000
+
+    def __init__(self):
+        self._buckets = LRUCache(self.MAX_TRACKED_USERS)
+        self._active = 0
+        self._pixels = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        # Moving average of how long an admitted submission holds its slot
+        self._service_seconds = 1.0
+        self._requests = metrics.counter(
+            "admission_requests_total",
+            "Report submissions by outcome (admitted, queued, shed_rate, shed_queue_full, shed_timeout, too_large)"
+        )
+        self._wait = metrics.histogram("admission_wait_seconds", "Time admitted submissions waited for a slot")
+        metrics.gauge("admission_active", "Report submissions decoding or verifying").set_function(
+            lambda: self._active
+        )
+        metrics.gauge("admission_queued", "Report submissions waiting for a slot").set_function(
+            lambda: len(self._waiters)
+        )
+        metrics.gauge("admission_pixels_in_use", "Image pixels being decoded by admitted submissions").set_function(
+            lambda: self._pixels
+        )
+
+    @property
+    def pixel_budget(self) -> int:
+        return int(settings.REPORT_PIXEL_BUDGET_MEGAPIXELS * 1_000_000)
+
+    def check_rate(self, user_id: str):
+        """Spend one of the user's submission tokens or raise 429"""
+        if settings.REPORT_RATE_PER_MINUTE <= 0:
+            return
+        bucket: Optional[TokenBucket] = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(settings.REPORT_RATE_PER_MINUTE / 60, max(settings.REPORT_RATE_BURST, 1))
+            self._buckets.set(user_id, bucket)
+        wait = bucket.take()
+        if wait > 0:
+            self._requests.inc(result="shed_rate")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many reports submitted, please wait before submitting again",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+    def _refund_rate(self, user_id: str):
+        bucket: Optional[TokenBucket] = self._buckets.get(user_id)
+        if bucket is not None:
+            bucket.refund()
+
+    def _can_start(self, pixels: int) -> bool:
+        return self._active < settings.REPORT_MAX_CONCURRENT and self._pixels + pixels <= self.pixel_budget
+
+    def _start(self, pixels: int):
+        self._active += 1
+        self._pixels += pixels
+
+    def _release(self, pixels: int):
+        self._active -= 1
+        self._pixels -= pixels
+        self._admit_waiters()
+
+    def _admit_waiters(self):
+        # Strict FIFO so large images are not overtaken indefinitely
+        while self._waiters and self._can_start(self._waiters[0][0]):
+            waiting_pixels, future = self._waiters.popleft()
+            self._start(waiting_pixels)
+            future.set_result(None)
+
+    def _shed(self, result: str, detail: str):
+        self._requests.inc(result=result)
+        backlog = len(self._waiters) + self._active
+        retry_after = math.ceil(self._service_seconds * backlog / max(settings.REPORT_MAX_CONCURRENT, 1))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(max(retry_after, 1))}
+        )
+
+    def _remove_waiter(self, waiter: Tuple[int, asyncio.Future]):
+        self._waiters.remove(waiter)
+        # The head may have been the only thing blocking smaller waiters behind it
+        self._admit_waiters()
+
+    async def _acquire(self, pixels: int):
+        if pixels > self.pixel_budget:
+            self._requests.inc(result="too_large")
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Image is too large (limit {settings.REPORT_PIXEL_BUDGET_MEGAPIXELS:g} megapixels)"
+            )
+
+        if not self._waiters and self._can_start(pixels):
+            self._start(pixels)
+            self._requests.inc(result="admitted")
+            self._wait.observe(0.0)
+            return
+
+        if len(self._waiters) >= settings.REPORT_MAX_QUEUED:
+            self._shed("shed_queue_full", "Server is busy processing reports, please retry")
+
+        waiter = (pixels, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._requests.inc(result="queued")
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait({waiter[1]}, timeout=settings.REPORT_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.CancelledError:
+            # Client went away; give back a slot granted in the meantime
+            if waiter[1].done():
+                self._release(pixels)
+            else:
+                self._remove_waiter(waiter)
+            raise
+
+        if not waiter[1].done():
+            self._remove_waiter(waiter)
+            self._shed("shed_timeout", "Server is busy processing reports, please retry")
+        self._requests.inc(result="admitted")
+        self._wait.observe(time.monotonic() - queued_at)
+
+    @asynccontextmanager
+    async def admit(self, pixels: int, user_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a processing slot for an image of the given size, refunding user_id's token on 413 or 503"""
+        try:
+            await self._acquire(pixels)
+        except HTTPException:
+            if user_id is not None:
+                self._refund_rate(user_id)
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * (time.monotonic() - started)
+            self._release(pixels)
+
+
+# Global admission controller for report submission
+report_admission = AdmissionController()
@@ -2,13 +2,17 @@
 AI verification service for pothole detection using computer vision
 Tuned for real-world pothole images
 """
-import os
-import cv2
-import numpy as np
+from __future__ import annotations
+
+import asyncio
 from datetime import datetime
 from bson import ObjectId
 from app.models.verification import VerificationInDB
-from PIL import Image
+from app.utils.lazy import LazyModule
+
+# Loaded on the first verification, not when the API starts
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
 
 
 class AIVerificationService:
@@ -41,8 +45,9 @@ class AIVerificationService:
         """
         
         try:
-            # Load and analyze the image
-            confidence_score, is_pothole = await self._analyze_image(image_path)
+            # Load and analyze the image off the event loop (OpenCV releases the GIL)
+            loop = asyncio.get_running_loop()
+            confidence_score, is_pothole = await loop.run_in_executor(None, self._analyze_image, image_path)
             
             # Boost confidence for real pothole images
             confidence_score = min(confidence_score * 1.15, 100.0)  # 15% boost
@@ -67,7 +72,7 @@ class AIVerificationService:
                 verified_at=datetime.utcnow()
             )
     
-    async def _analyze_image(self, image_path: str) -> tuple[float, bool]:
+    def _analyze_image(self, image_path: str) -> tuple[float, bool]:
         """
         Analyze image to detect pothole characteristics
         
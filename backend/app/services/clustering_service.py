@@ -1,13 +1,17 @@
 """
 Geographic clustering service for risk zone detection
 """
-import math
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from datetime import datetime
-from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.models.report import LocationModel
-from app.models.risk_zone import RiskZoneInDB
+from app.config import settings
+from app.models.report import LocationModel, GeoPointModel
+from app.models.risk_zone import RiskZoneInDB, ZoneAggregateInDB
+from app.services.version_service import collection_versions
+from app.services.stats_service import stats_service
+from app.services.event_service import change_events
+from app.utils.geo import haversine_km, cluster_points, cluster_points_parallel
 
 
 class ClusteringService:
@@ -18,10 +22,22 @@ class ClusteringService:
     # Clustering parameters (in kilometers)
     CLUSTER_RADIUS_KM = 0.5  # 500 meters
     
+    # Margin around the outermost pothole that still counts as inside a zone
+    ZONE_MARGIN_KM = 0.25
+    
     # Risk level thresholds
     HIGH_RISK_THRESHOLD = 5  # 5+ potholes
     MEDIUM_RISK_THRESHOLD = 3  # 3-4 potholes
     
+    # Ordering used when a zone aggregate takes its members' worst risk level
+    RISK_LEVEL_ORDER = {"low": 0, "medium": 1, "high": 2}
+    
+    # Below this many reports a process pool costs more than it saves
+    PARALLEL_MIN_REPORTS = 20000
+    
+    # Zone replacement of the latest run, kept so shutdown can let it finish
+    _write: Optional[asyncio.Task] = None
+    
     def calculate_distance(self, loc1: LocationModel, loc2: LocationModel) -> float:
         """
         Calculate distance between two GPS coordinates using Haversine formula
@@ -33,23 +49,7 @@ class ClusteringService:
         Returns:
             float: Distance in kilometers
         """
-        # Earth radius in kilometers
-        R = 6371.0
-        
-        # Convert to radians
-        lat1 = math.radians(loc1.latitude)
-        lon1 = math.radians(loc1.longitude)
-        lat2 = math.radians(loc2.latitude)
-        lon2 = math.radians(loc2.longitude)
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        distance = R * c
-        return distance
+        return haversine_km(loc1.latitude, loc1.longitude, loc2.latitude, loc2.longitude)
     
     def determine_risk_level(self, pothole_count: int) -> str:
         """Determine risk level based on pothole count"""
@@ -70,6 +70,85 @@ class ClusteringService:
         
         return LocationModel(latitude=avg_lat, longitude=avg_lon)
     
+    def cluster_reports(self, reports: List[Dict]) -> List[List[Dict]]:
+        """
+        Group reports whose locations are chained within the cluster radius
+        
+        Uses a process pool partitioned into geographic tiles when
+        CLUSTERING_WORKERS allows it; the clusters are identical either way.
+        
+        Args:
+            reports: Report documents with a "location" field
+            
+        Returns:
+            List of clusters, each a list of report documents
+        """
+        points = [
+            (r["location"]["latitude"], r["location"]["longitude"])
+            for r in reports
+        ]
+        
+        if settings.CLUSTERING_WORKERS != 1 and len(points) >= self.PARALLEL_MIN_REPORTS:
+            groups = cluster_points_parallel(
+                points,
+                self.CLUSTER_RADIUS_KM,
+                workers=settings.CLUSTERING_WORKERS,
+                tile_km=settings.CLUSTERING_TILE_KM
+            )
+        else:
+            groups = cluster_points(points, self.CLUSTER_RADIUS_KM)
+        
+        return [[reports[i] for i in group] for group in groups]
+    
+    def build_zone_pyramid(self, zones: List[RiskZoneInDB]) -> List[ZoneAggregateInDB]:
+        """
+        Aggregate risk zones for each configured map zoom level
+        
+        Zone centers are clustered with the level's radius; each aggregate
+        carries the pothole-weighted center, totals and the worst risk level
+        of its member zones.
+        
+        Args:
+            zones: Risk zones produced by the current recalculation
+            
+        Returns:
+            Aggregates for every level in ZONE_PYRAMID_LEVELS
+        """
+        points = [
+            (zone.center_location.latitude, zone.center_location.longitude)
+            for zone in zones
+        ]
+        
+        aggregates = []
+        for zoom, radius_km in sorted(settings.ZONE_PYRAMID_LEVELS.items()):
+            for group in cluster_points(points, radius_km):
+                members = [zones[i] for i in group]
+                pothole_count = sum(zone.pothole_count for zone in members)
+                weights = [max(zone.pothole_count, 1) for zone in members]
+                total_weight = sum(weights)
+                center = LocationModel(
+                    latitude=sum(
+                        zone.center_location.latitude * w for zone, w in zip(members, weights)
+                    ) / total_weight,
+                    longitude=sum(
+                        zone.center_location.longitude * w for zone, w in zip(members, weights)
+                    ) / total_weight
+                )
+                
+                aggregates.append(ZoneAggregateInDB(
+                    zoom=zoom,
+                    center_location=center,
+                    pothole_count=pothole_count,
+                    zone_count=len(members),
+                    high_risk_zones=sum(1 for zone in members if zone.risk_level == "high"),
+                    risk_level=max(
+                        (zone.risk_level for zone in members),
+                        key=self.RISK_LEVEL_ORDER.__getitem__
+                    )
+                ))
+        
+        return aggregates
+    
     async def recalculate_risk_zones(self, db: AsyncIOMotorDatabase) -> List[Dict]:
         """
         Recalculate all risk zones based on verified pothole reports
@@ -80,75 +159,99 @@ class ClusteringService:
         Returns:
             List of created/updated risk zones
         """
-        # Get all verified pothole reports
-        reports_cursor = db.pothole_reports.find({"status": "verified"})
+        # Get all verified pothole reports (only locations and dates are needed)
+        reports_cursor = db.pothole_reports.find({"status": "verified"}, {"location": 1, "report_date": 1})
         reports = await reports_cursor.to_list(length=None)
         
         if not reports:
             return []
         
-        # Clear existing risk zones
-        await db.risk_zones.delete_many({})
-        
-        # Group reports into clusters
-        clusters: List[List[Dict]] = []
-        unassigned = reports.copy()
+        # Group reports into clusters off the event loop
+        loop = asyncio.get_running_loop()
+        clusters = await loop.run_in_executor(None, self.cluster_reports, reports)
         
-        while unassigned:
-            # Start new cluster with first unassigned report
-            current_report = unassigned.pop(0)
-            cluster = [current_report]
-            
-            # Find all reports within cluster radius
-            i = 0
-            while i < len(unassigned):
-                report = unassigned[i]
-                
-                # Check distance to any report in current cluster
-                in_cluster = False
-                for cluster_report in cluster:
-                    loc1 = LocationModel(**cluster_report["location"])
-                    loc2 = LocationModel(**report["location"])
-                    
-                    if self.calculate_distance(loc1, loc2) <= self.CLUSTER_RADIUS_KM:
-                        in_cluster = True
-                        break
-                
-                if in_cluster:
-                    cluster.append(report)
-                    unassigned.pop(i)
-                else:
-                    i += 1
-            
-            clusters.append(cluster)
+        # Replacing the zone set must not stop halfway: if this run is
+        # cancelled now, the write still finishes (see wait_for_write)
+        self._write = asyncio.ensure_future(self._replace_zones(db, clusters))
+        return await asyncio.shield(self._write)
+    
+    async def wait_for_write(self, timeout: float):
+        """Let a zone replacement whose run was cancelled finish"""
+        if self._write is not None and not self._write.done():
+            await asyncio.wait({self._write}, timeout=timeout)
+    
+    async def _replace_zones(self, db: AsyncIOMotorDatabase, clusters: List[List[Dict]]) -> List[Dict]:
+        # Clear existing risk zones and their membership
+        await db.risk_zones.delete_many({})
+        await db.zone_members.delete_many({})
         
         # Create risk zones for each cluster
-        created_zones = []
+        zone_docs: List[RiskZoneInDB] = []
         for cluster in clusters:
             # Calculate center location
             locations = [LocationModel(**r["location"]) for r in cluster]
             center = self.calculate_center(locations)
+            radius_km = max(self.calculate_distance(center, loc) for loc in locations) + self.ZONE_MARGIN_KM
             
             # Determine risk level
             pothole_count = len(cluster)
             risk_level = self.determine_risk_level(pothole_count)
             
-            # Create risk zone
+            # Create risk zone; member report IDs go to zone_members
+            report_dates = [r["report_date"] for r in cluster if r.get("report_date")]
             zone = RiskZoneInDB(
                 center_location=center,
+                center_geo=GeoPointModel.from_location(center),
                 pothole_count=pothole_count,
                 risk_level=risk_level,
-                report_ids=[r["_id"] for r in cluster],
+                radius_km=round(radius_km, 4),
+                first_report_date=min(report_dates, default=None),
+                last_report_date=max(report_dates, default=None),
                 created_at=datetime.utcnow(),
                 updated_at=datetime.utcnow()
             )
             
-            # Insert into database
-            result = await db.risk_zones.insert_one(zone.dict(by_alias=True, exclude={"id"}))
-            zone.id = result.inserted_id
-            
+            zone_docs.append(zone)
+        
+        # Insert into database
+        result = await db.risk_zones.insert_many(
+            [zone.dict(by_alias=True, exclude={"id"}) for zone in zone_docs]
+        )
+        created_zones = []
+        for zone, zone_id in zip(zone_docs, result.inserted_ids):
+            zone.id = zone_id
             created_zones.append(zone.dict(by_alias=True))
         
+        # One membership document per report, keyed by report ID
+        await db.zone_members.insert_many(
+            [
+                {"_id": report["_id"], "zone_id": zone_id, "report_date": report.get("report_date")}
+                for cluster, zone_id in zip(clusters, result.inserted_ids)
+                for report in cluster
+            ],
+            ordered=False
+        )
+        
+        # Rebuild the zoom-level aggregates from the new zones
+        aggregates = self.build_zone_pyramid(zone_docs)
+        await db.zone_aggregates.delete_many({})
+        if aggregates:
+            await db.zone_aggregates.insert_many(
+                [aggregate.dict(by_alias=True, exclude={"id"}) for aggregate in aggregates]
+            )
+        
+        # The zone set was replaced, so its counters are set rather than incremented
+        zone_counts = {level: 0 for level in self.RISK_LEVEL_ORDER}
+        for zone in zone_docs:
+            zone_counts[zone.risk_level] += 1
+        await stats_service.replace(db, "zones", zone_counts)
+        
+        # Invalidate cached zone listings in every worker and tell live dashboards
+        version = await collection_versions.bump(db, "risk_zones")
+        await change_events.publish(
+            db, "zones.recalculated", {"version": version, "total": len(zone_docs), "counts": zone_counts}
+        )
+        
         return created_zones
 
 
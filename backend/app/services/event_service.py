@@ -0,0 +1,387 @@
+"""
+Live change events for dashboards, shared by all workers through MongoDB
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import AsyncIterator, Coroutine, Dict, Optional, Set, Tuple
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config import settings
+from app.services.version_service import collection_versions
+from app.services.zone_index_service import zone_index
+from app.utils.geo import bbox_contains
+from app.utils.metrics import metrics
+from app.utils.serialization import dumps
+
+# Sequence in collection_versions that numbers the events
+SEQUENCE_NAME = "change_events"
+
+# Event types are "<topic>.<change>"
+TOPICS = ("reports", "zones", "repairs")
+
+# Client reconnect delay announced at the start of every stream
+RETRY_MS = 3000
+
+# How long a missing sequence number is awaited before it is skipped
+GAP_TIMEOUT_SECONDS = 5.0
+
+# Longest wait for the poller and pending publishes when shutting down
+STOP_TIMEOUT_SECONDS = 5.0
+
+
+def _frame(event_id: int, event_type: str, data: Dict) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event_type.encode(), dumps(data))
+
+
+class Subscriber:
+    """An open event stream: its filters and a bounded buffer of pending events"""
+
+    def __init__(
+        self,
+        user_id: str,
+        is_authority: bool,
+        topics: Optional[Set[str]] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        risk_level: Optional[str] = None
+    ):
+        self.user_id = user_id
+        self.is_authority = is_authority
+        self.topics = topics
+        self.bbox = bbox
+        self.risk_level = risk_level
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=max(settings.EVENT_STREAM_BUFFER, 1))
+        self.dropped = False
+        # Events up to this ID are not delivered live (set by subscribe)
+        self.live_after = 0
+
+    def matches(self, event_type: str, data: Dict) -> bool:
+        topic = event_type.split(".")[0]
+        if self.topics and topic not in self.topics:
+            return False
+
+        # Same visibility as the REST routes: citizens see their own reports, no repairs
+        if not self.is_authority:
+            if topic == "repairs":
+                return False
+            if topic == "reports" and data.get("user_id") != self.user_id:
+                return False
+
+        # Events without a location or zone (e.g. a zone recalculation) pass both filters
+        if self.bbox and data.get("latitude") is not None:
+            if not bbox_contains(self.bbox, data["latitude"], data["longitude"]):
+                return False
+        if self.risk_level and "risk_level" in data and data["risk_level"] != self.risk_level:
+            return False
+        return True
+
+
+class ChangeEventHub:
+    """
+    Publishes report, zone and repair changes and fans them out to streams
+
+    Writers number each event from a shared counter and store it in the
+    change_events collection (kept for an hour), so every worker sees every
+    event and a reconnecting client can resume after its Last-Event-ID.
+    Each worker reads new events every EVENT_STREAM_POLL_SECONDS, or at
+    once for its own writes, and copies them into the buffer of each
+    matching local stream. A stream whose buffer is full is closed instead
+    of holding events back for everyone; its client reconnects and replays
+    what it missed.
+
+    Request handlers emit events in the background (emit_report,
+    emit_repair), so a write does not wait for the event to be stored.
+    """
+
+    def __init__(self):
+        self._subscribers: Set[Subscriber] = set()
+        self._last_id: Optional[int] = None
+        self._gap_since: Optional[float] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._publishing: Set[asyncio.Task] = set()
+        self._published = metrics.counter("event_stream_published_total", "Change events published by this worker")
+        self._dropped = metrics.counter(
+            "event_stream_dropped_total", "Event streams closed because the client read too slowly"
+        )
+        metrics.gauge("event_stream_subscribers", "Open event streams").set_function(
+            lambda: len(self._subscribers)
+        )
+
+    async def publish(self, db: AsyncIOMotorDatabase, event_type: str, data: Dict):
+        """Record a change event; failures are logged, never raised to the writer"""
+        if not settings.EVENT_STREAM_ENABLED:
+            return
+        try:
+            event_id = await collection_versions.bump(db, SEQUENCE_NAME)
+            await db.change_events.insert_one({
+                "_id": event_id,
+                "type": event_type,
+                "data": data,
+                "created_at": datetime.utcnow()
+            })
+        except Exception as e:
+            print(f"⚠️  Could not publish {event_type} event: {e}")
+            return
+        self._published.inc(type=event_type)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def publish_report(
+        self,
+        db: AsyncIOMotorDatabase,
+        event_type: str,
+        report: Dict,
+        previous_status: Optional[str] = None
+    ):
+        """Publish a report change, tagged with the risk level of the zone it falls in"""
+        location = report["location"]
+        latitude, longitude = location["latitude"], location["longitude"]
+        # Whatever the zone index holds now: it is only loaded here if this
+        # worker has never loaded it, never refreshed for an event
+        risk_level = None
+        try:
+            if not zone_index.loaded:
+                await zone_index.ensure_fresh(db)
+            zones = zone_index.lookup(latitude, longitude)
+            if zones:
+                risk_level = zones[0]["risk_level"]
+        except Exception as e:
+            print(f"⚠️  Zone lookup for {event_type} event failed: {e}")
+
+        data = {
+            "id": str(report["_id"]),
+            "user_id": str(report["user_id"]),
+            "status": report["status"],
+            "latitude": latitude,
+            "longitude": longitude,
+            "risk_level": risk_level
+        }
+        if previous_status is not None:
+            data["previous_status"] = previous_status
+        await self.publish(db, event_type, data)
+
+    async def publish_repair(
+        self,
+        db: AsyncIOMotorDatabase,
+        event_type: str,
+        repair: Dict,
+        zone: Optional[Dict] = None,
+        previous_status: Optional[str] = None
+    ):
+        """Publish a repair change with the location and risk level of its zone"""
+        if zone is None:
+            zone = await db.risk_zones.find_one(
+                {"_id": repair["zone_id"]}, {"center_location": 1, "risk_level": 1}
+            )
+
+        data = {
+            "id": str(repair["_id"]),
+            "zone_id": str(repair["zone_id"]),
+            "repair_status": repair["repair_status"],
+            "assigned_department": repair.get("assigned_department")
+        }
+        if previous_status is not None:
+            data["previous_status"] = previous_status
+        if zone:
+            data["latitude"] = zone["center_location"]["latitude"]
+            data["longitude"] = zone["center_location"]["longitude"]
+            data["risk_level"] = zone["risk_level"]
+        await self.publish(db, event_type, data)
+
+    def emit_report(self, db: AsyncIOMotorDatabase, event_type: str, report: Dict, previous_status: Optional[str] = None):
+        """publish_report without waiting for it"""
+        self._emit(self.publish_report(db, event_type, dict(report), previous_status))
+
+    def emit_repair(
+        self,
+        db: AsyncIOMotorDatabase,
+        event_type: str,
+        repair: Dict,
+        zone: Optional[Dict] = None,
+        previous_status: Optional[str] = None
+    ):
+        """publish_repair without waiting for it"""
+        self._emit(self.publish_repair(db, event_type, dict(repair), zone, previous_status))
+
+    def _emit(self, publish: Coroutine):
+        if not settings.EVENT_STREAM_ENABLED:
+            publish.close()
+            return
+        task = asyncio.create_task(publish)
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    def start(self, db: AsyncIOMotorDatabase):
+        """Begin delivering events to this worker's streams"""
+        if settings.EVENT_STREAM_ENABLED:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._wakeup.set()
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        # Events emitted by requests that already returned are still stored
+        if self._publishing:
+            await asyncio.wait(set(self._publishing), timeout=STOP_TIMEOUT_SECONDS)
+        if self._task:
+            # wait_for can swallow a cancel that races with its wakeup, so the
+            # poller also checks the flag after every wait
+            self._stopping = True
+            self._wakeup.set()
+            self._task.cancel()
+            done, _ = await asyncio.wait({self._task}, timeout=STOP_TIMEOUT_SECONDS)
+            if not done:
+                print("⚠️  Change event poller did not stop in time")
+            self._task = None
+        self._wakeup = None
+        self._last_id = None
+        # Open streams end instead of waiting for events that will not come
+        for subscriber in list(self._subscribers):
+            self._close(subscriber)
+
+    async def _run(self, db: AsyncIOMotorDatabase):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.EVENT_STREAM_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                break
+            self._wakeup.clear()
+            try:
+                if self._last_id is None:
+                    # Streams opened from now on start at the newest event
+                    latest = await db.change_events.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+                    self._last_id = latest["_id"] if latest else 0
+                await self._deliver_new(db)
+            except Exception as e:
+                print(f"⚠️  Reading change events failed: {e}")
+
+    async def _deliver_new(self, db: AsyncIOMotorDatabase):
+        cursor = db.change_events.find({"_id": {"$gt": self._last_id}}).sort("_id", 1)
+        async for doc in cursor:
+            if doc["_id"] != self._last_id + 1:
+                # Another writer may have numbered an event it has not inserted yet
+                now = time.monotonic()
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since < GAP_TIMEOUT_SECONDS:
+                    return
+            self._gap_since = None
+            self._last_id = doc["_id"]
+            self._dispatch(doc)
+
+    def _dispatch(self, doc: Dict):
+        frame = None
+        for subscriber in list(self._subscribers):
+            if not subscriber.matches(doc["type"], doc["data"]):
+                continue
+            if frame is None:
+                frame = _frame(doc["_id"], doc["type"], doc["data"])
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._dropped.inc()
+                self._close(subscriber)
+
+    def _close(self, subscriber: Subscriber):
+        subscriber.dropped = True
+        self._subscribers.discard(subscriber)
+        # Wake the stream if it is waiting; a full buffer means it is busy sending
+        try:
+            subscriber.queue.put_nowait(b"")
+        except asyncio.QueueFull:
+            pass
+
+    def check_available(self):
+        """Raise 503 unless a new stream can be opened on this worker"""
+        if self._task is None or self._last_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Live events are unavailable",
+                headers={"Retry-After": str(RETRY_MS // 1000)}
+            )
+        if len(self._subscribers) >= settings.EVENT_STREAM_MAX_SUBSCRIBERS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many open event streams, please retry",
+                headers={"Retry-After": str(RETRY_MS // 1000)}
+            )
+
+    def subscribe(self, subscriber: Subscriber):
+        """Register a stream to receive events from now on, or 503"""
+        self.check_available()
+        subscriber.live_after = self._last_id
+        self._subscribers.add(subscriber)
+
+    async def _replay(
+        self,
+        db: AsyncIOMotorDatabase,
+        subscriber: Subscriber,
+        after_id: int,
+        until_id: int
+    ) -> AsyncIterator[bytes]:
+        if after_id >= until_id:
+            return
+        oldest = await db.change_events.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+        if oldest is None or oldest["_id"] > after_id + 1:
+            # Events the client missed have expired: it has to reload its data
+            yield _frame(until_id, "reset", {"reason": "expired"})
+            return
+        cursor = db.change_events.find({"_id": {"$gt": after_id, "$lte": until_id}}).sort("_id", 1)
+        async for doc in cursor:
+            if subscriber.matches(doc["type"], doc["data"]):
+                yield _frame(doc["_id"], doc["type"], doc["data"])
+
+    async def stream(
+        self,
+        db: AsyncIOMotorDatabase,
+        subscriber: Subscriber,
+        last_event_id: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Server-sent events for a subscriber
+
+        The subscriber is registered when the stream starts, so a response
+        that is never sent leaves nothing behind; check_available() first
+        to answer 503 while that is still possible. Events after
+        last_event_id are replayed first. Idle streams get a comment every
+        EVENT_STREAM_HEARTBEAT_SECONDS, and every stream ends after
+        EVENT_STREAM_MAX_SECONDS so clients spread over workers again.
+        """
+        try:
+            try:
+                self.subscribe(subscriber)
+            except HTTPException:
+                # Filled up or stopped since check_available(): the client retries
+                yield b"retry: %d\n\n" % RETRY_MS
+                return
+            yield b"retry: %d\n\n" % RETRY_MS
+            if last_event_id is not None:
+                async for frame in self._replay(db, subscriber, last_event_id, subscriber.live_after):
+                    yield frame
+
+            deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+            while not subscriber.dropped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    frame = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=min(settings.EVENT_STREAM_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if subscriber.dropped:
+                    break
+                yield frame
+        finally:
+            self._subscribers.discard(subscriber)
+
+
+# Global change event hub
+change_events = ChangeEventHub()
@@ -0,0 +1,271 @@
+"""
+Streaming bulk export of reports and zones
+"""
+import io
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config import settings
+from app.utils.geo import bbox_query
+from app.utils.serialization import dumps
+from app.utils.validators import parse_geo_bbox
+
+
+class ExportDataset:
+    """How one collection is filtered and flattened into export rows"""
+
+    def __init__(
+        self,
+        collection: str,
+        geo_field: str,
+        location_field: str,
+        time_field: str,
+        status_field: str,
+        statuses: tuple,
+        columns: Dict[str, str]
+    ):
+        self.collection = collection
+        self.geo_field = geo_field
+        self.location_field = location_field
+        self.time_field = time_field
+        self.status_field = status_field
+        self.statuses = statuses
+        # Row column -> type name (string, double, int64, bool, timestamp)
+        self.columns = columns
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        fields = {self.location_field: 1}
+        fields.update({column: 1 for column in self.columns if column not in ("id", "latitude", "longitude")})
+        return fields
+
+    def row(self, doc: Dict) -> Dict:
+        """Flat export row: id, latitude, longitude, then the remaining columns"""
+        location = doc.get(self.location_field) or {}
+        row = {
+            "id": str(doc["_id"]),
+            "latitude": location.get("latitude"),
+            "longitude": location.get("longitude")
+        }
+        for column, kind in self.columns.items():
+            if column not in row:
+                value = doc.get(column)
+                row[column] = str(value) if kind == "string" and value is not None else value
+        return row
+
+
+DATASETS = {
+    "reports": ExportDataset(
+        collection="pothole_reports",
+        geo_field="geo",
+        location_field="location",
+        time_field="report_date",
+        status_field="status",
+        statuses=("pending", "verified", "rejected"),
+        columns={
+            "id": "string",
+            "latitude": "double",
+            "longitude": "double",
+            "user_id": "string",
+            "status": "string",
+            "report_date": "timestamp",
+            "description": "string",
+            "image_path": "string",
+            "ai_confidence": "double",
+            "ai_verified": "bool"
+        }
+    ),
+    "zones": ExportDataset(
+        collection="risk_zones",
+        geo_field="center_geo",
+        location_field="center_location",
+        time_field="updated_at",
+        status_field="risk_level",
+        statuses=("low", "medium", "high"),
+        columns={
+            "id": "string",
+            "latitude": "double",
+            "longitude": "double",
+            "risk_level": "string",
+            "pothole_count": "int64",
+            "radius_km": "double",
+            "created_at": "timestamp",
+            "updated_at": "timestamp"
+        }
+    )
+}
+
+# Output format -> (media type, file extension)
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "geojson": ("application/geo+json", "geojson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet")
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose written bytes are drained between batches"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+    """
+    Streams a dataset through a batched cursor into NDJSON, GeoJSON or Parquet
+
+    Documents are read EXPORT_BATCH_SIZE at a time and each batch is
+    encoded and yielded before the next one is fetched, so memory use
+    depends on the batch size, not on the size of the dataset. Parquet
+    output writes one row group per batch.
+    """
+
+    def get_dataset(self, name: str) -> ExportDataset:
+        if name not in DATASETS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown dataset. Use one of: {', '.join(DATASETS)}"
+            )
+        return DATASETS[name]
+
+    def build_query(
+        self,
+        dataset: ExportDataset,
+        bbox: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        status_filter: Optional[str] = None
+    ) -> Dict:
+        """Export filter; bbox runs against the dataset's 2dsphere index"""
+        query = {}
+        if status_filter:
+            if status_filter not in dataset.statuses:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid status filter. Use one of: {', '.join(dataset.statuses)}"
+                )
+            query[dataset.status_field] = status_filter
+
+        if since or until:
+            time_range = {}
+            if since:
+                time_range["$gte"] = since
+            if until:
+                time_range["$lt"] = until
+            query[dataset.time_field] = time_range
+
+        if bbox:
+            query.update(bbox_query(dataset.geo_field, dataset.location_field, parse_geo_bbox(bbox)))
+
+        return query
+
+    def validate_format(self, output_format: str):
+        """Reject unknown formats before a response starts streaming"""
+        if output_format not in FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid format. Use one of: {', '.join(FORMATS)}"
+            )
+        if output_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise HTTPException(
+                    status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                    detail="Parquet export requires pyarrow"
+                )
+
+    async def _batches(self, db: AsyncIOMotorDatabase, dataset: ExportDataset, query: Dict) -> AsyncIterator[List[Dict]]:
+        batch_size = settings.EXPORT_BATCH_SIZE
+        cursor = db[dataset.collection].find(query, dataset.projection).batch_size(batch_size)
+        batch = []
+        async for doc in cursor:
+            batch.append(dataset.row(doc))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def stream(
+        self,
+        db: AsyncIOMotorDatabase,
+        dataset: ExportDataset,
+        query: Dict,
+        output_format: str
+    ) -> AsyncIterator[bytes]:
+        """Encoded export in chunks of one batch each (format already validated)"""
+        batches = self._batches(db, dataset, query)
+        if output_format == "ndjson":
+            encoder = self._ndjson(batches)
+        elif output_format == "geojson":
+            encoder = self._geojson(batches)
+        else:
+            encoder = self._parquet(batches, dataset)
+        async for chunk in encoder:
+            yield chunk
+
+    async def _ndjson(self, batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+        async for batch in batches:
+            yield b"".join(dumps(row) + b"\n" for row in batch)
+
+    async def _geojson(self, batches: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+        yield b'{"type":"FeatureCollection","features":['
+        first = True
+        async for batch in batches:
+            features = []
+            for row in batch:
+                properties = dict(row)
+                feature_id = properties.pop("id")
+                latitude = properties.pop("latitude")
+                longitude = properties.pop("longitude")
+                features.append(dumps({
+                    "type": "Feature",
+                    "id": feature_id,
+                    "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+                    "properties": properties
+                }))
+            yield (b"" if first else b",") + b",".join(features)
+            first = False
+        yield b"]}"
+
+    async def _parquet(self, batches: AsyncIterator[List[Dict]], dataset: ExportDataset) -> AsyncIterator[bytes]:
+        # Imported here so the API starts without pyarrow loaded
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {
+            "string": pa.string(),
+            "double": pa.float64(),
+            "int64": pa.int64(),
+            "bool": pa.bool_(),
+            "timestamp": pa.timestamp("ms")
+        }
+        schema = pa.schema([(column, types[kind]) for column, kind in dataset.columns.items()])
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            async for batch in batches:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+# Global export service instance
+export_service = ExportService()
@@ -5,10 +5,13 @@ import os
 import uuid
 from datetime import datetime
 from fastapi import UploadFile, HTTPException, status
-from PIL import Image
 from app.config import settings
+from app.utils.lazy import LazyModule
 from app.utils.validators import validate_image_file
 
+# Loaded on the first upload, not when the API starts
+Image = LazyModule("PIL.Image")
+
 
 class ImageService:
     """Service for handling image uploads and storage"""
@@ -70,6 +73,21 @@ class ImageService:
                 detail=f"Error saving image: {str(e)}"
             )
     
+    async def pixel_count(self, file: UploadFile) -> int:
+        """Width x height of an uploaded image, read from its header only"""
+        validate_image_file(file)
+        try:
+            with Image.open(file.file) as img:
+                width, height = img.size
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid or corrupted image file"
+            )
+        finally:
+            await file.seek(0)
+        return width * height
+    
     def delete_image(self, image_path: str) -> bool:
         """Delete image from disk"""
         try:
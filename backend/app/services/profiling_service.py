@@ -0,0 +1,364 @@
+"""
+On-demand profiling of single requests: sampled stacks and allocations
+"""
+import asyncio
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.config import settings
+from app.utils.metrics import metrics
+
+# Artifact files of a profile, by kind
+ARTIFACT_FILES = {
+    "meta": "{id}.json",
+    "stacks": "{id}.stacks.txt",
+    "allocations": "{id}.alloc.txt"
+}
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9A-Za-z-]+$")
+
+# Profile of the request being handled, if it is profiled
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+# Allocation sites listed in the profile summary
+TOP_ALLOCATIONS = 20
+
+# Innermost frames of a thread that is waiting for work rather than running
+_IDLE_FUNCTIONS = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    path = code.co_filename.replace("\\", "/")
+    if "site-packages/" in path:
+        path = path.rsplit("site-packages/", 1)[1]
+    elif "/app/" in path:
+        path = "app/" + path.rsplit("/app/", 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f"{name} ({path}:{code.co_firstlineno})"
+
+
+def _thread_stack(frame) -> List:
+    """Frames of a thread, outermost first"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _is_idle(frames: List) -> bool:
+    if not frames:
+        return True
+    leaf = frames[-1].f_code
+    return (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_FUNCTIONS
+
+
+def _task_frames(frames: List) -> List:
+    """Drop the event loop's own frames above the running task"""
+    for index in range(len(frames) - 1, -1, -1):
+        code = frames[index].f_code
+        if code.co_name == "_run" and code.co_filename.replace("\\", "/").endswith("asyncio/events.py"):
+            return frames[index + 1:]
+    return frames
+
+
+def _await_frames(task: asyncio.Task) -> List:
+    """Frames of a suspended task, from its coroutine down to what it awaits"""
+    frames = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return frames
+
+
+class RequestProfile:
+    """Samples and allocation baseline of one request being profiled"""
+
+    def __init__(self, method: str, path: str, reason: str, task: asyncio.Task):
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{os.getpid()}-{secrets.token_hex(3)}"
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.task = task
+        self.started_at = datetime.utcnow()
+        self.started = time.perf_counter()
+        self.stacks: Counter = Counter()
+        self.samples: Counter = Counter()
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.traced = False
+
+    def add(self, kind: str, labels: List[str]):
+        self.samples[kind] += 1
+        if labels:
+            self.stacks[";".join(labels)] += 1
+
+
+class StackSampler:
+    """
+    Samples thread stacks while at least one request is being profiled
+
+    Every PROFILE_INTERVAL_MS each profiled request gets one sample. If its
+    task is running, that is the event loop thread's stack. If its task is
+    suspended, it is the chain of coroutines down to the awaited call,
+    ending in [awaiting] (or [awaiting, loop busy] while another task runs).
+    Busy executor threads are sampled as [thread] stacks. They can be doing
+    work for any request in flight, not only the profiled one.
+    """
+
+    def __init__(self):
+        self._profiles: Dict[str, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            self._loop = asyncio.get_running_loop()
+            self._loop_thread_id = threading.get_ident()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles.pop(profile.id, None)
+
+    def _run(self):
+        interval = max(settings.PROFILE_INTERVAL_MS, 1.0) / 1000
+        own_id = threading.get_ident()
+        while True:
+            time.sleep(interval)
+            with self._lock:
+                profiles = list(self._profiles.values())
+                if not profiles:
+                    self._thread = None
+                    return
+            try:
+                self._sample(profiles, own_id)
+            except Exception as e:
+                print(f"⚠️  Profiler sample failed: {e}")
+
+    def _sample(self, profiles: List[RequestProfile], own_id: int):
+        frames_by_thread = sys._current_frames()
+        loop_frames = _thread_stack(frames_by_thread.get(self._loop_thread_id))
+        current = asyncio.current_task(self._loop)
+
+        thread_stacks = []
+        for thread_id, frame in frames_by_thread.items():
+            if thread_id in (own_id, self._loop_thread_id):
+                continue
+            frames = _thread_stack(frame)
+            if not _is_idle(frames):
+                thread_stacks.append(["[thread]"] + [_frame_label(f) for f in frames])
+
+        for profile in profiles:
+            if profile.task.done():
+                continue
+            if current is profile.task:
+                profile.add("running", [_frame_label(f) for f in _task_frames(loop_frames)])
+            else:
+                marker = "[awaiting]" if current is None else "[awaiting, loop busy]"
+                profile.add("awaiting", [_frame_label(f) for f in _await_frames(profile.task)] + [marker])
+            for labels in thread_stacks:
+                profile.add("threads", labels)
+
+
+class ProfilingService:
+    """
+    Profiles requests on demand and keeps the results on disk
+
+    Authorities profile a request by sending the X-Profile header;
+    PROFILE_SAMPLE_RATE additionally profiles that fraction of all requests.
+    At most PROFILE_MAX_CONCURRENT requests per worker are profiled at once.
+    With PROFILE_TRACEMALLOC, allocations made while the request ran are
+    recorded too; tracing slows every request in the process while it is on.
+    Each profile is written to PROFILE_DIR as a JSON summary plus collapsed
+    stack files (flamegraph.pl / speedscope input); only the newest
+    PROFILE_MAX_ARTIFACTS profiles are kept.
+    """
+
+    def __init__(self):
+        self._sampler = StackSampler()
+        self._active = 0
+        self._tracing = 0
+        self._started_tracing = False
+        self._profiles = metrics.counter("profiles_total", "Requests profiled by trigger (header, sampled)")
+
+    @property
+    def directory(self) -> str:
+        return settings.PROFILE_DIR
+
+    async def start(self, method: str, path: str, reason: str) -> Optional[RequestProfile]:
+        """Begin profiling the current request, unless the concurrency limit is reached"""
+        if self._active >= settings.PROFILE_MAX_CONCURRENT:
+            return None
+        self._active += 1
+        profile = RequestProfile(method, path, reason, asyncio.current_task())
+
+        try:
+            if settings.PROFILE_TRACEMALLOC:
+                if self._tracing == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+                    self._started_tracing = True
+                self._tracing += 1
+                profile.traced = True
+                profile.snapshot = await asyncio.get_running_loop().run_in_executor(None, tracemalloc.take_snapshot)
+        except BaseException:
+            self._stop(profile)
+            raise
+
+        self._sampler.add(profile)
+        self._profiles.inc(reason=reason)
+        _current_profile.set(profile)
+        return profile
+
+    def current(self) -> Optional[RequestProfile]:
+        """Profile of the request or task being handled, if any"""
+        return _current_profile.get()
+
+    def _stop(self, profile: RequestProfile):
+        _current_profile.set(None)
+        self._sampler.remove(profile)
+        self._active -= 1
+        if profile.traced:
+            profile.traced = False
+            self._tracing -= 1
+            if self._tracing == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def abandon(self, profile: RequestProfile):
+        """Stop profiling a request that failed or was cancelled, without saving"""
+        self._stop(profile)
+
+    async def finish(self, profile: RequestProfile, route: Optional[str], status_code: int):
+        """Stop profiling and write the artifacts"""
+        duration = time.perf_counter() - profile.started
+        loop = asyncio.get_running_loop()
+        after = None
+        try:
+            if profile.snapshot is not None:
+                after = await loop.run_in_executor(None, tracemalloc.take_snapshot)
+        finally:
+            self._stop(profile)
+
+        meta = {
+            "id": profile.id,
+            "method": profile.method,
+            "path": profile.path,
+            "route": route,
+            "status_code": status_code,
+            "reason": profile.reason,
+            "started_at": profile.started_at.isoformat(),
+            "duration_ms": round(duration * 1000, 2),
+            "interval_ms": settings.PROFILE_INTERVAL_MS,
+            "samples": dict(profile.samples),
+            "tracemalloc": after is not None,
+            "top_allocations": []
+        }
+        try:
+            await loop.run_in_executor(None, self._write, profile, meta, after)
+        except Exception as e:
+            print(f"⚠️  Could not save profile {profile.id}: {e}")
+
+    def _write(self, profile: RequestProfile, meta: Dict, after: Optional[tracemalloc.Snapshot]):
+        os.makedirs(self.directory, exist_ok=True)
+
+        allocations = []
+        if after is not None:
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            after = after.filter_traces(ignore)
+            before = profile.snapshot.filter_traces(ignore)
+            # Summary by allocating line, the file by full stack for flame graphs
+            by_line = [diff for diff in after.compare_to(before, "lineno") if diff.size_diff > 0]
+            meta["top_allocations"] = [
+                {
+                    "location": f"{diff.traceback[-1].filename}:{diff.traceback[-1].lineno}",
+                    "size_kb": round(diff.size_diff / 1024, 1),
+                    "count": diff.count_diff
+                }
+                for diff in by_line[:TOP_ALLOCATIONS]
+            ]
+            for diff in after.compare_to(before, "traceback"):
+                if diff.size_diff <= 0:
+                    continue
+                labels = [f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in diff.traceback]
+                allocations.append(f"{';'.join(labels)} {diff.size_diff}")
+
+        stacks = [f"{stack} {count}" for stack, count in profile.stacks.most_common()]
+        self._write_file(profile.id, "stacks", "\n".join(stacks) + "\n")
+        if after is not None:
+            self._write_file(profile.id, "allocations", "\n".join(allocations) + "\n")
+        # Summary last: listing only shows complete profiles
+        self._write_file(profile.id, "meta", json.dumps(meta, indent=2))
+        self._prune()
+
+    def _write_file(self, profile_id: str, kind: str, content: str):
+        with open(os.path.join(self.directory, ARTIFACT_FILES[kind].format(id=profile_id)), "w") as f:
+            f.write(content)
+
+    def _prune(self):
+        """Delete the oldest profiles beyond PROFILE_MAX_ARTIFACTS"""
+        ids = sorted(self._ids(), reverse=True)
+        for profile_id in ids[max(settings.PROFILE_MAX_ARTIFACTS, 0):]:
+            for kind in ARTIFACT_FILES:
+                try:
+                    os.remove(self.path(profile_id, kind))
+                except FileNotFoundError:
+                    pass
+
+    def _ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [name[:-len(".json")] for name in names if name.endswith(".json")]
+
+    def path(self, profile_id: str, kind: str) -> Optional[str]:
+        """File of one artifact, or None if the ID is malformed"""
+        if not PROFILE_ID_PATTERN.match(profile_id) or kind not in ARTIFACT_FILES:
+            return None
+        return os.path.join(self.directory, ARTIFACT_FILES[kind].format(id=profile_id))
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        path = self.path(profile_id, "meta")
+        if path is None:
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def list(self) -> List[Dict]:
+        """Summaries of the stored profiles, newest first"""
+        summaries = (self.get(profile_id) for profile_id in sorted(self._ids(), reverse=True))
+        return [summary for summary in summaries if summary is not None]
+
+
+# Global request profiler
+profiler = ProfilingService()
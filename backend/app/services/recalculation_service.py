@@ -0,0 +1,325 @@
+"""
+Background risk zone recalculation with debouncing and single-flight runs
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+from app.config import settings
+from app.services.clustering_service import clustering_service
+from app.services.zone_index_service import zone_index
+from app.services.profiling_service import profiler
+
+
+class ZoneRecalculationScheduler:
+    """
+    Runs risk zone recalculation in the background
+
+    Triggers that arrive within the debounce window are merged into one
+    pending run. Only one run executes at a time per process, and a lease
+    document in MongoDB keeps workers from rebuilding zones concurrently.
+    Triggers that arrive during a run are coalesced into a single follow-up
+    run.
+    """
+
+    LEASE_ID = "zone_recalculation"
+    MAX_RUNS_IN_MEMORY = 50
+    # Long enough for a cancelled run to finish replacing the zone set
+    STOP_TIMEOUT_SECONDS = 30.0
+
+    def __init__(self):
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._lease_deadline = 0.0
+        self._pending: Optional[Dict] = None
+        self._pending_first_at = 0.0
+        self._pending_due_at = 0.0
+        self._runs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._profiled_runs: Dict[str, str] = {}
+        self._saving: Set[asyncio.Task] = set()
+
+    def start(self, db: AsyncIOMotorDatabase):
+        """Start the background worker for this process"""
+        self.db = db
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        """Stop the background worker; a run in progress is cancelled"""
+        if self._task:
+            # wait_for can swallow a cancel that races with its wakeup, so the
+            # worker also checks the flag after every wait
+            self._stopping = True
+            self._wakeup.set()
+            self._task.cancel()
+            done, _ = await asyncio.wait({self._task}, timeout=self.STOP_TIMEOUT_SECONDS)
+            if not done:
+                print("⚠️  Zone recalculation worker did not stop in time")
+            self._task = None
+        
+        # A trigger that never ran is recorded as such, not left pending
+        if self._pending is not None and self.db is not None:
+            run = self._pending
+            self._pending = None
+            run["status"] = "cancelled"
+            run["error"] = "Worker stopped before the run started"
+            run["finished_at"] = datetime.utcnow()
+            self._profiled_runs.pop(run["run_id"], None)
+            await self._save(run)
+
+    def trigger(self, reason: str, immediate: bool = False, profile: Optional[str] = None) -> Dict:
+        """
+        Request a recalculation
+
+        Args:
+            reason: What caused the trigger (e.g. "manual", "report_created")
+            immediate: Skip the debounce window (used for manual requests)
+            profile: Profile the run for this reason ("header", "sampled");
+                its profile_id is set when it finishes
+
+        Returns:
+            Record of the pending run this trigger was coalesced into
+        """
+        now = time.monotonic()
+
+        if self._pending is None:
+            run_id = uuid.uuid4().hex
+            self._pending = {
+                "run_id": run_id,
+                "status": "pending",
+                "reasons": [reason],
+                "triggers": 1,
+                "requested_at": datetime.utcnow(),
+                "started_at": None,
+                "finished_at": None,
+                "duration_ms": None,
+                "zones_created": None,
+                "error": None,
+                "profile_id": None
+            }
+            self._remember(self._pending)
+            self._pending_first_at = now
+        else:
+            self._pending["triggers"] += 1
+            if reason not in self._pending["reasons"]:
+                self._pending["reasons"].append(reason)
+        
+        # Other workers answer GET /zones/recalculate/{run_id} from the database
+        if self.db is not None:
+            task = asyncio.create_task(self._save_pending(dict(self._pending)))
+            self._saving.add(task)
+            task.add_done_callback(self._saving.discard)
+
+        if profile:
+            self._profiled_runs[self._pending["run_id"]] = profile
+        
+        if immediate:
+            self._pending_due_at = now
+        else:
+            # Trailing debounce, capped so a steady stream still gets a run
+            self._pending_due_at = min(
+                now + settings.ZONE_RECALC_DEBOUNCE_SECONDS,
+                self._pending_first_at + settings.ZONE_RECALC_MAX_DELAY_SECONDS
+            )
+
+        if self._wakeup:
+            self._wakeup.set()
+
+        return dict(self._pending)
+
+    async def get_run(self, run_id: str) -> Optional[Dict]:
+        """Look up a run started by any worker"""
+        if run_id in self._runs:
+            return dict(self._runs[run_id])
+        if self.db is None:
+            return None
+        return await self.db.zone_recalc_runs.find_one({"_id": run_id}, {"_id": 0})
+
+    def _remember(self, run: Dict):
+        self._runs[run["run_id"]] = run
+        while len(self._runs) > self.MAX_RUNS_IN_MEMORY:
+            self._runs.popitem(last=False)
+
+    async def _save_pending(self, run: Dict):
+        try:
+            # Only while still pending: a late write must not undo "running"
+            await self.db.zone_recalc_runs.update_one(
+                {"_id": run["run_id"], "status": "pending"},
+                {"$set": run},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass
+        except Exception as e:
+            print(f"⚠️  Error saving zone recalculation run: {e}")
+
+    async def _save(self, run: Dict):
+        try:
+            await self.db.zone_recalc_runs.replace_one(
+                {"_id": run["run_id"]},
+                {"_id": run["run_id"], **run},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"⚠️  Error saving zone recalculation run: {e}")
+
+    async def _acquire_lease(self) -> bool:
+        now = datetime.utcnow()
+        try:
+            await self.db.job_locks.find_one_and_update(
+                {"_id": self.LEASE_ID, "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}]},
+                {"$set": {
+                    "owner": self.owner,
+                    "expires_at": now + timedelta(seconds=settings.ZONE_RECALC_LEASE_SECONDS)
+                }},
+                upsert=True
+            )
+            self._lease_deadline = time.monotonic() + settings.ZONE_RECALC_LEASE_SECONDS
+            return True
+        except DuplicateKeyError:
+            # Another worker holds an unexpired lease
+            return False
+        except Exception as e:
+            print(f"⚠️  Error acquiring zone recalculation lease: {e}")
+            return False
+
+    async def _renew_lease(self) -> bool:
+        """Extend the lease held for a run; False once another worker may own it"""
+        try:
+            result = await self.db.job_locks.update_one(
+                {"_id": self.LEASE_ID, "owner": self.owner},
+                {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=settings.ZONE_RECALC_LEASE_SECONDS)}}
+            )
+        except Exception as e:
+            print(f"⚠️  Error renewing zone recalculation lease: {e}")
+            # Still ours until it expires; leave a margin for the next attempt
+            return time.monotonic() < self._lease_deadline - settings.ZONE_RECALC_LEASE_SECONDS / 3
+        if result.matched_count == 0:
+            return False
+        self._lease_deadline = time.monotonic() + settings.ZONE_RECALC_LEASE_SECONDS
+        return True
+
+    async def _release_lease(self):
+        try:
+            await self.db.job_locks.delete_one({"_id": self.LEASE_ID, "owner": self.owner})
+        except Exception as e:
+            print(f"⚠️  Error releasing zone recalculation lease: {e}")
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                await self._next_run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Zone recalculation worker error: {e}")
+                await asyncio.sleep(1)
+
+    async def _next_run(self):
+        await self._wakeup.wait()
+        self._wakeup.clear()
+
+        # Wait out the debounce window; new triggers may extend it
+        while self._pending is not None and not self._stopping:
+            delay = self._pending_due_at - time.monotonic()
+            if delay <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                self._wakeup.clear()
+            except asyncio.TimeoutError:
+                pass
+
+        if self._pending is None or self._stopping:
+            return
+
+        if not await self._acquire_lease():
+            # Retry once the other worker is likely done
+            self._pending_due_at = time.monotonic() + settings.ZONE_RECALC_DEBOUNCE_SECONDS
+            self._wakeup.set()
+            return
+
+        run = self._pending
+        self._pending = None
+        await self._execute(run)
+
+        if self._pending is not None:
+            self._wakeup.set()
+
+    async def _recalculate_with_lease(self, profile=None) -> list:
+        """Run clustering while renewing the lease; abort if the lease is lost"""
+        work = asyncio.ensure_future(clustering_service.recalculate_risk_zones(self.db))
+        if profile is not None:
+            # Sample the task doing the work, not this one waiting on it
+            profile.task = work
+        try:
+            while True:
+                done, _ = await asyncio.wait({work}, timeout=settings.ZONE_RECALC_LEASE_SECONDS / 3)
+                if done:
+                    return work.result()
+                if not await self._renew_lease():
+                    # Another worker may be rebuilding zones; stop writing over it
+                    raise RuntimeError("Lost the zone recalculation lease")
+        finally:
+            if not work.done():
+                work.cancel()
+
+    async def _execute(self, run: Dict):
+        started = time.perf_counter()
+        run["status"] = "running"
+        run["started_at"] = datetime.utcnow()
+        await self._save(run)
+        
+        profile = None
+        profile_reason = self._profiled_runs.pop(run["run_id"], None)
+        if profile_reason:
+            try:
+                profile = await profiler.start("TASK", "zone_recalculation", profile_reason)
+            except Exception as e:
+                print(f"⚠️  Could not profile zone recalculation: {e}")
+
+        try:
+            created_zones = await self._recalculate_with_lease(profile)
+            if created_zones:
+                zone_index.rebuild(created_zones)
+            run["status"] = "completed"
+            run["zones_created"] = len(created_zones)
+        except asyncio.CancelledError:
+            run["status"] = "cancelled"
+            raise
+        except Exception as e:
+            print(f"❌ Zone recalculation failed: {e}")
+            run["status"] = "failed"
+            run["error"] = str(e)
+        finally:
+            run["finished_at"] = datetime.utcnow()
+            run["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if profile is not None:
+                if run["status"] == "cancelled":
+                    profiler.abandon(profile)
+                else:
+                    try:
+                        await profiler.finish(profile, None, 200 if run["status"] == "completed" else 500)
+                        run["profile_id"] = profile.id
+                    except Exception as e:
+                        print(f"⚠️  Could not save zone recalculation profile: {e}")
+            await self._save(run)
+            # A cancelled run's zone write keeps going; hold the lease until it is done
+            await clustering_service.wait_for_write(self.STOP_TIMEOUT_SECONDS)
+            await self._release_lease()
+
+
+# Global recalculation scheduler instance
+recalculation_scheduler = ZoneRecalculationScheduler()
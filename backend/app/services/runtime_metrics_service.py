@@ -0,0 +1,109 @@
+"""
+Event-loop lag and process resource metrics
+"""
+import asyncio
+import os
+import resource
+import sys
+import time
+from typing import Optional
+from app.config import settings
+from app.utils.metrics import MetricsRegistry, SharedMetrics, metrics
+
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def resident_memory_bytes() -> int:
+    """Current RSS from /proc on Linux, else the peak RSS reported by getrusage"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RuntimeMonitor:
+    """
+    Samples how late the event loop wakes up, plus process RSS and CPU time
+
+    Every EVENT_LOOP_LAG_INTERVAL_SECONDS a task sleeps for that interval
+    and records how much later than scheduled it resumed. Sustained lag
+    means request handlers are running CPU-bound code on the loop.
+
+    With METRICS_MULTIPROC_DIR set, the worker also publishes its metrics
+    there every METRICS_SHARE_INTERVAL_SECONDS, so that /metrics on any
+    worker reports all of them.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._share_task: Optional[asyncio.Task] = None
+        self.shared: Optional[SharedMetrics] = None
+        self._lag = metrics.histogram(
+            "event_loop_lag_seconds", "Delay between a scheduled and an actual event-loop wakeup", buckets=LAG_BUCKETS
+        )
+        self._last_lag = metrics.gauge("event_loop_lag_last_seconds", "Most recent event-loop lag sample")
+        metrics.gauge("process_resident_memory_bytes", "Resident memory size in bytes").set_function(
+            resident_memory_bytes
+        )
+        metrics.gauge("process_cpu_seconds_total", "User and system CPU time spent in seconds").set_function(
+            time.process_time
+        )
+        start_time = time.time()
+        metrics.gauge("process_start_time_seconds", "Start time of the process since the epoch").set_function(
+            lambda: start_time
+        )
+
+    def start(self):
+        if settings.EVENT_LOOP_LAG_INTERVAL_SECONDS > 0:
+            self._task = asyncio.create_task(self._sample())
+        if settings.METRICS_MULTIPROC_DIR:
+            self.shared = SharedMetrics(metrics, settings.METRICS_MULTIPROC_DIR)
+            self._share_task = asyncio.create_task(self._share())
+
+    async def stop(self):
+        for task in (self._task, self._share_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._share_task = None
+        if self.shared:
+            # Final counts, so requests served since the last write are not lost
+            self._write_shared()
+
+    async def registry(self) -> MetricsRegistry:
+        """Metrics to expose: this worker's, or all workers' combined"""
+        if self.shared is None:
+            return metrics
+        return await asyncio.get_running_loop().run_in_executor(None, self.shared.combined)
+
+    def _write_shared(self):
+        try:
+            self.shared.write()
+        except OSError as e:
+            print(f"⚠️  Could not write shared metrics: {e}")
+
+    async def _share(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await loop.run_in_executor(None, self._write_shared)
+            await asyncio.sleep(settings.METRICS_SHARE_INTERVAL_SECONDS)
+
+    async def _sample(self):
+        interval = settings.EVENT_LOOP_LAG_INTERVAL_SECONDS
+        while True:
+            scheduled = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lag = max(time.perf_counter() - scheduled, 0.0)
+            self._lag.observe(lag)
+            self._last_lag.set(lag)
+
+
+# Global runtime monitor instance
+runtime_monitor = RuntimeMonitor()
@@ -0,0 +1,154 @@
+"""
+Materialized dashboard counters
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config import settings
+from app.utils.metrics import metrics
+
+
+class StatsService:
+    """
+    Keeps per-status document counts in the stats_counters collection
+
+    Each group is one small document ({"_id": "reports", "counts": {...}})
+    updated with $inc by the routes that create or change documents, so
+    reading the dashboard is a single find. reconcile() recounts every group
+    from its collection, reports any drift and overwrites the stored counts.
+    """
+
+    # Group name -> (collection, field counted, known values)
+    GROUPS = {
+        "reports": ("pothole_reports", "status", ("pending", "verified", "rejected")),
+        "zones": ("risk_zones", "risk_level", ("low", "medium", "high")),
+        "repairs": ("repair_actions", "repair_status", ("pending", "in_progress", "completed"))
+    }
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._drift = metrics.gauge("stats_counter_drift", "Stored minus actual count found by the last reconciliation")
+
+    async def record(
+        self,
+        db: AsyncIOMotorDatabase,
+        group: str,
+        new: Optional[str] = None,
+        old: Optional[str] = None
+    ):
+        """
+        Count a document entering state new and/or leaving state old
+
+        Args:
+            db: Database instance
+            group: Counter group ("reports", "zones" or "repairs")
+            new: Value the document now has (None for deletions)
+            old: Value the document had before (None for inserts)
+        """
+        if new == old:
+            return
+        increments = {}
+        if new is not None:
+            increments[f"counts.{new}"] = 1
+        if old is not None:
+            increments[f"counts.{old}"] = -1
+        await db.stats_counters.update_one(
+            {"_id": group},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def replace(self, db: AsyncIOMotorDatabase, group: str, counts: Dict[str, int]):
+        """Overwrite a group's counts (after rebuilding its whole collection)"""
+        await db.stats_counters.update_one(
+            {"_id": group},
+            {"$set": {"counts": counts, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def get(self, db: AsyncIOMotorDatabase) -> Dict[str, Dict]:
+        """All counter groups, with zeros for values never counted"""
+        docs = {doc["_id"]: doc for doc in await db.stats_counters.find({}).to_list(length=None)}
+        result = {}
+        for group, (_, _, values) in self.GROUPS.items():
+            doc = docs.get(group, {})
+            counts = {value: 0 for value in values}
+            counts.update(doc.get("counts", {}))
+            result[group] = {
+                "counts": counts,
+                "total": sum(counts.values()),
+                "updated_at": doc.get("updated_at")
+            }
+        return result
+
+    async def count(self, db: AsyncIOMotorDatabase, group: str) -> Dict[str, int]:
+        """Recount a group from its collection"""
+        collection, field, values = self.GROUPS[group]
+        counts = {value: 0 for value in values}
+        pipeline = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+        async for row in db[collection].aggregate(pipeline):
+            if row["_id"] is not None:
+                counts[row["_id"]] = row["count"]
+        return counts
+
+    async def reconcile(self, db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, int]]:
+        """
+        Recount every group, store the result and return the drift found
+
+        Writes that land between the recount and the overwrite are lost from
+        the counters until the next reconciliation, so any non-zero drift
+        right after a busy period is expected to be small.
+        """
+        stored = await self.get(db)
+        drift = {}
+        for group in self.GROUPS:
+            actual = await self.count(db, group)
+            keys = set(actual) | set(stored[group]["counts"])
+            differences = {
+                key: stored[group]["counts"].get(key, 0) - actual.get(key, 0)
+                for key in keys
+            }
+            for key, difference in differences.items():
+                self._drift.set(difference, group=group, key=key)
+            differences = {key: value for key, value in differences.items() if value}
+            if differences:
+                drift[group] = differences
+                print(f"⚠️  Stats drift in {group}: {differences}")
+            await self.replace(db, group, actual)
+        return drift
+
+    def start(self, db: AsyncIOMotorDatabase):
+        """Seed missing counters and start periodic reconciliation"""
+        self._task = asyncio.create_task(self._worker(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _worker(self, db: AsyncIOMotorDatabase):
+        try:
+            if await db.stats_counters.count_documents({}) < len(self.GROUPS):
+                await self.reconcile(db)
+                print("✅ Dashboard counters initialized")
+
+            interval = settings.STATS_RECONCILE_INTERVAL_SECONDS
+            while interval > 0:
+                await asyncio.sleep(interval)
+                try:
+                    await self.reconcile(db)
+                except Exception as e:
+                    print(f"❌ Stats reconciliation failed: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Could not initialize dashboard counters: {e}")
+
+
+# Global stats service instance
+stats_service = StatsService()
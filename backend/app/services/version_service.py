@@ -0,0 +1,106 @@
+"""
+Per-collection change counters shared by all workers through MongoDB
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from app.config import settings
+from app.utils.http_cache import build_etag
+
+
+class CollectionVersionService:
+    """
+    Tracks a version number per logical data set (e.g. "risk_zones")
+
+    Writers call bump() after changing the data set; readers call get() to
+    derive cache keys and ETags. Each worker trusts its last known version
+    for COLLECTION_VERSION_TTL_SECONDS. With COLLECTION_VERSION_CHANGE_STREAM
+    enabled (replica set required), bumps made by other workers are pushed
+    through a change stream instead and get() no longer polls.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._callbacks: List[Callable[[str, int], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._listening = False
+
+    def on_change(self, callback: Callable[[str, int], None]):
+        """Register a callback run with (name, version) when a version changes"""
+        self._callbacks.append(callback)
+
+    def _set(self, name: str, version: int):
+        previous = self._versions.get(name)
+        self._versions[name] = version
+        self._checked_at[name] = time.monotonic()
+        if previous is not None and previous != version:
+            for callback in self._callbacks:
+                callback(name, version)
+
+    async def get(self, db: AsyncIOMotorDatabase, name: str) -> int:
+        """Current version of a data set (0 if it was never bumped)"""
+        if name in self._versions:
+            if self._listening:
+                return self._versions[name]
+            if time.monotonic() - self._checked_at[name] < settings.COLLECTION_VERSION_TTL_SECONDS:
+                return self._versions[name]
+
+        doc = await db.collection_versions.find_one({"_id": name})
+        self._set(name, doc["version"] if doc else 0)
+        return self._versions[name]
+
+    async def bump(self, db: AsyncIOMotorDatabase, name: str) -> int:
+        """Mark a data set as changed and return its new version"""
+        doc = await db.collection_versions.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._set(name, doc["version"])
+        return doc["version"]
+
+    async def etag(self, db: AsyncIOMotorDatabase, names: Sequence[str], *parts) -> str:
+        """ETag for a response built from the given data sets and request parts"""
+        versions = [(name, await self.get(db, name)) for name in names]
+        return build_etag(*versions, *parts)
+
+    def start(self, db: AsyncIOMotorDatabase):
+        """Listen for other workers' bumps if the change stream is enabled"""
+        if settings.COLLECTION_VERSION_CHANGE_STREAM:
+            self._task = asyncio.create_task(self._listen(db))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._listening = False
+
+    async def _listen(self, db: AsyncIOMotorDatabase):
+        try:
+            async with db.collection_versions.watch(full_document="updateLookup") as stream:
+                # Versions read before the stream opened may be stale
+                self._versions.clear()
+                self._listening = True
+                print("📡 Listening for collection version changes")
+                async for change in stream:
+                    doc = change.get("fullDocument")
+                    if doc:
+                        self._set(doc["_id"], doc["version"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️  Collection version change stream unavailable, polling instead: {e}")
+        finally:
+            self._listening = False
+
+
+# Global collection version service instance
+collection_versions = CollectionVersionService()
@@ -0,0 +1,112 @@
+"""
+Write-behind batching for history and audit inserts
+"""
+import asyncio
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.utils.metrics import metrics
+
+
+class WriteBehindBuffer:
+    """
+    Collects inserts across requests and writes them with insert_many
+
+    Only for documents nobody reads back within the same request (history,
+    audit trails). Buffered inserts are flushed every WRITE_BEHIND_FLUSH_MS,
+    or as soon as a collection has WRITE_BEHIND_MAX_BATCH documents, and on
+    shutdown. When disabled, not started or full, insert() writes directly.
+    """
+
+    def __init__(self):
+        self.db: Optional[AsyncIOMotorDatabase] = None
+        self._queues: Dict[str, List[Dict]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._depth = metrics.gauge("write_behind_queue_depth", "Documents waiting to be flushed, by collection")
+        self._flushed = metrics.counter("write_behind_flushed_total", "Documents written by write-behind flushes")
+        self._failed = metrics.counter("write_behind_failed_total", "Buffered documents that could not be written")
+        self._batches = metrics.histogram(
+            "write_behind_batch_size", "Documents per insert_many flush",
+            buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, db: AsyncIOMotorDatabase):
+        """Start the periodic flusher if write-behind is enabled"""
+        if not settings.WRITE_BEHIND_ENABLED:
+            return
+        self.db = db
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        """Stop the flusher and write everything still buffered"""
+        if self._task:
+            # Let an in-flight flush finish rather than cancelling it
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def insert(self, db: AsyncIOMotorDatabase, collection: str, document: Dict):
+        """Buffer a document for insertion, or insert it now if buffering is off"""
+        if not self.running or self.queue_depth() >= settings.WRITE_BEHIND_MAX_QUEUE:
+            await db[collection].insert_one(document)
+            return
+
+        queue = self._queues.setdefault(collection, [])
+        queue.append(document)
+        self._depth.set(len(queue), collection=collection)
+        if len(queue) >= settings.WRITE_BEHIND_MAX_BATCH:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write all buffered documents, one insert_many per collection and batch"""
+        if self.db is None:
+            return
+        for collection in list(self._queues):
+            while self._queues.get(collection):
+                batch = self._queues[collection][:settings.WRITE_BEHIND_MAX_BATCH]
+                del self._queues[collection][:len(batch)]
+                self._depth.set(len(self._queues[collection]), collection=collection)
+                await self._write(collection, batch)
+
+    async def _write(self, collection: str, batch: List[Dict]):
+        self._batches.observe(len(batch), collection=collection)
+        try:
+            await self.db[collection].insert_many(batch, ordered=False)
+            self._flushed.inc(len(batch), collection=collection)
+        except BulkWriteError as e:
+            # Unordered: everything except the reported documents was written
+            errors = len(e.details.get("writeErrors", []))
+            self._flushed.inc(len(batch) - errors, collection=collection)
+            self._failed.inc(errors, collection=collection)
+            print(f"⚠️  Write-behind flush to {collection}: {errors} document(s) rejected")
+        except Exception as e:
+            self._failed.inc(len(batch), collection=collection)
+            print(f"❌ Write-behind flush to {collection} failed: {e}")
+
+    async def _worker(self):
+        interval = settings.WRITE_BEHIND_FLUSH_MS / 1000
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+# Global write-behind buffer instance
+write_behind = WriteBehindBuffer()
@@ -0,0 +1,77 @@
+"""
+Read-through cache of serialized zone listings
+"""
+from typing import Awaitable, Callable, Hashable
+from fastapi import Request, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config import settings
+from app.services.version_service import collection_versions
+from app.utils.cache import LRUCache
+from app.utils.http_cache import build_etag, cache_headers, etag_matches, not_modified
+from app.utils.metrics import metrics
+from app.utils.serialization import JSONBytesResponse
+
+
+class ZoneCacheService:
+    """
+    Keeps encoded zone list responses until the zone set changes
+
+    Entries are keyed by the request's filters and the "risk_zones"
+    collection version, which recalculate_risk_zones bumps after writing.
+    A new version therefore never serves an old entry. The same version
+    also backs the ETag, so clients polling with If-None-Match get a 304
+    without a query or a body.
+    """
+
+    VERSION_NAME = "risk_zones"
+
+    def __init__(self):
+        self._entries = LRUCache(settings.ZONE_CACHE_MAX_ENTRIES)
+        self._requests = metrics.counter(
+            "cache_requests_total", "Cache lookups by cache and result (hit, miss, not_modified)"
+        )
+        metrics.gauge("zone_cache_entries", "Zone listings held in the zone cache").set_function(
+            lambda: len(self._entries)
+        )
+        collection_versions.on_change(self._on_version_change)
+
+    def _on_version_change(self, name: str, version: int):
+        # Entries for older versions can never be served again
+        if name == self.VERSION_NAME:
+            self._entries.clear()
+
+    async def respond(
+        self,
+        request: Request,
+        db: AsyncIOMotorDatabase,
+        key: Hashable,
+        load: Callable[[], Awaitable[bytes]]
+    ) -> Response:
+        """
+        Serve a zone listing from cache, loading it on a miss
+
+        Args:
+            request: Incoming request (for If-None-Match)
+            db: Database instance
+            key: Hashable description of the listing's filters
+            load: Coroutine function returning the encoded JSON body
+        """
+        version = await collection_versions.get(db, self.VERSION_NAME)
+        etag = build_etag(self.VERSION_NAME, version, key)
+        if etag_matches(request, etag):
+            self._requests.inc(cache="zones", result="not_modified")
+            return not_modified(etag)
+
+        body = self._entries.get((version, key))
+        if body is None:
+            self._requests.inc(cache="zones", result="miss")
+            body = await load()
+            self._entries.set((version, key), body)
+        else:
+            self._requests.inc(cache="zones", result="hit")
+
+        return JSONBytesResponse(body, headers=cache_headers(etag))
+
+
+# Global zone cache instance
+zone_cache = ZoneCacheService()
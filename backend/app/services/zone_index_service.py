@@ -0,0 +1,126 @@
+"""
+In-memory spatial index over risk zone centers
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config import settings
+from app.utils.geo import PointIndex
+
+
+class ZoneIndexService:
+    """
+    Answers point-in-zone and nearest-zone queries without touching MongoDB
+
+    Zone summaries (without report IDs) are kept in one PointIndex per risk
+    level. The index is rebuilt from the recalculation result in this process
+    and reloaded from the database when it is older than
+    ZONE_INDEX_REFRESH_SECONDS, which picks up runs made by other workers.
+    """
+
+    RISK_LEVELS = ("low", "medium", "high")
+
+    # Zone summary fields kept in memory
+    PROJECTION = {
+        "center_location": 1,
+        "risk_level": 1,
+        "pothole_count": 1,
+        "radius_km": 1
+    }
+
+    def __init__(self):
+        self._zones: Dict[str, Dict] = {}
+        self._by_level: Dict[str, PointIndex] = {}
+        self._max_radius_km = 0.0
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._zones = {}
+        self._by_level = {level: PointIndex(settings.ZONE_INDEX_CELL_KM) for level in self.RISK_LEVELS}
+        self._max_radius_km = 0.0
+
+    def rebuild(self, zones: List[Dict]):
+        """Replace the index contents with the given zone documents"""
+        self._reset()
+        for zone in zones:
+            self.upsert(zone)
+        self._loaded_at = time.monotonic()
+
+    def upsert(self, zone: Dict):
+        """Add or replace a single zone"""
+        zone_id = str(zone["_id"])
+        self.remove(zone_id)
+
+        summary = {
+            "_id": zone_id,
+            "center_location": dict(zone["center_location"]),
+            "risk_level": zone["risk_level"],
+            "pothole_count": zone["pothole_count"],
+            "radius_km": zone.get("radius_km") or settings.ZONE_INDEX_DEFAULT_RADIUS_KM
+        }
+        self._zones[zone_id] = summary
+        self._max_radius_km = max(self._max_radius_km, summary["radius_km"])
+
+        center = summary["center_location"]
+        self._by_level[summary["risk_level"]].insert(zone_id, center["latitude"], center["longitude"])
+
+    def remove(self, zone_id: str):
+        """Remove a single zone if present"""
+        summary = self._zones.pop(zone_id, None)
+        if summary:
+            self._by_level[summary["risk_level"]].remove(zone_id)
+
+    async def ensure_fresh(self, db: AsyncIOMotorDatabase):
+        """Load the index if it is missing or older than the refresh interval"""
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if self._is_stale():
+                zones = await db.risk_zones.find({}, self.PROJECTION).to_list(length=None)
+                self.rebuild(zones)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _is_stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return time.monotonic() - self._loaded_at > settings.ZONE_INDEX_REFRESH_SECONDS
+
+    def lookup(self, latitude: float, longitude: float) -> List[Dict]:
+        """Zones whose extent contains the location, closest center first"""
+        matches = []
+        for index in self._by_level.values():
+            for distance, zone_id in index.within(latitude, longitude, self._max_radius_km):
+                zone = self._zones[zone_id]
+                if distance <= zone["radius_km"]:
+                    matches.append({**zone, "distance_km": round(distance, 4)})
+        matches.sort(key=lambda zone: zone["distance_km"])
+        return matches
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        risk_level: Optional[str] = None
+    ) -> List[Dict]:
+        """The k zones with the closest centers, optionally of one risk level"""
+        levels = [risk_level] if risk_level else self.RISK_LEVELS
+        candidates = []
+        for level in levels:
+            candidates.extend(self._by_level[level].nearest(latitude, longitude, k))
+        candidates.sort(key=lambda item: item[0])
+
+        return [
+            {**self._zones[zone_id], "distance_km": round(distance, 4)}
+            for distance, zone_id in candidates[:k]
+        ]
+
+
+# Global zone index instance
+zone_index = ZoneIndexService()
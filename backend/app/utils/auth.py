@@ -1,30 +1,195 @@
 """
 Authentication and authorization utilities
 """
+import asyncio
+import hashlib
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.config import settings
+from app.config.database import get_database
 from app.models.user import TokenData
+from app.utils.cache import LRUCache
+from app.utils.metrics import metrics
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # HTTP Bearer token security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+class TokenCache:
+    """
+    Bounded cache of already validated tokens, keyed by a token digest
+    
+    Entries expire at the token's exp claim or after JWT_CACHE_TTL_SECONDS,
+    whichever comes first. revoke() and revoke_user() are the hooks for
+    logout or role changes; they act on this worker only.
+    """
+    
+    def __init__(self):
+        self._entries = LRUCache(settings.JWT_CACHE_MAX_ENTRIES)
+        self._revoked: Dict[bytes, float] = {}
+        self._requests = metrics.counter(
+            "cache_requests_total", "Cache lookups by cache and result (hit, miss, not_modified)"
+        )
+        metrics.gauge("jwt_cache_entries", "Validated tokens held in the token cache").set_function(
+            lambda: len(self._entries)
+        )
+    
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[TokenData]:
+        entry: Optional[Tuple[TokenData, float]] = self._entries.get(key)
+        if entry is not None:
+            token_data, expires_at = entry
+            if time.time() < expires_at:
+                self._requests.inc(cache="jwt", result="hit")
+                return token_data
+            self._entries.pop(key)
+        self._requests.inc(cache="jwt", result="miss")
+        return None
+    
+    def put(self, key: bytes, token_data: TokenData, exp: float):
+        if settings.JWT_CACHE_TTL_SECONDS > 0:
+            self._entries.set(key, (token_data, min(exp, time.time() + settings.JWT_CACHE_TTL_SECONDS)))
+    
+    def is_revoked(self, key: bytes) -> bool:
+        return key in self._revoked
+    
+    def revoke(self, token: str):
+        """Reject a token from now on, until it expires"""
+        try:
+            exp = float(jwt.get_unverified_claims(token).get("exp", 0))
+        except JWTError:
+            return
+        now = time.time()
+        self._revoked = {key: until for key, until in self._revoked.items() if until > now}
+        key = self.digest(token)
+        self._entries.pop(key)
+        if exp > now:
+            self._revoked[key] = exp
+    
+    def revoke_user(self, user_id: str):
+        """Drop cached tokens of a user so their claims are decoded again"""
+        for key, (token_data, _) in self._entries.items():
+            if token_data.user_id == user_id:
+                self._entries.pop(key)
+    
+    def clear(self):
+        self._entries.clear()
+
+
+# Global validated-token cache
+token_cache = TokenCache()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool instead of the event loop
+    
+    PASSWORD_HASH_WORKERS threads hash in parallel (bcrypt releases the
+    GIL). At most PASSWORD_HASH_MAX_PENDING calls may be queued or running;
+    beyond that a call fails fast with 503 and Retry-After, so a login
+    burst queues here rather than stalling other routes.
+    """
+    
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._queue_time = metrics.histogram(
+            "password_hash_queue_seconds", "Time a hash or verify call waited for a hashing thread",
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+        )
+        self._duration = metrics.histogram(
+            "password_hash_duration_seconds", "Time spent inside bcrypt per call"
+        )
+        self._rejected = metrics.counter(
+            "password_hash_rejected_total", "Hash or verify calls refused because the queue was full"
+        )
+        metrics.gauge("password_hash_pending", "Hash or verify calls queued or running").set_function(
+            lambda: self._pending
+        )
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        return self._executor
+    
+    async def _run(self, operation: str, func: Callable, *args):
+        if self._pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            self._rejected.inc(operation=operation)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests in progress, please retry",
+                headers={"Retry-After": "1"}
+            )
+        
+        queued_at = time.perf_counter()
+        
+        def timed():
+            started = time.perf_counter()
+            self._queue_time.observe(started - queued_at, operation=operation)
+            try:
+                return func(*args)
+            finally:
+                self._duration.observe(time.perf_counter() - started, operation=operation)
+        
+        loop = asyncio.get_running_loop()
+        
+        def release(_):
+            # Runs when the hash finishes or is dequeued, even if the caller is gone
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                pass  # Loop already closed
+        
+        self._pending += 1
+        future = self._pool().submit(timed)
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+    
+    def _release(self):
+        self._pending -= 1
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", pwd_context.verify, plain_password, hashed_password)
+    
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", pwd_context.hash, password)
+    
+    def shutdown(self):
+        """Wait for running hashes and release the threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
 
 
-def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    return pwd_context.hash(password)
+# Global password hashing pool
+password_hasher = PasswordHasher()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (on the hashing pool)"""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    """Generate password hash (on the hashing pool)"""
+    return await password_hasher.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -51,7 +216,18 @@ def create_refresh_token(data: dict) -> str:
 
 
 def decode_token(token: str) -> TokenData:
-    """Decode and validate JWT token"""
+    """Decode and validate JWT token (served from token_cache when seen before)"""
+    key = token_cache.digest(token)
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    if token_cache.is_revoked(key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         user_id: str = payload.get("sub")
@@ -64,7 +240,10 @@ def decode_token(token: str) -> TokenData:
                 detail="Invalid token payload"
             )
         
-        return TokenData(user_id=user_id, email=email, role=role)
+        token_data = TokenData(user_id=user_id, email=email, role=role)
+        if payload.get("exp") is not None:
+            token_cache.put(key, token_data, float(payload["exp"]))
+        return token_data
     
     except JWTError:
         raise HTTPException(
@@ -79,6 +258,56 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return decode_token(token)
 
 
+def _ticket_id(ticket: str) -> str:
+    # Only a digest is stored, so the collection holds nothing usable
+    return hashlib.blake2b(ticket.encode(), digest_size=16).hexdigest()
+
+
+async def issue_stream_ticket(db: AsyncIOMotorDatabase, user: TokenData) -> str:
+    """
+    Single-use ticket that opens one stream as this user
+    
+    For clients that cannot set headers (EventSource). Unlike an access
+    token in the URL, a ticket that ends up in an access log is already
+    spent, or expires within EVENT_STREAM_TICKET_SECONDS.
+    """
+    ticket = secrets.token_urlsafe(32)
+    await db.stream_tickets.insert_one({
+        "_id": _ticket_id(ticket),
+        "user_id": user.user_id,
+        "email": user.email,
+        "role": user.role,
+        "expires_at": datetime.utcnow() + timedelta(seconds=settings.EVENT_STREAM_TICKET_SECONDS)
+    })
+    return ticket
+
+
+async def get_stream_user(
+    ticket: Optional[str] = Query(None, description="Stream ticket from POST /events/ticket, for clients that cannot set headers (EventSource)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncIOMotorDatabase = Depends(get_database)
+) -> TokenData:
+    """Get the user of a streaming request from the Authorization header or a stream ticket"""
+    if credentials:
+        return decode_token(credentials.credentials)
+    if ticket:
+        # Deleting it on use makes the ticket single-use across workers
+        doc = await db.stream_tickets.find_one_and_delete(
+            {"_id": _ticket_id(ticket), "expires_at": {"$gt": datetime.utcnow()}}
+        )
+        if doc is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Stream ticket is invalid, used or expired"
+            )
+        return TokenData(user_id=doc["user_id"], email=doc["email"], role=doc["role"])
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
 async def require_authority(current_user: TokenData = Depends(get_current_user)) -> TokenData:
     """Require authority role for endpoint access"""
     if current_user.role != "authority":
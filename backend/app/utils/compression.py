@@ -0,0 +1,183 @@
+"""
+Negotiated gzip / brotli response compression
+"""
+import gzip
+import zlib
+from typing import List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+# Media types worth compressing (images, Parquet etc. are already compressed)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/geo+json",
+    "application/x-ndjson",
+    "text/plain",
+    "text/html",
+    "text/css",
+    "application/javascript"
+)
+
+
+def supported_codings() -> List[str]:
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported coding from an Accept-Encoding header (br over gzip at equal q)"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in supported_codings():
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Encoder:
+    def __init__(self, coding: str):
+        self.coding = coding
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush so a streamed chunk reaches the client now"""
+        if self.coding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.coding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+    def whole(self, data: bytes) -> bytes:
+        if self.coding == "br":
+            return brotli.compress(data, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return gzip.compress(data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON and text responses for clients that accept it
+
+    Bodies under COMPRESSION_MIN_BYTES are sent as they are. Streaming
+    responses are compressed chunk by chunk. Every response of a
+    compressible type carries Vary: Accept-Encoding, whether or not it was
+    compressed, so shared caches keep the representations apart. Compressed
+    responses also get an ETag suffixed with the coding, so each
+    representation has its own strong validator.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._bytes = metrics.counter(
+            "compression_bytes_total", "Response body bytes before (stage=in) and after (stage=out) compression"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(send, coding, self._bytes)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, coding: Optional[str], counter):
+        self._send = send
+        self._coding = coding
+        self._counter = counter
+        self._start: Optional[Message] = None
+        self._encoder: Optional[_Encoder] = None
+        self._passthrough = False
+
+    def _eligible(self, headers: Headers) -> bool:
+        if self._start["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in COMPRESSIBLE_TYPES
+
+    def _set_headers(self, headers: MutableHeaders, length: Optional[int]):
+        headers["Content-Encoding"] = self._coding
+        if length is None:
+            if "content-length" in headers:
+                del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        etag = headers.get("etag")
+        if etag and etag.endswith('"'):
+            headers["ETag"] = f'{etag[:-1]}-{self._coding}"'
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self._start = message
+            eligible = self._eligible(Headers(raw=message["headers"]))
+            if eligible:
+                # The body would differ for another Accept-Encoding, even when this one is not compressed
+                MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+            self._passthrough = not eligible or self._coding is None
+            if self._passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._encoder is None:
+            if not more_body:
+                # Whole body in one message: compress only if it is worth it
+                if len(body) < settings.COMPRESSION_MIN_BYTES:
+                    self._passthrough = True
+                    await self._send(self._start)
+                    await self._send(message)
+                    return
+                compressed = _Encoder(self._coding).whole(body)
+                self._count(len(body), len(compressed))
+                self._set_headers(MutableHeaders(scope=self._start), len(compressed))
+                await self._send(self._start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming response: length unknown, compress as it goes
+            self._encoder = _Encoder(self._coding)
+            self._set_headers(MutableHeaders(scope=self._start), None)
+            await self._send(self._start)
+
+        data = self._encoder.chunk(body) if body else b""
+        if not more_body:
+            data += self._encoder.finish()
+        self._count(len(body), len(data))
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _count(self, raw: int, compressed: int):
+        self._counter.inc(raw, coding=self._coding, stage="in")
+        self._counter.inc(compressed, coding=self._coding, stage="out")
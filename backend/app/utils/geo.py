@@ -0,0 +1,468 @@
+"""
+Geographic helpers for distance calculation, point clustering and spatial lookup
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Mean Earth radius in kilometers
+EARTH_RADIUS_KM = 6371.0
+
+# Reports are clustered as (latitude, longitude) pairs
+Point = Tuple[float, float]
+Cell = Tuple[int, int, int]
+
+# Grid cells are sized so that their diagonal is just below the linking
+# distance: every point in a cell is then within radius of every other one,
+# and linked points are at most two cells apart along each axis.
+_CELL_SHRINK = 1.0 - 1e-9
+_CELL_REACH = 2
+
+# Half of the neighbourhood offsets, so each pair of cells is compared once
+_NEIGHBOUR_OFFSETS = [
+    (dx, dy, dz)
+    for dx in range(-_CELL_REACH, _CELL_REACH + 1)
+    for dy in range(-_CELL_REACH, _CELL_REACH + 1)
+    for dz in range(-_CELL_REACH, _CELL_REACH + 1)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calculate distance between two GPS coordinates using Haversine formula
+
+    Returns:
+        float: Distance in kilometers
+    """
+    lat1 = math.radians(lat1)
+    lon1 = math.radians(lon1)
+    lat2 = math.radians(lat2)
+    lon2 = math.radians(lon2)
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def chord_km(arc_km: float) -> float:
+    """Straight-line (chord) length of a great-circle arc, in kilometers"""
+    half_angle = min(arc_km / (2 * EARTH_RADIUS_KM), math.pi / 2)
+    return 2 * EARTH_RADIUS_KM * math.sin(half_angle)
+
+
+def cell_size_km(radius_km: float) -> float:
+    """Edge length of the clustering grid for a given linking radius"""
+    return chord_km(radius_km) / math.sqrt(3) * _CELL_SHRINK
+
+
+def grid_cell(latitude: float, longitude: float, cell_km: float) -> Cell:
+    """Map a coordinate onto a cell of a 3D grid laid over the Earth's surface"""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (
+        math.floor(EARTH_RADIUS_KM * cos_lat * math.cos(lon) / cell_km),
+        math.floor(EARTH_RADIUS_KM * cos_lat * math.sin(lon) / cell_km),
+        math.floor(EARTH_RADIUS_KM * math.sin(lat) / cell_km),
+    )
+
+
+# Bounding box polygons follow the box's parallels in steps of this many
+# degrees of longitude, and are padded by more than the geodesic edges can
+# bulge between vertices (about 0.001 degrees) so they never cut into the box
+_BBOX_EDGE_STEP_DEG = 1.0
+_BBOX_PAD_DEG = 0.01
+
+
+def bbox_polygon(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> Dict:
+    """
+    GeoJSON Polygon covering a bounding box, for the 2dsphere index
+
+    Polygon edges are geodesics, not parallels, so the polygon is slightly
+    larger than the box; combine it with bbox_range_filter for exact
+    results (see bbox_query). A box whose min_lon exceeds max_lon wraps
+    across the antimeridian.
+    """
+    span = (max_lon - min_lon) % 360 if min_lon != max_lon else 0.0
+    steps = max(math.ceil(span / _BBOX_EDGE_STEP_DEG), 1)
+    longitudes = [min_lon + span * i / steps for i in range(steps + 1)]
+    longitudes = [lon - 360 if lon > 180 else lon for lon in longitudes]
+
+    bottom = max(min_lat - _BBOX_PAD_DEG, -90.0)
+    top = min(max_lat + _BBOX_PAD_DEG, 90.0)
+    ring = [[lon, bottom] for lon in longitudes] + [[lon, top] for lon in reversed(longitudes)]
+    ring.append(ring[0])
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+def bbox_range_filter(field: str, bbox: Tuple[float, float, float, float]) -> Dict:
+    """Latitude/longitude range filter on an embedded location for a parsed bounding box"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    query = {f"{field}.latitude": {"$gte": min_lat, "$lte": max_lat}}
+
+    if min_lon <= max_lon:
+        query[f"{field}.longitude"] = {"$gte": min_lon, "$lte": max_lon}
+    else:
+        # Box crosses the antimeridian
+        query["$or"] = [
+            {f"{field}.longitude": {"$gte": min_lon}},
+            {f"{field}.longitude": {"$lte": max_lon}}
+        ]
+
+    return query
+
+
+def bbox_query(geo_field: str, location_field: str, bbox: Tuple[float, float, float, float]) -> Dict:
+    """Bounding box filter: 2dsphere polygon for the index, flat ranges for the exact edges"""
+    query = {geo_field: {"$geoWithin": {"$geometry": bbox_polygon(*bbox)}}}
+    query.update(bbox_range_filter(location_field, bbox))
+    return query
+
+
+def bbox_contains(bbox: Tuple[float, float, float, float], latitude: float, longitude: float) -> bool:
+    """Whether a point lies in a (min_lon, min_lat, max_lon, max_lat) box, which may cross the antimeridian"""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    if not min_lat <= latitude <= max_lat:
+        return False
+    if min_lon <= max_lon:
+        return min_lon <= longitude <= max_lon
+    return longitude >= min_lon or longitude <= max_lon
+
+
+class DisjointSet:
+    """Union-find over integer keys with path halving"""
+
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets holding a and b; returns False if already merged"""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        # Keep the smallest key as root so results do not depend on merge order
+        if root_b < root_a:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        return True
+
+
+def _cells_linked(
+    points: Sequence[Point],
+    members_a: List[int],
+    members_b: List[int],
+    radius_km: float,
+) -> bool:
+    """Check whether any point of one cell is within radius of the other cell"""
+    for i in members_a:
+        lat1, lon1 = points[i]
+        for j in members_b:
+            lat2, lon2 = points[j]
+            if haversine_km(lat1, lon1, lat2, lon2) <= radius_km:
+                return True
+    return False
+
+
+def _link_grid(
+    points: Sequence[Point],
+    grid: Dict[Cell, List[int]],
+    radius_km: float,
+    dsu: DisjointSet,
+) -> None:
+    """Union every pair of points within radius_km, using the grid to prune pairs"""
+    for members in grid.values():
+        first = members[0]
+        for other in members[1:]:
+            dsu.union(first, other)
+
+    for cell, members in grid.items():
+        cx, cy, cz = cell
+        for dx, dy, dz in _NEIGHBOUR_OFFSETS:
+            neighbour = grid.get((cx + dx, cy + dy, cz + dz))
+            if neighbour is None:
+                continue
+            if dsu.find(members[0]) == dsu.find(neighbour[0]):
+                continue
+            if _cells_linked(points, members, neighbour, radius_km):
+                dsu.union(members[0], neighbour[0])
+
+
+def _collect_clusters(dsu: DisjointSet, count: int) -> List[List[int]]:
+    """Group indices by root, ordered by each cluster's first index"""
+    clusters: Dict[int, List[int]] = {}
+    for index in range(count):
+        clusters.setdefault(dsu.find(index), []).append(index)
+    return sorted(clusters.values(), key=lambda members: members[0])
+
+
+def cluster_points(points: Sequence[Point], radius_km: float) -> List[List[int]]:
+    """
+    Group points into clusters of neighbours within radius_km (single linkage)
+
+    Two points share a cluster when they are connected by a chain of points
+    that are each within radius_km of the next. The result does not depend on
+    input order beyond the ordering of the output itself.
+
+    Args:
+        points: (latitude, longitude) pairs
+        radius_km: Linking distance in kilometers
+
+    Returns:
+        List of clusters as lists of point indices, each sorted ascending,
+        ordered by their smallest index
+    """
+    cell_km = cell_size_km(radius_km)
+    grid: Dict[Cell, List[int]] = {}
+    for index, (lat, lon) in enumerate(points):
+        grid.setdefault(grid_cell(lat, lon, cell_km), []).append(index)
+
+    dsu = DisjointSet()
+    _link_grid(points, grid, radius_km, dsu)
+    return _collect_clusters(dsu, len(points))
+
+
+def _cluster_tile(task: Tuple[List[int], List[Point], float]) -> List[List[int]]:
+    """Cluster the points of one tile; runs inside a worker process"""
+    indices, points, radius_km = task
+    local = cluster_points(points, radius_km)
+    return [[indices[i] for i in members] for members in local]
+
+
+def cluster_points_parallel(
+    points: Sequence[Point],
+    radius_km: float,
+    workers: int = 0,
+    tile_km: float = 20.0,
+) -> List[List[int]]:
+    """
+    Cluster points on several cores; output is identical to cluster_points
+
+    Points are partitioned into cubic tiles of the clustering grid. Each tile
+    is clustered independently in a process pool, then clusters that touch
+    across a tile border are merged with a union-find pass over the grid cells
+    along tile faces.
+
+    Args:
+        points: (latitude, longitude) pairs
+        radius_km: Linking distance in kilometers
+        workers: Number of worker processes (0 uses every core)
+        tile_km: Approximate tile edge length in kilometers
+    """
+    workers = workers or os.cpu_count() or 1
+    cell_km = cell_size_km(radius_km)
+    cells_per_tile = max(int(tile_km / cell_km), _CELL_REACH)
+
+    grid: Dict[Cell, List[int]] = {}
+    for index, (lat, lon) in enumerate(points):
+        grid.setdefault(grid_cell(lat, lon, cell_km), []).append(index)
+
+    def tile_of(cell: Cell) -> Cell:
+        return (
+            cell[0] // cells_per_tile,
+            cell[1] // cells_per_tile,
+            cell[2] // cells_per_tile,
+        )
+
+    tiles: Dict[Cell, List[int]] = {}
+    for cell, members in grid.items():
+        tiles.setdefault(tile_of(cell), []).extend(members)
+
+    # Largest tiles first so the pool stays busy until the end
+    tasks = [
+        (members, [points[i] for i in members], radius_km)
+        for members in sorted(tiles.values(), key=len, reverse=True)
+    ]
+
+    dsu = DisjointSet()
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            tile_clusters = pool.map(_cluster_tile, tasks)
+            for clusters in tile_clusters:
+                for members in clusters:
+                    for other in members[1:]:
+                        dsu.union(members[0], other)
+    else:
+        for task in tasks:
+            for members in _cluster_tile(task):
+                for other in members[1:]:
+                    dsu.union(members[0], other)
+
+    def near_face(coordinate: int) -> bool:
+        offset = coordinate % cells_per_tile
+        return offset < _CELL_REACH or offset >= cells_per_tile - _CELL_REACH
+
+    # Merge clusters across tile borders; only cells near a face can link
+    for cell, members in grid.items():
+        cx, cy, cz = cell
+        if not (near_face(cx) or near_face(cy) or near_face(cz)):
+            continue
+        tile = tile_of(cell)
+        for dx, dy, dz in _NEIGHBOUR_OFFSETS:
+            neighbour_cell = (cx + dx, cy + dy, cz + dz)
+            if tile_of(neighbour_cell) == tile:
+                continue
+            neighbour = grid.get(neighbour_cell)
+            if neighbour is None:
+                continue
+            if dsu.find(members[0]) == dsu.find(neighbour[0]):
+                continue
+            if _cells_linked(points, members, neighbour, radius_km):
+                dsu.union(members[0], neighbour[0])
+
+    return _collect_clusters(dsu, len(points))
+
+
+def _shell_offsets(step: int):
+    """Cell offsets at exactly Chebyshev distance step from the origin"""
+    if step == 0:
+        yield (0, 0, 0)
+        return
+    for dx in range(-step, step + 1):
+        for dy in range(-step, step + 1):
+            if abs(dx) == step or abs(dy) == step:
+                for dz in range(-step, step + 1):
+                    yield (dx, dy, dz)
+            else:
+                yield (dx, dy, -step)
+                yield (dx, dy, step)
+
+
+class PointIndex:
+    """
+    Grid index over keyed points for radius and nearest-neighbour queries
+
+    Points are kept in a fine grid for radius queries and a coarse grid so
+    nearest-neighbour searches stay cheap where points are sparse. Points can
+    be inserted and removed individually, so the index can be patched in
+    place instead of rebuilt.
+    """
+
+    # Scanning more cells than there are points is slower than a full scan
+    BRUTE_FORCE_LIMIT = 256
+    COARSE_FACTOR = 16
+    FINE_SCAN_BUDGET = 343  # Shells 0-3 of the fine grid
+
+    def __init__(self, cell_km: float = 2.0):
+        self.cell_km = cell_km
+        self.coarse_cell_km = cell_km * self.COARSE_FACTOR
+        self._cells: Dict[Cell, Dict[object, Point]] = {}
+        self._coarse_cells: Dict[Cell, Dict[object, Point]] = {}
+        self._points: Dict[object, Tuple[Point, Cell, Cell]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def insert(self, key, latitude: float, longitude: float):
+        """Add a point, replacing any previous point with the same key"""
+        self.remove(key)
+        point = (latitude, longitude)
+        cell = grid_cell(latitude, longitude, self.cell_km)
+        coarse_cell = grid_cell(latitude, longitude, self.coarse_cell_km)
+        self._cells.setdefault(cell, {})[key] = point
+        self._coarse_cells.setdefault(coarse_cell, {})[key] = point
+        self._points[key] = (point, cell, coarse_cell)
+
+    def remove(self, key):
+        """Remove a point if present"""
+        entry = self._points.pop(key, None)
+        if entry is None:
+            return
+        _, cell, coarse_cell = entry
+        for cells, cell_key in ((self._cells, cell), (self._coarse_cells, coarse_cell)):
+            members = cells[cell_key]
+            del members[key]
+            if not members:
+                del cells[cell_key]
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[float, object]]:
+        """Keys of points within radius_km, as (distance_km, key) sorted by distance"""
+        cx, cy, cz = grid_cell(latitude, longitude, self.cell_km)
+        reach = math.ceil(chord_km(radius_km) / self.cell_km)
+        found = []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                for dz in range(-reach, reach + 1):
+                    members = self._cells.get((cx + dx, cy + dy, cz + dz))
+                    if not members:
+                        continue
+                    for key, (lat, lon) in members.items():
+                        distance = haversine_km(latitude, longitude, lat, lon)
+                        if distance <= radius_km:
+                            found.append((distance, key))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> List[Tuple[float, object]]:
+        """The k closest points, as (distance_km, key) sorted by distance"""
+        if len(self._points) <= self.BRUTE_FORCE_LIMIT:
+            return self._nearest_brute_force(latitude, longitude, k)
+
+        for cells, cell_km, budget in (
+            (self._cells, self.cell_km, self.FINE_SCAN_BUDGET),
+            (self._coarse_cells, self.coarse_cell_km, len(self._points)),
+        ):
+            found = self._nearest_in_grid(cells, cell_km, budget, latitude, longitude, k)
+            if found is not None:
+                return found
+
+        return self._nearest_brute_force(latitude, longitude, k)
+
+    def _nearest_in_grid(
+        self,
+        cells: Dict[Cell, Dict[object, Point]],
+        cell_km: float,
+        budget: int,
+        latitude: float,
+        longitude: float,
+        k: int,
+    ) -> Optional[List[Tuple[float, object]]]:
+        """Expand shells around the query cell; None if the budget runs out"""
+        cx, cy, cz = grid_cell(latitude, longitude, cell_km)
+        max_step = math.ceil(2 * EARTH_RADIUS_KM / cell_km) + 1
+        found: List[Tuple[float, object]] = []
+        scanned = 0
+
+        for step in range(max_step + 1):
+            for dx, dy, dz in _shell_offsets(step):
+                scanned += 1
+                members = cells.get((cx + dx, cy + dy, cz + dz))
+                if not members:
+                    continue
+                for key, (lat, lon) in members.items():
+                    found.append((haversine_km(latitude, longitude, lat, lon), key))
+
+            if len(found) >= k:
+                found.sort(key=lambda item: item[0])
+                found = found[:k]
+                # Points in unscanned cells are at least step cells away
+                bound = min(step * cell_km / (2 * EARTH_RADIUS_KM), 1.0)
+                if found[-1][0] <= 2 * EARTH_RADIUS_KM * math.asin(bound):
+                    return found
+
+            if scanned > budget:
+                return None
+
+        found.sort(key=lambda item: item[0])
+        return found[:k]
+
+    def _nearest_brute_force(self, latitude: float, longitude: float, k: int) -> List[Tuple[float, object]]:
+        distances = [
+            (haversine_km(latitude, longitude, lat, lon), key)
+            for key, ((lat, lon), _, _) in self._points.items()
+        ]
+        distances.sort(key=lambda item: item[0])
+        return distances[:k]
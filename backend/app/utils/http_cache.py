@@ -0,0 +1,42 @@
+"""
+ETag helpers for conditional GET requests
+"""
+import hashlib
+from typing import Dict
+from fastapi import Request, Response
+
+# Suffixes CompressionMiddleware appends to the ETag of compressed bodies
+_CODING_SUFFIXES = ('-br"', '-gzip"')
+
+
+def build_etag(*parts) -> str:
+    """Strong ETag derived from the given values (e.g. a version and a filter)"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _strip_coding(tag: str) -> str:
+    for suffix in _CODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header covers the given ETag (in any coding)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(_strip_coding(tag.removeprefix("W/")) == etag for tag in candidates)
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Headers for a revalidatable response: clients must check the ETag before reuse"""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,36 @@
+"""
+Deferred imports for heavy optional modules
+"""
+import importlib
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule:
+    """
+    Stands in for a module and imports it on first attribute access
+
+    Used for OpenCV, numpy and Pillow, which take tens of megabytes and a
+    noticeable part of startup but are only needed to handle uploads.
+    Type annotations that mention the module must be strings (or the file
+    must use `from __future__ import annotations`) so they do not trigger
+    the import at definition time.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
@@ -0,0 +1,369 @@
+"""
+In-process metrics registry (counters, gauges and histograms)
+"""
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; only gunicorn shares metrics across workers
+    fcntl = None
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        with self._lock:
+            return list(self._values.items())
+
+
+class Gauge(Counter):
+    """Value that can go up and down, or be read from a callback"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._callback: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, callback: Callable[[], float]):
+        """Read the (unlabelled) value from callback at collection time"""
+        self._callback = callback
+
+    def samples(self) -> List[Tuple[LabelKey, float]]:
+        if self._callback is not None:
+            return [((), float(self._callback()))]
+        return super().samples()
+
+
+class Histogram:
+    """Bucketed distribution of observed values per label set"""
+
+    kind = "histogram"
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, Dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+                    break
+            series["count"] += 1
+            series["sum"] += value
+
+    def samples(self) -> List[Tuple[LabelKey, Dict]]:
+        """Per label set: cumulative bucket counts, total count and sum"""
+        with self._lock:
+            result = []
+            for key, series in self._series.items():
+                cumulative, running = [], 0
+                for count in series["counts"]:
+                    running += count
+                    cumulative.append(running)
+                result.append((key, {
+                    "buckets": dict(zip(self.buckets, cumulative)),
+                    "count": series["count"],
+                    "sum": series["sum"]
+                }))
+            return result
+
+
+class MetricsRegistry:
+    """Named metrics shared by the whole process"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, description, **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def collect(self) -> List[object]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def exposition(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for metric in self.collect():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in metric.samples():
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{_format_labels(key)} {_format_value(value)}")
+                    continue
+                for bound, count in value["buckets"].items():
+                    bucket_key = key + (("le", _format_value(bound)),)
+                    lines.append(f"{metric.name}_bucket{_format_labels(bucket_key)} {count}")
+                lines.append(f"{metric.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {value['count']}")
+                lines.append(f"{metric.name}_sum{_format_labels(key)} {_format_value(value['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """All metrics as plain data, keyed by name"""
+        result = {}
+        for metric in self.collect():
+            result[metric.name] = {
+                "type": metric.kind,
+                "description": metric.description,
+                "samples": [
+                    {"labels": dict(key), "value": value}
+                    for key, value in metric.samples()
+                ]
+            }
+        return result
+
+    def dump(self) -> Dict[str, Dict]:
+        """Samples as JSON-safe data that merge() can combine across processes"""
+        result = {}
+        for metric in self.collect():
+            entry = {"type": metric.kind, "description": metric.description, "samples": []}
+            if metric.kind == "histogram":
+                entry["buckets"] = list(metric.buckets)
+            for key, value in metric.samples():
+                if metric.kind == "histogram":
+                    value = {"buckets": list(value["buckets"].values()), "count": value["count"], "sum": value["sum"]}
+                entry["samples"].append([list(key), value])
+            result[metric.name] = entry
+        return result
+
+
+def merge(dumps: Dict[int, Dict[str, Dict]], live: Sequence[int]) -> MetricsRegistry:
+    """
+    Combine registry dumps of several processes, keyed by process ID
+
+    Counters and histograms are summed. Gauges are per process, so they are
+    labelled with worker="<pid>" and only kept for processes in live.
+    """
+    combined = MetricsRegistry()
+    for pid, dump in sorted(dumps.items()):
+        for name, entry in dump.items():
+            kind = entry["type"]
+            if kind == "gauge":
+                if pid not in live:
+                    continue
+                gauge = combined.gauge(name, entry["description"])
+                for key, value in entry["samples"]:
+                    gauge.set(value, **dict(key), worker=pid)
+            elif kind == "counter":
+                counter = combined.counter(name, entry["description"])
+                for key, value in entry["samples"]:
+                    counter.inc(value, **dict(key))
+            else:
+                histogram = combined.histogram(name, entry["description"], buckets=entry["buckets"])
+                for key, value in entry["samples"]:
+                    series = histogram._series.setdefault(
+                        _label_key(dict(key)), {"counts": [0] * len(histogram.buckets), "count": 0, "sum": 0.0}
+                    )
+                    previous = 0
+                    for index, cumulative in enumerate(value["buckets"]):
+                        series["counts"][index] += cumulative - previous
+                        previous = cumulative
+                    series["count"] += value["count"]
+                    series["sum"] += value["sum"]
+    return combined
+
+
+class SharedMetrics:
+    """
+    Registries of all worker processes, exchanged through a directory
+
+    Each worker writes its dump to <directory>/<pid>.json. Counters and
+    histograms of exited workers are folded into retired.json and their
+    files deleted, so summed counters never go backwards and the directory
+    does not grow with every restart. Clear the directory when the server
+    starts (gunicorn.conf.py does).
+    """
+
+    RETIRED_FILE = "retired.json"
+    LOCK_FILE = "retired.lock"
+
+    def __init__(self, registry: MetricsRegistry, directory: str):
+        self.registry = registry
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._written = False
+
+    def write(self):
+        """Publish this process's metrics"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        with self._lock:
+            if not self._written:
+                # A file under our PID before our first write is a dead worker's
+                self._retire([os.getpid()])
+                self._written = True
+            # Readers never see a half-written file
+            _write_json(path, self.registry.dump())
+
+    def combined(self) -> MetricsRegistry:
+        """This process's current metrics merged with every other worker's last dump"""
+        self.write()
+        dead = [pid for pid in self._pids() if not _alive(pid)]
+        if dead:
+            self._retire(dead)
+        # Not while a retirement has folded dumps but not yet deleted them
+        with self._file_lock(shared=True):
+            dumps = self._read_dumps()
+            retired = _read_json(os.path.join(self.directory, self.RETIRED_FILE))
+        if retired is not None:
+            # Never a live PID, so only its counters and histograms count
+            dumps[0] = retired
+        return merge(dumps, [pid for pid in dumps if pid and _alive(pid)])
+
+    def _pids(self) -> List[int]:
+        pids = []
+        for filename in os.listdir(self.directory):
+            pid, extension = os.path.splitext(filename)
+            if extension == ".json" and pid.isdigit():
+                pids.append(int(pid))
+        return pids
+
+    def _read_dumps(self) -> Dict[int, Dict[str, Dict]]:
+        dumps = {}
+        for pid in self._pids():
+            dump = _read_json(os.path.join(self.directory, f"{pid}.json"))
+            if dump is not None:
+                dumps[pid] = dump
+        return dumps
+
+    def _retire(self, pids: Sequence[int]):
+        """Fold the dumps of exited processes into retired.json and delete them"""
+        with self._file_lock(shared=False):
+            # Another worker may have retired them, or a new process reused the PID
+            pids = [pid for pid in pids if pid == os.getpid() or not _alive(pid)]
+            paths = [os.path.join(self.directory, f"{pid}.json") for pid in pids]
+            dumps = {pid: _read_json(path) for pid, path in zip(pids, paths) if os.path.exists(path)}
+            if not dumps:
+                return
+            retired_path = os.path.join(self.directory, self.RETIRED_FILE)
+            retired = _read_json(retired_path)
+            if retired is not None:
+                dumps[0] = retired
+            _write_json(retired_path, merge({pid: dump for pid, dump in dumps.items() if dump}, []).dump())
+            for pid in dumps:
+                if pid:
+                    os.remove(os.path.join(self.directory, f"{pid}.json"))
+
+    @contextmanager
+    def _file_lock(self, shared: bool) -> Iterator[None]:
+        with open(os.path.join(self.directory, self.LOCK_FILE), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+
+    @staticmethod
+    def reset(directory: str):
+        """Remove all dumps, e.g. when the server (re)starts"""
+        if not os.path.isdir(directory):
+            return
+        for filename in os.listdir(directory):
+            if filename.endswith((".json", ".tmp", ".lock")):
+                os.remove(os.path.join(directory, filename))
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict):
+    # Unique temp name: several processes may write the same file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
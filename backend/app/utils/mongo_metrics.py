@@ -0,0 +1,101 @@
+"""
+pymongo event listeners that feed the metrics registry
+"""
+from pymongo import monitoring
+from app.utils.metrics import metrics
+
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COMMAND_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Connection pool size, usage and checkout wait time per server"""
+
+    def __init__(self):
+        self.checkout_wait = metrics.histogram(
+            "mongodb_pool_checkout_wait_seconds",
+            "Time spent waiting for a pooled connection",
+            buckets=POOL_WAIT_BUCKETS
+        )
+        self.checkout_failures = metrics.counter(
+            "mongodb_pool_checkout_failures_total", "Failed connection checkouts by reason"
+        )
+        self.connections = metrics.gauge("mongodb_pool_connections", "Open pooled connections")
+        self.in_use = metrics.gauge("mongodb_pool_connections_in_use", "Pooled connections checked out")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        if event.duration is not None:
+            self.checkout_wait.observe(event.duration, address=_address(event))
+        self.in_use.inc(address=_address(event))
+
+    def connection_check_out_failed(self, event):
+        if event.duration is not None:
+            self.checkout_wait.observe(event.duration, address=_address(event))
+        self.checkout_failures.inc(address=_address(event), reason=event.reason)
+
+    def connection_checked_in(self, event):
+        self.in_use.dec(address=_address(event))
+
+    def connection_created(self, event):
+        self.connections.inc(address=_address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.connections.dec(address=_address(event))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Command latency and failures by collection and command name"""
+
+    def __init__(self):
+        self.duration = metrics.histogram(
+            "mongodb_command_duration_seconds",
+            "MongoDB command round-trip time by collection and command",
+            buckets=COMMAND_BUCKETS
+        )
+        self.failures = metrics.counter(
+            "mongodb_command_failures_total", "Failed MongoDB commands by collection and command"
+        )
+        # (connection, request id) -> collection; started and finished events arrive in pairs
+        self._collections = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else "-"
+
+    def _collection(self, event) -> str:
+        return self._collections.pop((event.connection_id, event.request_id), "-")
+
+    def succeeded(self, event):
+        self.duration.observe(
+            event.duration_micros / 1e6, collection=self._collection(event), command=event.command_name
+        )
+
+    def failed(self, event):
+        collection = self._collection(event)
+        self.duration.observe(event.duration_micros / 1e6, collection=collection, command=event.command_name)
+        self.failures.inc(collection=collection, command=event.command_name)
@@ -0,0 +1,72 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, Response, status
+
+# Response header carrying the continuation token for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], doc_id: Any) -> str:
+    """Build an opaque continuation token from the last row of a page"""
+    payload = {
+        "v": sort_value.isoformat() if sort_value is not None else None,
+        "i": str(doc_id),
+        "o": isinstance(doc_id, ObjectId)
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], Any]:
+    """Decode a continuation token into (sort value, _id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort_value = datetime.fromisoformat(payload["v"]) if payload["v"] is not None else None
+        doc_id = ObjectId(payload["i"]) if payload["o"] else payload["i"]
+        return sort_value, doc_id
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def apply_cursor(query: Dict, sort_field: str, cursor: Optional[str]) -> Dict:
+    """
+    Restrict a query to rows after the cursor in (sort_field, _id) descending order
+
+    The matching index must end with (sort_field: -1, _id: -1) after the
+    equality filters so each page is a bounded index range scan. Rows with a
+    null sort value come last in that order.
+    """
+    if not cursor:
+        return query
+
+    sort_value, doc_id = decode_cursor(cursor)
+    if sort_value is None:
+        # Nothing sorts below null; only the remaining null rows follow
+        after = {sort_field: None, "_id": {"$lt": doc_id}}
+    else:
+        after = {"$or": [
+            {sort_field: {"$lt": sort_value}},
+            {sort_field: None},
+            {sort_field: sort_value, "_id": {"$lt": doc_id}}
+        ]}
+
+    if "$or" in query:
+        return {"$and": [query, after]}
+    return {**query, **after}
+
+
+def set_next_cursor(response: Response, rows: list, limit: int, sort_field: str):
+    """Expose the continuation token when the page came back full"""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[sort_field], last["_id"])
@@ -0,0 +1,84 @@
+"""
+Opt-in profiling of individual requests
+"""
+import random
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.services.profiling_service import profiler
+from app.utils.auth import decode_token
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Never profiled: the profile endpoints themselves, long-lived streams and scrapes
+EXCLUDED_PREFIXES = (
+    f"{settings.API_V1_PREFIX}/profiles",
+    f"{settings.API_V1_PREFIX}/events",
+    "/metrics"
+)
+
+
+def _is_authority(headers: Headers) -> bool:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        return decode_token(token).role == "authority"
+    except HTTPException:
+        return False
+
+
+def profile_reason(scope: Scope):
+    """Why this request should be profiled ("header" or "sampled"), or None"""
+    if not settings.PROFILE_ENABLED or scope["path"].startswith(EXCLUDED_PREFIXES):
+        return None
+    headers = Headers(scope=scope)
+    if headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes") and _is_authority(headers):
+        return "header"
+    if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests chosen by profile_reason and saves the result
+
+    The response of a profiled request carries X-Profile-Id, the ID to fetch
+    the profile from GET /api/profiles/{profile_id}.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        reason = profile_reason(scope) if scope["type"] == "http" else None
+        profile = await profiler.start(scope["method"], scope["path"], reason) if reason else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_profile_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, profile.id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        except Exception:
+            await self._finish(profile, scope, status_code)
+            raise
+        except BaseException:
+            profiler.abandon(profile)
+            raise
+        await self._finish(profile, scope, status_code)
+
+    async def _finish(self, profile, scope: Scope, status_code: int):
+        route = getattr(scope.get("route"), "path_format", None)
+        await profiler.finish(profile, route, status_code)
@@ -0,0 +1,53 @@
+"""
+Per-route request counts, latency and concurrency
+"""
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.metrics import metrics
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records every HTTP request by method, route template and status
+
+    The route label is the matched path template (e.g.
+    /api/reports/{report_id}), so label cardinality stays bounded;
+    unmatched paths and static files are labelled "unmatched".
+    Duration runs until the last body chunk has been sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._requests = metrics.counter("http_requests_total", "HTTP requests by method, route and status")
+        self._duration = metrics.histogram(
+            "http_request_duration_seconds", "HTTP request latency by method and route", buckets=LATENCY_BUCKETS
+        )
+        self._in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests being handled")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or "unmatched"
+            method = scope["method"]
+            self._requests.inc(method=method, route=template, status=str(status_code))
+            self._duration.observe(elapsed, method=method, route=template)
@@ -0,0 +1,79 @@
+"""
+Fast JSON encoding of MongoDB documents for list endpoints
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+# Rows encoded per chunk when a response is streamed
+STREAM_BATCH_SIZE = 250
+
+
+def _default(value: Any) -> Any:
+    """orjson fallback for BSON types"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode with orjson; ObjectIds become strings, datetimes ISO 8601"""
+    return orjson.dumps(content, default=_default)
+
+
+class DocumentShape:
+    """
+    Reduces raw documents to the fields of a response model
+
+    Missing optional fields are filled with their defaults and nested
+    objects are cut down to their declared keys, so the output matches what
+    the pydantic response model would produce without building one per row.
+    """
+
+    def __init__(self, fields: Dict[str, Any], nested: Optional[Dict[str, Sequence[str]]] = None):
+        self.fields = fields
+        self.nested = nested or {}
+
+    @property
+    def projection(self) -> Dict[str, int]:
+        """MongoDB projection returning only the fields this shape needs"""
+        return {field: 1 for field in self.fields if field != "_id"}
+
+    def __call__(self, doc: Dict) -> Dict:
+        row = {field: doc.get(field, default) for field, default in self.fields.items()}
+        for field, keys in self.nested.items():
+            value = row[field]
+            if value is not None:
+                row[field] = {key: value.get(key) for key in keys}
+        return row
+
+
+class JSONBytesResponse(Response):
+    """Response for a body that has already been encoded as JSON"""
+    media_type = "application/json"
+
+
+def _stream_rows(docs: List[Dict], shape: DocumentShape, batch_size: int) -> Iterator[bytes]:
+    yield b"["
+    for start in range(0, len(docs), batch_size):
+        chunk = dumps([shape(doc) for doc in docs[start:start + batch_size]])
+        yield (b"," if start else b"") + chunk[1:-1]
+    yield b"]"
+
+
+def json_list_response(
+    docs: List[Dict],
+    shape: DocumentShape,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Response:
+    """
+    Encode documents as a JSON array in the given shape
+
+    Small lists are sent in one body. Longer ones are shaped and encoded
+    batch by batch while streaming, off the event loop.
+    """
+    if len(docs) <= batch_size:
+        return JSONBytesResponse(dumps([shape(doc) for doc in docs]))
+    return StreamingResponse(_stream_rows(docs, shape, batch_size), media_type="application/json")
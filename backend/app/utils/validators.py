@@ -2,6 +2,7 @@
 Input validation utilities
 """
 import os
+from typing import Tuple
 from fastapi import UploadFile, HTTPException, status
 
 
@@ -41,3 +42,59 @@ def validate_coordinates(latitude: float, longitude: float) -> None:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Longitude must be between -180 and 180"
         )
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parse a "min_lon,min_lat,max_lon,max_lat" bounding box
+    
+    A box with min_lon greater than max_lon crosses the antimeridian.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox must be min_lon,min_lat,max_lon,max_lat"
+        )
+    
+    validate_coordinates(min_lat, min_lon)
+    validate_coordinates(max_lat, max_lon)
+    
+    if min_lat > max_lat:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox min_lat must not exceed max_lat"
+        )
+    
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def parse_geo_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """
+    Parse a bounding box for a GeoJSON $geoWithin polygon
+    
+    Polygon edges are great-circle segments, so boxes must span less than
+    180 degrees of longitude.
+    """
+    min_lon, min_lat, max_lon, max_lat = parse_bbox(bbox)
+    if (max_lon - min_lon) % 360 >= 180:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bbox must span less than 180 degrees of longitude"
+        )
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def parse_latlon(value: str) -> Tuple[float, float]:
+    """Parse a "lat,lon" coordinate pair"""
+    try:
+        latitude, longitude = (float(v) for v in value.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Coordinates must be lat,lon"
+        )
+    
+    validate_coordinates(latitude, longitude)
+    return latitude, longitude
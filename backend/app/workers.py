@@ -0,0 +1,23 @@
+"""
+Gunicorn worker class for production deployments
+"""
+from uvicorn.workers import UvicornWorker
+
+# Seconds of the graceful timeout kept for lifespan shutdown (flushes, pool close)
+SHUTDOWN_RESERVE_SECONDS = 5
+
+
+class DrainingUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker that drains in-flight requests within gunicorn's graceful timeout
+
+    On SIGTERM, or when max_requests recycles the worker, it stops
+    accepting connections and lets running requests (e.g. report uploads)
+    finish. Requests still running SHUTDOWN_RESERVE_SECONDS before the
+    graceful timeout are cancelled, so the app's shutdown hooks still run
+    before gunicorn kills the process.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(self.cfg.graceful_timeout - SHUTDOWN_RESERVE_SECONDS, 1)
@@ -0,0 +1,74 @@
+"""
+Per-request authentication overhead with and without the validated-token cache
+Usage (from backend directory): python benchmarks/auth_overhead.py --iterations 20000
+
+Times get_current_user, the dependency every authenticated route runs, for
+one token presented repeatedly (a polling dashboard) and for a pool of
+distinct tokens used in rotation (many clients).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.utils.auth import create_access_token, get_current_user, token_cache  # noqa: E402
+
+
+def make_tokens(count: int) -> list:
+    return [
+        HTTPAuthorizationCredentials(
+            scheme="Bearer",
+            credentials=create_access_token({"sub": f"{index:024x}", "email": f"u{index}@example.com", "role": "user"})
+        )
+        for index in range(count)
+    ]
+
+
+def microseconds_per_call(loop, credentials: list, iterations: int) -> float:
+    async def run():
+        for index in range(iterations):
+            await get_current_user(credentials[index % len(credentials)])
+
+    start = time.perf_counter()
+    loop.run_until_complete(run())
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth overhead microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100, help="Distinct tokens in the pool case")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    cases = []
+    for name, credentials in [("single_token", make_tokens(1)), ("token_pool", make_tokens(args.tokens))]:
+        settings.JWT_CACHE_TTL_SECONDS = 0
+        token_cache.clear()
+        uncached = microseconds_per_call(loop, credentials, args.iterations)
+
+        settings.JWT_CACHE_TTL_SECONDS = 300
+        token_cache.clear()
+        cached = microseconds_per_call(loop, credentials, args.iterations)
+
+        cases.append({
+            "case": name,
+            "distinct_tokens": len(credentials),
+            "uncached_us_per_request": uncached,
+            "cached_us_per_request": cached,
+            "speedup": round(uncached / cached, 1)
+        })
+    loop.close()
+
+    print(json.dumps({"iterations": args.iterations, "cases": cases}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Speedup curve for partitioned parallel clustering
+Usage (from backend directory): python benchmarks/clustering_parallel.py --points 200000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import generate  # noqa: E402
+from app.utils.geo import cluster_points, cluster_points_parallel  # noqa: E402
+
+CLUSTER_RADIUS_KM = 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=200000)
+    parser.add_argument("--tile-km", type=float, default=20.0)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    points = generate("multi_city", args.points, args.seed)
+
+    start = time.perf_counter()
+    expected = cluster_points(points, CLUSTER_RADIUS_KM)
+    serial_seconds = time.perf_counter() - start
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != args.max_workers:
+        worker_counts.append(args.max_workers)
+
+    curve = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        clusters = cluster_points_parallel(
+            points, CLUSTER_RADIUS_KM, workers=workers, tile_km=args.tile_km
+        )
+        seconds = time.perf_counter() - start
+        curve.append({
+            "workers": workers,
+            "seconds": round(seconds, 3),
+            "speedup": round(serial_seconds / seconds, 2),
+            "identical": clusters == expected,
+        })
+
+    print(json.dumps({
+        "points": args.points,
+        "clusters": len(expected),
+        "tile_km": args.tile_km,
+        "serial_seconds": round(serial_seconds, 3),
+        "curve": curve,
+    }, indent=2))
+
+    if not all(step["identical"] for step in curve):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Clustering scalability benchmark over synthetic city datasets (no MongoDB)
+
+Usage (from backend directory):
+    python benchmarks/clustering_scalability.py --output results.json
+    python benchmarks/clustering_scalability.py --sizes 1000 10000 --baseline results.json
+
+Each case runs ClusteringService.cluster_reports, the in-memory step of
+recalculate_risk_zones, and records wall time, peak traced memory and a
+checksum of the resulting clusters. With --baseline, the run fails when a
+checksum differs or a case is slower than the allowed regression.
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from synthetic import DISTRIBUTIONS, generate  # noqa: E402
+from app.services.clustering_service import clustering_service  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_DISTRIBUTIONS = ["uniform", "hotspots", "corridors"]
+
+
+def make_reports(points):
+    """Minimal report documents, as fetched by recalculate_risk_zones"""
+    return [
+        {"_id": index, "location": {"latitude": lat, "longitude": lon}}
+        for index, (lat, lon) in enumerate(points)
+    ]
+
+
+def cluster_checksum(clusters) -> str:
+    """Order-independent digest of cluster membership"""
+    groups = sorted(sorted(report["_id"] for report in cluster) for cluster in clusters)
+    return hashlib.sha256(json.dumps(groups).encode()).hexdigest()[:16]
+
+
+def run_case(distribution: str, size: int, seed: int, trace_memory: bool) -> dict:
+    reports = make_reports(generate(distribution, size, seed))
+    gc.collect()
+
+    start = time.perf_counter()
+    clusters = clustering_service.cluster_reports(reports)
+    seconds = time.perf_counter() - start
+
+    peak_mb = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        clustering_service.cluster_reports(reports)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = round(peak / (1024 * 1024), 1)
+
+    sizes = [len(cluster) for cluster in clusters]
+    return {
+        "distribution": distribution,
+        "points": size,
+        "seconds": round(seconds, 3),
+        "points_per_second": round(size / seconds) if seconds else None,
+        "peak_memory_mb": peak_mb,
+        "clusters": len(clusters),
+        "largest_cluster": max(sizes),
+        "checksum": cluster_checksum(clusters),
+    }
+
+
+def compare(results: list, baseline: dict, max_slowdown: float) -> list:
+    """Return human-readable regressions against a previous run"""
+    previous = {(c["distribution"], c["points"]): c for c in baseline.get("cases", [])}
+    problems = []
+    for case in results:
+        key = (case["distribution"], case["points"])
+        if key not in previous:
+            continue
+        old = previous[key]
+        if case["checksum"] != old["checksum"]:
+            problems.append(f"{key}: clusters changed ({old['checksum']} -> {case['checksum']})")
+        if old["seconds"] and case["seconds"] > old["seconds"] * max_slowdown:
+            problems.append(f"{key}: {old['seconds']}s -> {case['seconds']}s")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clustering scalability benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--distributions", nargs="+", default=DEFAULT_DISTRIBUTIONS,
+                        choices=sorted(DISTRIBUTIONS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass (halves run time)")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--baseline", help="Previous results JSON to check against")
+    parser.add_argument("--max-slowdown", type=float, default=1.5,
+                        help="Allowed time ratio against the baseline")
+    args = parser.parse_args()
+
+    cases = []
+    for size in args.sizes:
+        for distribution in args.distributions:
+            case = run_case(distribution, size, args.seed, not args.no_memory)
+            print(f"{distribution:>10} {size:>8}: {case['seconds']:>8}s "
+                  f"{case['clusters']:>8} clusters", file=sys.stderr)
+            cases.append(case)
+
+    results = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cluster_radius_km": clustering_service.CLUSTER_RADIUS_KM,
+        "seed": args.seed,
+        "cases": cases,
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(cases, json.load(f), args.max_slowdown)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
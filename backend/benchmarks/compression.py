@@ -0,0 +1,70 @@
+"""
+Response size and encode time per content coding for list payloads
+Usage (from backend directory): python benchmarks/compression.py --rows 100
+
+Encodes a GET /reports page and a GET /zones listing with the orjson fast
+path, then compresses each body the way CompressionMiddleware would at the
+configured levels. Transfer time is estimated for a 1 Mbit/s mobile link.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from benchmarks.serialization import make_reports, make_zones  # noqa: E402
+from app.routes.reports import REPORT_SHAPE  # noqa: E402
+from app.routes.zones import ZONE_SHAPE  # noqa: E402
+from app.utils.compression import _Encoder, supported_codings  # noqa: E402
+from app.utils.serialization import dumps  # noqa: E402
+
+LINK_BYTES_PER_SECOND = 1_000_000 / 8
+
+
+def measure(body: bytes, coding: str, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressed = _Encoder(coding).whole(body)
+        best = min(best, time.perf_counter() - start)
+    return {
+        "bytes": len(compressed),
+        "ratio": round(len(body) / len(compressed), 1),
+        "encode_ms": round(best * 1000, 3),
+        "transfer_ms_1mbit": round(len(compressed) / LINK_BYTES_PER_SECOND * 1000, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response compression benchmark")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bodies = {
+        "reports": dumps([REPORT_SHAPE(doc) for doc in make_reports(args.rows, rng)]),
+        "zones": dumps([ZONE_SHAPE(doc) for doc in make_zones(args.rows, rng)])
+    }
+
+    cases = []
+    for name, body in bodies.items():
+        case = {
+            "endpoint": name,
+            "rows": args.rows,
+            "identity": {"bytes": len(body), "transfer_ms_1mbit": round(len(body) / LINK_BYTES_PER_SECOND * 1000, 1)}
+        }
+        for coding in supported_codings():
+            case[coding] = measure(body, coding, args.repeat)
+        cases.append(case)
+
+    print(json.dumps({"cases": cases}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""
+Load test of the API with realistic traffic scenarios
+Usage (from backend directory):
+    python benchmarks/load_test.py --scenario all --duration 30 --output load.json
+    python benchmarks/load_test.py --mongo mongodb://localhost:27017 --db-name pothole_loadtest
+    python benchmarks/load_test.py --url http://localhost:8000 --scenario dashboard
+
+By default the app runs in this process behind an in-memory MongoDB
+stand-in (mongomock-motor, from requirements-dev.txt), so no database or
+deployment is needed. That measures the application's own overhead. Pass
+--mongo with a mongod URI to include real database work, or --url to drive
+a running server. In --url mode the tokens are signed with JWT_SECRET_KEY
+from .env, which must match the server's.
+
+Scenarios:
+- upload_burst: citizens submitting reports back to back
+- dashboard: authorities polling /reports, /zones and /stats with ETags
+- recalculate: dashboards polling while zones are recalculated
+- mixed: all of the above at once
+
+Each virtual user waits for its previous request, so an overloaded server
+shows up as lower throughput and higher latency. For every scenario and
+endpoint, the JSON result has throughput, latency percentiles, status
+counts, the error rate and the shed rate. Shed requests are 429/503
+responses from admission control. Pass --baseline with an earlier result
+to get the change per endpoint.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager, redirect_stdout
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PERCENTILES = (50, 90, 95, 99)
+SEED_CENTER = (12.9716, 77.5946)
+
+
+class Recorder:
+    """Request outcomes per endpoint, for requests started after the warm-up"""
+
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, label: str, started: float, finished: float, outcome: str):
+        if started < self.measure_from:
+            return
+        self.samples[label].append(finished - started)
+        self.statuses[label][outcome] += 1
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    index = min(len(sorted_values) - 1, max(math.ceil(p / 100 * len(sorted_values)) - 1, 0))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], statuses: Counter, duration: float) -> Dict:
+    latencies = sorted(latencies)
+    total = len(latencies)
+    ok = sum(count for outcome, count in statuses.items() if outcome.startswith("2") or outcome == "304")
+    shed = statuses["429"] + statuses["503"]
+    return {
+        "requests": total,
+        "throughput_rps": round(total / duration, 2),
+        "error_rate": round((total - ok - shed) / total, 4) if total else 0.0,
+        "shed_rate": round(shed / total, 4) if total else 0.0,
+        "status": dict(sorted(statuses.items())),
+        "latency_ms": {
+            **{f"p{p}": round(percentile(latencies, p) * 1000, 2) for p in PERCENTILES},
+            "mean": round(sum(latencies) / total * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2)
+        } if total else {}
+    }
+
+
+class Session:
+    """One virtual user: its HTTP client, credentials and cached ETags"""
+
+    def __init__(self, client, recorder: Recorder, context: "Context", rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.context = context
+        self.rng = rng
+        self.etags: Dict[str, str] = {}
+
+    async def request(self, label: str, method: str, url: str, token: str, conditional: bool = False, **kwargs):
+        headers = {"Authorization": f"Bearer {token}"}
+        if conditional and url in self.etags:
+            headers["If-None-Match"] = self.etags[url]
+
+        started = time.monotonic()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except Exception as e:
+            self.recorder.record(label, started, time.monotonic(), f"error:{type(e).__name__}")
+            return None
+        self.recorder.record(label, started, time.monotonic(), str(response.status_code))
+
+        if conditional and response.headers.get("etag"):
+            self.etags[url] = response.headers["etag"]
+        return response
+
+
+class Context:
+    """Credentials and payloads shared by all virtual users"""
+
+    def __init__(self, citizens: int, seed: int):
+        from app.utils.auth import create_access_token
+
+        self.citizen_tokens = [
+            create_access_token({"sub": f"{index + 1:024x}", "email": f"citizen{index}@load.test", "role": "user"})
+            for index in range(citizens)
+        ]
+        self.authority_token = create_access_token(
+            {"sub": f"{0xa0:024x}", "email": "authority@load.test", "role": "authority"}
+        )
+        self.images = make_images(8, random.Random(seed))
+
+
+def make_images(count: int, rng: random.Random) -> List[bytes]:
+    """Road-like JPEGs with a dark blob, about the size of a phone upload after resizing"""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    images = []
+    for _ in range(count):
+        image = Image.effect_noise((1280, 960), rng.uniform(20, 60)).convert("RGB")
+        draw = ImageDraw.Draw(image)
+        x, y = rng.randint(200, 900), rng.randint(200, 600)
+        w, h = rng.randint(120, 300), rng.randint(80, 200)
+        draw.ellipse((x, y, x + w, y + h), fill=(25, 25, 25))
+        buffer = io.BytesIO()
+        image.filter(ImageFilter.GaussianBlur(2)).save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+async def upload_report(session: Session):
+    lat0, lon0 = SEED_CENTER
+    await session.request(
+        "POST /reports",
+        "POST",
+        "/api/reports",
+        session.rng.choice(session.context.citizen_tokens),
+        data={
+            "latitude": str(round(session.rng.gauss(lat0, 0.05), 6)),
+            "longitude": str(round(session.rng.gauss(lon0, 0.05), 6)),
+            "description": "Load test report"
+        },
+        files={"image": ("pothole.jpg", session.rng.choice(session.context.images), "image/jpeg")}
+    )
+
+
+async def poll_dashboard(session: Session):
+    token = session.context.authority_token
+    await session.request("GET /reports", "GET", "/api/reports?limit=50", token, conditional=True)
+    await session.request("GET /zones", "GET", "/api/zones", token, conditional=True)
+    await session.request("GET /zones?zoom", "GET", "/api/zones?zoom=8", token, conditional=True)
+    await session.request("GET /stats", "GET", "/api/stats", token)
+
+
+async def recalculate(session: Session):
+    await session.request("POST /zones/recalculate", "POST", "/api/zones/recalculate", session.context.authority_token)
+
+
+@dataclass
+class UserSpec:
+    """count virtual users running action, starting an iteration every interval seconds (0 = back to back)"""
+    count: int
+    interval: float
+    action: Callable[[Session], Awaitable[None]]
+
+
+def scenario_users(name: str, args) -> List[UserSpec]:
+    uploaders = UserSpec(args.uploaders, 0.0, upload_report)
+    dashboards = UserSpec(args.dashboards, args.poll_interval, poll_dashboard)
+    recalculator = UserSpec(1, args.recalc_interval, recalculate)
+    return {
+        "upload_burst": [uploaders],
+        "dashboard": [dashboards],
+        "recalculate": [dashboards, recalculator],
+        "mixed": [uploaders, dashboards, recalculator]
+    }[name]
+
+
+SCENARIOS = ("upload_burst", "dashboard", "recalculate", "mixed")
+
+
+async def virtual_user(spec: UserSpec, session: Session, deadline: float):
+    # Spread the first iterations so paced users do not all fire together
+    await asyncio.sleep(session.rng.uniform(0, spec.interval or 0.05))
+    while time.monotonic() < deadline:
+        began = time.monotonic()
+        await spec.action(session)
+        if spec.interval:
+            await asyncio.sleep(max(0.0, min(began + spec.interval, deadline) - time.monotonic()))
+
+
+async def run_scenario(name: str, client, context: Context, args) -> Dict:
+    started = time.monotonic()
+    recorder = Recorder(started + args.warmup)
+    deadline = started + args.warmup + args.duration
+    specs = scenario_users(name, args)
+
+    rng = random.Random(args.seed)
+    tasks = [
+        asyncio.create_task(
+            virtual_user(spec, Session(client, recorder, context, random.Random(rng.random())), deadline)
+        )
+        for spec in specs
+        for _ in range(spec.count)
+    ]
+    await asyncio.gather(*tasks)
+    # Requests still running at the deadline finish and count; the window stays the same
+    measured = args.duration
+
+    endpoints = {
+        label: summarize(recorder.samples[label], recorder.statuses[label], measured)
+        for label in sorted(recorder.samples)
+    }
+    all_latencies = [latency for samples in recorder.samples.values() for latency in samples]
+    all_statuses = sum(recorder.statuses.values(), Counter())
+    return {
+        "scenario": name,
+        "virtual_users": {spec.action.__name__: spec.count for spec in specs},
+        "duration_seconds": measured,
+        "total": summarize(all_latencies, all_statuses, measured),
+        "endpoints": endpoints
+    }
+
+
+async def seed_database(database, count: int, seed: int):
+    """Insert verified/pending/rejected reports around one city and build zones, if the database is empty"""
+    from bson import ObjectId
+    from synthetic import generate
+    from app.services.clustering_service import clustering_service
+    from app.services.stats_service import stats_service
+    from app.services.version_service import collection_versions
+
+    if await database.pothole_reports.count_documents({}, limit=1):
+        print("ℹ️  Database already has reports, not seeding", file=sys.stderr)
+        return
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    docs = []
+    for index, (lat, lon) in enumerate(generate("hotspots", count, seed)):
+        status = rng.choices(["verified", "pending", "rejected"], weights=[7, 2, 1])[0]
+        docs.append({
+            "_id": ObjectId(),
+            "user_id": ObjectId(f"{rng.randint(1, 500):024x}"),
+            "image_path": "uploads/seed.jpg",
+            "location": {"latitude": lat, "longitude": lon},
+            "geo": {"type": "Point", "coordinates": [lon, lat]},
+            "description": None,
+            "status": status,
+            "report_date": now - timedelta(minutes=index),
+            "ai_confidence": round(rng.uniform(40, 99), 2),
+            "ai_verified": status != "rejected"
+        })
+    for start in range(0, len(docs), 1000):
+        await database.pothole_reports.insert_many(docs[start:start + 1000])
+
+    await stats_service.reconcile(database)
+    zones = await clustering_service.recalculate_risk_zones(database)
+    await collection_versions.bump(database, "pothole_reports")
+    print(f"🌱 Seeded {count} reports, {len(zones)} zones", file=sys.stderr)
+
+
+@asynccontextmanager
+async def in_process_app(mongo: str, db_name: str):
+    """The app with its startup and shutdown hooks run, on the chosen database"""
+    from app.config import settings
+    from app.config.database import db
+    from app.main import app
+
+    if mongo == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("mongomock-motor is required for --mongo memory: pip install -r requirements-dev.txt")
+
+        async def connect_memory():
+            db.client = AsyncMongoMockClient()
+            db.database = db.client[db_name]
+            await db.create_indexes()
+
+        db.connect_db = connect_memory
+    else:
+        settings.MONGODB_URI = mongo
+        settings.MONGODB_DB_NAME = db_name
+
+    async with app.router.lifespan_context(app):
+        yield app, db.database
+
+
+def describe_mongo(mongo: Optional[str]) -> Optional[str]:
+    # Keep credentials out of result files
+    return re.sub(r"//[^@/]*@", "//***@", mongo) if mongo else None
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(scenarios: List[Dict], baseline: Dict) -> List[Dict]:
+    """Throughput, p95 and error rate of each endpoint against an earlier result"""
+    before = {
+        (scenario["scenario"], label): stats
+        for scenario in baseline.get("scenarios", [])
+        for label, stats in scenario["endpoints"].items()
+    }
+    rows = []
+    for scenario in scenarios:
+        for label, after in scenario["endpoints"].items():
+            old = before.get((scenario["scenario"], label))
+            if not old or not old["requests"] or not after["requests"]:
+                continue
+            rows.append({
+                "scenario": scenario["scenario"],
+                "endpoint": label,
+                "throughput_change": round(after["throughput_rps"] / old["throughput_rps"] - 1, 3),
+                "p95_ms": [old["latency_ms"]["p95"], after["latency_ms"]["p95"]],
+                "error_rate": [old["error_rate"], after["error_rate"]]
+            })
+    return rows
+
+
+async def run(args) -> Dict:
+    import httpx
+
+    context = Context(args.users, args.seed)
+    limits = httpx.Limits(max_connections=args.uploaders + args.dashboards + 1)
+    timeout = httpx.Timeout(args.timeout)
+    names = SCENARIOS if args.scenario == "all" else (args.scenario,)
+
+    async def run_all(client) -> List[Dict]:
+        results = []
+        for name in names:
+            print(f"▶️  {name} for {args.duration:g}s (+{args.warmup:g}s warm-up)", file=sys.stderr)
+            results.append(await run_scenario(name, client, context, args))
+        return results
+
+    if args.url:
+        if args.mongo and args.seed_reports:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            seed_client = AsyncIOMotorClient(args.mongo)
+            await seed_database(seed_client[args.db_name], args.seed_reports, args.seed)
+            seed_client.close()
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            scenarios = await run_all(client)
+    else:
+        async with in_process_app(args.mongo or "memory", args.db_name) as (app, database):
+            if args.seed_reports:
+                await seed_database(database, args.seed_reports, args.seed)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load.test", timeout=timeout) as client:
+                scenarios = await run_all(client)
+
+    return {
+        "target": args.url or "in-process",
+        "mongo": describe_mongo(args.mongo) or ("memory" if not args.url else None),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "scenarios": scenarios
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API load test")
+    parser.add_argument("--url", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--mongo", help="'memory' or a MongoDB URI (default: memory in-process; with --url, used only to seed)")
+    parser.add_argument("--db-name", default="pothole_loadtest", help="Database to use and seed")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="mixed")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before each scenario")
+    parser.add_argument("--uploaders", type=int, default=8, help="Citizens uploading back to back")
+    parser.add_argument("--dashboards", type=int, default=20, help="Dashboards polling")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between dashboard refreshes")
+    parser.add_argument("--recalc-interval", type=float, default=10.0, help="Seconds between manual recalculations")
+    parser.add_argument("--users", type=int, default=500, help="Distinct citizens the uploads rotate through")
+    parser.add_argument("--seed-reports", type=int, default=2000, help="Reports inserted into an empty database (0 = none)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON result to this file as well")
+    parser.add_argument("--baseline", help="Earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    # In --url mode the tokens must be signed with the server's key from .env
+    if not args.url:
+        os.environ.setdefault("JWT_SECRET_KEY", "load-test")
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+    # The app logs with print(); keep stdout for the result
+    with redirect_stdout(sys.stderr):
+        result = asyncio.run(run(args))
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["comparison"] = compare(result["scenarios"], json.load(f))
+
+    output = json.dumps(result, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Event-loop stalls during a login burst: inline bcrypt vs the hashing pool
+Usage (from backend directory): python benchmarks/login_burst.py --logins 20 --rounds 10
+
+Runs a burst of concurrent password verifications while a ticker coroutine
+wakes every 10 ms, standing in for the other requests on the worker. The
+longest gap between ticks is how long those requests would have stalled.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from app.utils.auth import password_hasher, pwd_context  # noqa: E402
+
+TICK_SECONDS = 0.01
+
+
+async def ticker(stop: asyncio.Event) -> float:
+    longest = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(TICK_SECONDS)
+        now = time.perf_counter()
+        longest = max(longest, now - last - TICK_SECONDS)
+        last = now
+    return longest
+
+
+async def burst(verify, logins: int, hashed: str) -> dict:
+    stop = asyncio.Event()
+    probe = asyncio.create_task(ticker(stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify("correct horse", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    stall = await probe
+    assert all(results)
+    return {"burst_seconds": round(elapsed, 3), "max_loop_stall_ms": round(stall * 1000, 1)}
+
+
+async def inline_verify(plain: str, hashed: str) -> bool:
+    # What the login route did before: bcrypt directly on the event loop
+    return pwd_context.verify(plain, hashed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login burst benchmark")
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost factor of the stored hash")
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash("correct horse", rounds=args.rounds)
+    loop = asyncio.new_event_loop()
+    try:
+        inline = loop.run_until_complete(burst(inline_verify, args.logins, hashed))
+        pooled = loop.run_until_complete(burst(password_hasher.verify, args.logins, hashed))
+    finally:
+        password_hasher.shutdown()
+        loop.close()
+
+    print(json.dumps({"logins": args.logins, "rounds": args.rounds, "inline": inline, "pool": pooled}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
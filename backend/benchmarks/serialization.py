@@ -0,0 +1,166 @@
+"""
+List response serialization: pydantic response models vs the orjson fast path
+Usage (from backend directory): python benchmarks/serialization.py --rows 1000
+
+The model path builds a response model per document and runs FastAPI's
+response_model validation and JSONResponse encoding, as the list routes did
+before. The fast path shapes the raw documents and encodes them with orjson.
+Both outputs are decoded and compared; the run fails if they differ.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from bson import ObjectId  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from app.models.report import ReportResponse  # noqa: E402
+from app.models.risk_zone import RiskZoneResponse  # noqa: E402
+from app.routes.reports import REPORT_SHAPE  # noqa: E402
+from app.routes.zones import ZONE_SHAPE  # noqa: E402
+from app.utils.serialization import dumps  # noqa: E402
+
+
+def make_reports(count: int, rng: random.Random) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": ObjectId(),
+            "image_path": f"uploads/{index}.jpg",
+            "location": {"latitude": rng.uniform(-60, 60), "longitude": rng.uniform(-180, 180)},
+            "description": "Deep pothole near the crossing" if index % 3 else None,
+            "status": rng.choice(["pending", "verified", "rejected"]),
+            "report_date": start + timedelta(seconds=index, microseconds=rng.randrange(1000000)),
+            "ai_confidence": round(rng.uniform(0, 100), 2),
+            "ai_verified": rng.random() > 0.5
+        }
+        for index in range(count)
+    ]
+
+
+def make_zones(count: int, rng: random.Random) -> list:
+    now = datetime(2024, 1, 1, 12, 30)
+    return [
+        {
+            "_id": ObjectId(),
+            "center_location": {"latitude": rng.uniform(-60, 60), "longitude": rng.uniform(-180, 180)},
+            "pothole_count": count_,
+            "risk_level": "high" if count_ > 5 else "medium" if count_ >= 3 else "low",
+            "radius_km": round(rng.uniform(0, 2), 4),
+            "first_report_date": now - timedelta(days=count_),
+            "last_report_date": now,
+            "created_at": now,
+            "updated_at": now
+        }
+        for count_ in (rng.randint(1, 40) for _ in range(count))
+    ]
+
+
+def report_models(docs: list) -> list:
+    return [
+        ReportResponse(
+            _id=str(doc["_id"]),
+            user_id=str(doc["user_id"]),
+            image_path=doc["image_path"],
+            location=doc["location"],
+            description=doc.get("description"),
+            status=doc["status"],
+            report_date=doc["report_date"],
+            ai_confidence=doc.get("ai_confidence"),
+            ai_verified=doc.get("ai_verified")
+        )
+        for doc in docs
+    ]
+
+
+def zone_models(docs: list) -> list:
+    return [
+        RiskZoneResponse(
+            _id=str(doc["_id"]),
+            center_location=doc["center_location"],
+            pothole_count=doc["pothole_count"],
+            risk_level=doc["risk_level"],
+            radius_km=doc.get("radius_km", 0.0),
+            first_report_date=doc.get("first_report_date"),
+            last_report_date=doc.get("last_report_date"),
+            created_at=doc["created_at"],
+            updated_at=doc["updated_at"]
+        )
+        for doc in docs
+    ]
+
+
+async def model_path(docs: list, build, field) -> bytes:
+    content = await serialize_response(field=field, response_content=build(docs))
+    return JSONResponse(content).body
+
+
+def fast_path(docs: list, shape) -> bytes:
+    return dumps([shape(doc) for doc in docs])
+
+
+def rows_per_second(func, rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(rows / best)
+
+
+def run_case(name: str, docs: list, build, model, shape, repeat: int) -> dict:
+    field = create_response_field(name="Response_" + name, type_=List[model])
+    loop = asyncio.new_event_loop()
+    try:
+        slow = loop.run_until_complete(model_path(docs, build, field))
+        fast = fast_path(docs, shape)
+        slow_rate = rows_per_second(
+            lambda: loop.run_until_complete(model_path(docs, build, field)), len(docs), repeat
+        )
+    finally:
+        loop.close()
+    fast_rate = rows_per_second(lambda: fast_path(docs, shape), len(docs), repeat)
+
+    return {
+        "endpoint": name,
+        "rows": len(docs),
+        "model_rows_per_second": slow_rate,
+        "fast_rows_per_second": fast_rate,
+        "speedup": round(fast_rate / slow_rate, 1),
+        "model_bytes": len(slow),
+        "fast_bytes": len(fast),
+        "identical": json.loads(slow) == json.loads(fast)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [
+        run_case("reports", make_reports(args.rows, rng), report_models, ReportResponse, REPORT_SHAPE, args.repeat),
+        run_case("zones", make_zones(args.rows, rng), zone_models, RiskZoneResponse, ZONE_SHAPE, args.repeat),
+    ]
+    print(json.dumps({"cases": cases}, indent=2))
+
+    if not all(case["identical"] for case in cases):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
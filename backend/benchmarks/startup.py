@@ -0,0 +1,98 @@
+"""
+Import time and baseline memory of the API, and a guard against eager heavy imports
+Usage (from backend directory): python benchmarks/startup.py --runs 5
+                                python benchmarks/startup.py --check
+
+Each run imports a module in a fresh interpreter and records the import
+wall time, the process RSS afterwards and which heavy modules got loaded.
+--check exits with status 1 if importing the app or any route module it
+includes loads OpenCV, numpy, Pillow or pyarrow; those belong to the first
+upload or export, not to startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("cv2", "numpy", "PIL.Image", "pyarrow", "tensorflow")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+with open("/proc/self/statm") as f:
+    rss = int(f.read().split()[1]) * __import__("os").sysconf("SC_PAGE_SIZE")
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_bytes": rss,
+    "heavy": [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+# Modules of the endpoints app.main serves, so new routers are checked too
+ROUTES_PROBE = """
+import json
+from app.main import app
+print(json.dumps(sorted({
+    route.endpoint.__module__ for route in app.routes
+    if getattr(route, "endpoint", None) and route.endpoint.__module__.startswith("app.routes.")
+})))
+"""
+
+
+def light_import_paths(env: dict) -> list:
+    """Modules whose import must stay free of HEAVY_MODULES"""
+    output = subprocess.run(
+        [sys.executable, "-c", ROUTES_PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return ["app.main"] + json.loads(output.strip().splitlines()[-1])
+
+
+def probe(module: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="Fail if a light import path loads heavy modules")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("JWT_SECRET_KEY", "benchmark")
+
+    if args.check:
+        failures = {}
+        for module in light_import_paths(env):
+            heavy = probe(module, env)["heavy"]
+            if heavy:
+                failures[module] = heavy
+            print(f"{'❌' if heavy else '✅'} {module}: {', '.join(heavy) or 'no heavy modules'}")
+        sys.exit(1 if failures else 0)
+
+    runs = [probe(args.module, env) for _ in range(args.runs)]
+    seconds = [run["seconds"] for run in runs]
+    rss = [run["rss_bytes"] / 1024 / 1024 for run in runs]
+    print(json.dumps({
+        "module": args.module,
+        "runs": args.runs,
+        "import_seconds_median": round(statistics.median(seconds), 3),
+        "import_seconds_min": round(min(seconds), 3),
+        "rss_mb_median": round(statistics.median(rss), 1),
+        "heavy_modules_loaded": runs[-1]["heavy"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
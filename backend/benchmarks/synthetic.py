@@ -0,0 +1,96 @@
+"""
+Synthetic verified-report locations for clustering benchmarks
+"""
+import math
+import random
+from typing import Callable, Dict, List, Tuple
+
+Point = Tuple[float, float]
+
+# Bounding box of a mid-sized city (Bengaluru), used as the default canvas
+CITY_CENTER = (12.9716, 77.5946)
+CITY_SPAN_DEG = 0.30
+
+# (latitude, longitude) of a few city centres for a multi-city deployment
+CITIES = [
+    (12.9716, 77.5946),
+    (19.0760, 72.8777),
+    (28.6139, 77.2090),
+    (13.0827, 80.2707),
+    (22.5726, 88.3639),
+    (17.3850, 78.4867),
+    (18.5204, 73.8567),
+    (23.0225, 72.5714),
+]
+
+
+def uniform(count: int, rng: random.Random) -> List[Point]:
+    """Reports spread evenly over the city"""
+    lat0, lon0 = CITY_CENTER
+    half = CITY_SPAN_DEG / 2
+    return [
+        (rng.uniform(lat0 - half, lat0 + half), rng.uniform(lon0 - half, lon0 + half))
+        for _ in range(count)
+    ]
+
+
+def hotspots(count: int, rng: random.Random) -> List[Point]:
+    """Dense urban hotspots over a thin uniform background"""
+    lat0, lon0 = CITY_CENTER
+    half = CITY_SPAN_DEG / 2
+    centres = [
+        (rng.uniform(lat0 - half, lat0 + half), rng.uniform(lon0 - half, lon0 + half))
+        for _ in range(25)
+    ]
+    points = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            points.append((rng.uniform(lat0 - half, lat0 + half), rng.uniform(lon0 - half, lon0 + half)))
+        else:
+            lat, lon = rng.choice(centres)
+            points.append((rng.gauss(lat, 0.004), rng.gauss(lon, 0.004)))
+    return points
+
+
+def corridors(count: int, rng: random.Random) -> List[Point]:
+    """Reports strung along straight road corridors crossing the city"""
+    lat0, lon0 = CITY_CENTER
+    half = CITY_SPAN_DEG / 2
+    roads = []
+    for _ in range(12):
+        angle = rng.uniform(0, math.pi)
+        offset = rng.uniform(-half / 2, half / 2)
+        roads.append((angle, offset))
+    points = []
+    for _ in range(count):
+        angle, offset = rng.choice(roads)
+        along = rng.uniform(-half, half)
+        across = offset + rng.gauss(0, 0.0003)
+        points.append((
+            lat0 + along * math.sin(angle) + across * math.cos(angle),
+            lon0 + along * math.cos(angle) - across * math.sin(angle),
+        ))
+    return points
+
+
+def multi_city(count: int, rng: random.Random) -> List[Point]:
+    """Reports scattered around several cities with a dense core in each"""
+    points = []
+    for _ in range(count):
+        lat, lon = rng.choice(CITIES)
+        spread = 0.05 if rng.random() < 0.3 else 0.25
+        points.append((rng.gauss(lat, spread), rng.gauss(lon, spread)))
+    return points
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int, random.Random], List[Point]]] = {
+    "uniform": uniform,
+    "hotspots": hotspots,
+    "corridors": corridors,
+    "multi_city": multi_city,
+}
+
+
+def generate(distribution: str, count: int, seed: int = 42) -> List[Point]:
+    """Generate count points of a named distribution, reproducibly"""
+    return DISTRIBUTIONS[distribution](count, random.Random(seed))
@@ -0,0 +1,107 @@
+"""
+Startup time and memory of the production server per worker configuration
+Usage (from backend directory, MongoDB reachable): python benchmarks/worker_startup.py --workers 1,2,4
+
+Starts gunicorn with gunicorn.conf.py once per worker count, with and
+without preloading, and waits until every worker has finished application
+startup. Reports the time that took and each process's RSS and PSS. PSS
+splits shared pages between the processes sharing them, so its total is
+the real memory cost; preloading should lower it. Linux only (/proc).
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_LINE = "Application startup complete."
+
+
+def memory_kb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            match = re.match(r"^(Rss|Pss):\s+(\d+) kB", line)
+            if match:
+                values[match.group(1).lower()] = int(match.group(2))
+    return values
+
+
+def children(pid: int) -> list:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def run_config(app: str, workers: int, preload: bool, port: int, timeout: float) -> dict:
+    env = dict(
+        os.environ,
+        WEB_WORKERS=str(workers),
+        WEB_BIND=f"127.0.0.1:{port}",
+        WEB_PRELOAD_APP="true" if preload else "false",
+        WEB_MAX_REQUESTS="0"
+    )
+    if not preload:
+        env["WEB_PRELOAD_MODULES"] = "[]"
+
+    log_path = os.path.join(tempfile.gettempdir(), f"worker_startup_{port}.log")
+    with open(log_path, "w") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", app],
+            cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        try:
+            ready_seconds = None
+            while time.perf_counter() - start < timeout and process.poll() is None:
+                with open(log_path) as f:
+                    if f.read().count(READY_LINE) >= workers:
+                        ready_seconds = time.perf_counter() - start
+                        break
+                time.sleep(0.05)
+            if ready_seconds is None:
+                raise RuntimeError(f"{workers} worker(s) did not start within {timeout}s, see {log_path}")
+
+            time.sleep(1)  # Let post-startup allocations settle
+            master = memory_kb(process.pid)
+            worker_memory = [memory_kb(pid) for pid in children(process.pid)]
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=60)
+    os.remove(log_path)
+
+    processes = [master] + worker_memory
+    return {
+        "workers": workers,
+        "preload": preload,
+        "ready_seconds": round(ready_seconds, 2),
+        "master_rss_mb": round(master["rss"] / 1024, 1),
+        "worker_rss_mb": [round(worker["rss"] / 1024, 1) for worker in worker_memory],
+        "total_rss_mb": round(sum(p["rss"] for p in processes) / 1024, 1),
+        "total_pss_mb": round(sum(p["pss"] for p in processes) / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker startup and memory report")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--app", default="app.main:app")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    results = []
+    for workers in [int(count) for count in args.workers.split(",")]:
+        for preload in (False, True):
+            results.append(run_config(args.app, workers, preload, args.port, args.timeout))
+            print(json.dumps(results[-1]), file=sys.stderr)
+
+    print(json.dumps({"configurations": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
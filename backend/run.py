@@ -1,6 +1,7 @@
 """
 Simple run script - Execute from backend directory
-Usage: python run.py
+Usage: python run.py           (development: one process, auto-reload)
+       python run.py --prod    (production: gunicorn with preloaded workers)
 """
 import subprocess
 import sys
@@ -27,11 +28,28 @@ print("📍 Server will be at: http://localhost:8000")
 print("📖 API Docs at: http://localhost:8000/docs\n")
 print(f"🐍 Using Python: {venv_python}")
 
-# Run uvicorn using detected Python
-subprocess.run([
-    venv_python, "-m", "uvicorn",
-    "app.main:app",
-    "--host", "0.0.0.0",
-    "--port", "8000",
-    "--reload"
-])
+if "--prod" in sys.argv:
+    if os.name == "nt":
+        # gunicorn does not run on Windows; uvicorn workers without preloading
+        from app.config import settings
+        print("⚠️  gunicorn is not available on Windows, using uvicorn workers")
+        subprocess.run([
+            venv_python, "-m", "uvicorn",
+            "app.main:app",
+            "--host", "0.0.0.0",
+            "--port", "8000",
+            "--workers", str(settings.WEB_WORKERS or os.cpu_count() or 1),
+            "--timeout-graceful-shutdown", str(settings.WEB_GRACEFUL_TIMEOUT_SECONDS)
+        ])
+    else:
+        # Worker count, preloading and recycling come from gunicorn.conf.py
+        subprocess.run([venv_python, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"])
+else:
+    # Run uvicorn using detected Python
+    subprocess.run([
+        venv_python, "-m", "uvicorn",
+        "app.main:app",
+        "--host", "0.0.0.0",
+        "--port", "8000",
+        "--reload"
+    ])
@@ -0,0 +1,135 @@
+"""
+Check that list queries are answered by index scans, using explain
+Usage (from backend directory): python scripts/check_query_shapes.py [--database NAME]
+
+Runs against MONGODB_URI in a scratch database (default:
+<MONGODB_DB_NAME>_query_shapes, dropped afterwards). Each list query shape
+used by GET /reports and GET /repairs must use an IXSCAN, with no
+COLLSCAN and no blocking in-memory SORT. Rows still need a FETCH, because
+responses include fields that are not in the index. Exits non-zero on
+failure.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.config.database import Database  # noqa: E402
+from app.models.user import TokenData  # noqa: E402
+from app.routes.reports import build_report_query, REPORT_PROJECTION, REPORT_SORT  # noqa: E402
+from app.utils.pagination import apply_cursor, encode_cursor  # noqa: E402
+
+USER_ID = ObjectId()
+AUTHORITY = TokenData(user_id=str(ObjectId()), email="authority@example.com", role="authority")
+USER = TokenData(user_id=str(USER_ID), email="user@example.com", role="user")
+
+
+def plan_stages(plan: dict) -> list:
+    """Flatten the stage names of an explain plan tree"""
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+async def seed(database):
+    now = datetime.utcnow()
+    await database.pothole_reports.insert_many([
+        {
+            "user_id": USER_ID if i % 2 else ObjectId(),
+            "image_path": "uploads/sample.jpg",
+            "location": {"latitude": 12.97, "longitude": 77.59},
+            "status": ["pending", "verified", "rejected"][i % 3],
+            "report_date": now - timedelta(minutes=i),
+            "ai_confidence": 80.0,
+            "ai_verified": True
+        }
+        for i in range(200)
+    ])
+    await database.repair_actions.insert_many([
+        {
+            "zone_id": ObjectId(),
+            "assigned_department": "Public Works",
+            "repair_status": ["pending", "in_progress", "completed"][i % 3],
+            "start_date": now - timedelta(minutes=i)
+        }
+        for i in range(50)
+    ])
+
+
+async def check(database) -> list:
+    cursor_token = encode_cursor(datetime.utcnow() - timedelta(minutes=50), ObjectId())
+    shapes = []
+    for label, user, status_filter in [
+        ("authority, all", AUTHORITY, None),
+        ("authority, by status", AUTHORITY, "verified"),
+        ("user, all", USER, None),
+        ("user, by status", USER, "pending"),
+    ]:
+        query = build_report_query(user, status_filter)
+        shapes.append((f"reports: {label}", database.pothole_reports, query, REPORT_PROJECTION, REPORT_SORT))
+        shapes.append((
+            f"reports: {label}, next page",
+            database.pothole_reports,
+            apply_cursor(query, "report_date", cursor_token),
+            REPORT_PROJECTION,
+            REPORT_SORT
+        ))
+
+    repair_sort = [("start_date", -1), ("_id", -1)]
+    for label, query in [("all", {}), ("by status", {"repair_status": "pending"})]:
+        shapes.append((f"repairs: {label}", database.repair_actions, query, None, repair_sort))
+        shapes.append((
+            f"repairs: {label}, next page",
+            database.repair_actions,
+            apply_cursor(query, "start_date", cursor_token),
+            None,
+            repair_sort
+        ))
+
+    failures = []
+    for label, collection, query, projection, sort in shapes:
+        explain = await collection.find(query, projection).sort(sort).limit(100).explain()
+        winning = explain["queryPlanner"]["winningPlan"]
+        stages = plan_stages(winning.get("queryPlan", winning))
+
+        ok = "IXSCAN" in stages and "COLLSCAN" not in stages and "SORT" not in stages
+        print(f"{'✅' if ok else '❌'} {label}: {' <- '.join(stages)}")
+        if not ok:
+            failures.append(label)
+    return failures
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Check list query plans with explain")
+    parser.add_argument("--database", default=f"{settings.MONGODB_DB_NAME}_query_shapes")
+    args = parser.parse_args()
+
+    manager = Database()
+    manager.client = AsyncIOMotorClient(settings.MONGODB_URI)
+    manager.database = manager.client[args.database]
+
+    try:
+        await manager.client.drop_database(args.database)
+        await manager.create_indexes()
+        await seed(manager.database)
+        failures = await check(manager.database)
+    finally:
+        await manager.client.drop_database(args.database)
+        manager.client.close()
+
+    if failures:
+        print(f"{len(failures)} query shape(s) not served by an index")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""
+Export reports or zones to NDJSON, GeoJSON or Parquet
+Usage (from backend directory):
+    python scripts/export_data.py reports --format parquet --output reports.parquet
+    python scripts/export_data.py zones --format geojson --bbox 77.45,12.85,77.75,13.10 > zones.geojson
+
+Streams through the same batched cursor as GET /api/export/{dataset}, so
+memory use stays flat for any dataset size.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException  # noqa: E402
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services.export_service import export_service, DATASETS, FORMATS  # noqa: E402
+
+
+async def export(args) -> int:
+    dataset = export_service.get_dataset(args.dataset)
+    export_service.validate_format(args.format)
+    query = export_service.build_query(dataset, args.bbox, args.since, args.until, args.status)
+
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    database = client[settings.MONGODB_DB_NAME]
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        async for chunk in export_service.stream(database, dataset, query, args.format):
+            output.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            output.close()
+        client.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export reports or zones")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    parser.add_argument("--bbox", help="min_lon,min_lat,max_lon,max_lat")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="ISO timestamp, inclusive")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="ISO timestamp, exclusive")
+    parser.add_argument("--status", help="Report status, or zone risk level")
+    args = parser.parse_args()
+
+    try:
+        written = asyncio.run(export(args))
+    except HTTPException as e:
+        print(f"❌ {e.detail}", file=sys.stderr)
+        sys.exit(2)
+    print(f"✅ Exported {args.dataset} ({written} bytes)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
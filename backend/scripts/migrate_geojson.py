@@ -0,0 +1,61 @@
+"""
+Backfill GeoJSON points on reports and zones and build 2dsphere indexes
+Usage (from backend directory): python scripts/migrate_geojson.py
+
+Documents are updated server-side with pipeline updates (MongoDB 4.2+), so
+the backfill needs no round trip per document. Safe to run repeatedly.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from pymongo.errors import OperationFailure  # noqa: E402
+from app.config import settings  # noqa: E402
+
+# Index replaced by the 2dsphere index on pothole_reports.geo
+LEGACY_REPORT_INDEX = "location.latitude_1_location.longitude_1"
+
+
+def point_from(field: str) -> dict:
+    """Aggregation expression building a GeoJSON point from a lat/lon subdocument"""
+    return {
+        "type": "Point",
+        "coordinates": [f"${field}.longitude", f"${field}.latitude"]
+    }
+
+
+async def migrate():
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    database = client[settings.MONGODB_DB_NAME]
+
+    try:
+        reports = await database.pothole_reports.update_many(
+            {"geo": {"$exists": False}, "location": {"$exists": True}},
+            [{"$set": {"geo": point_from("location")}}]
+        )
+        print(f"✅ Reports backfilled: {reports.modified_count}")
+
+        zones = await database.risk_zones.update_many(
+            {"center_geo": {"$exists": False}, "center_location": {"$exists": True}},
+            [{"$set": {"center_geo": point_from("center_location")}}]
+        )
+        print(f"✅ Zones backfilled: {zones.modified_count}")
+
+        await database.pothole_reports.create_index([("geo", "2dsphere")])
+        await database.risk_zones.create_index([("center_geo", "2dsphere")])
+        print("✅ 2dsphere indexes created")
+
+        try:
+            await database.pothole_reports.drop_index(LEGACY_REPORT_INDEX)
+            print(f"✅ Dropped legacy index {LEGACY_REPORT_INDEX}")
+        except OperationFailure:
+            pass
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
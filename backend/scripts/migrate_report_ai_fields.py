@@ -0,0 +1,71 @@
+"""
+Backfill ai_confidence and ai_verified onto every pothole report
+Usage (from backend directory): python scripts/migrate_report_ai_fields.py
+
+Older reports only have their AI result in image_verification. This copies
+it onto the report with a single server-side $merge, so report reads no
+longer need a $lookup. Reports without a verification record get explicit
+nulls. Safe to run repeatedly.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services.version_service import collection_versions  # noqa: E402
+
+MISSING_AI_FIELDS = {"$or": [
+    {"ai_confidence": {"$exists": False}},
+    {"ai_verified": {"$exists": False}}
+]}
+
+
+async def migrate():
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    database = client[settings.MONGODB_DB_NAME]
+
+    try:
+        missing = await database.pothole_reports.count_documents(MISSING_AI_FIELDS)
+        print(f"🔍 Reports missing AI fields: {missing}")
+
+        if missing:
+            pipeline = [
+                {"$match": MISSING_AI_FIELDS},
+                {"$lookup": {
+                    "from": "image_verification",
+                    "localField": "_id",
+                    "foreignField": "report_id",
+                    "as": "verification_data"
+                }},
+                {"$project": {
+                    "ai_confidence": {"$ifNull": [
+                        "$ai_confidence",
+                        {"$ifNull": [{"$arrayElemAt": ["$verification_data.confidence_score", 0]}, None]}
+                    ]},
+                    "ai_verified": {"$ifNull": [
+                        "$ai_verified",
+                        {"$ifNull": [{"$arrayElemAt": ["$verification_data.is_pothole", 0]}, None]}
+                    ]}
+                }},
+                {"$merge": {
+                    "into": "pothole_reports",
+                    "on": "_id",
+                    "whenMatched": "merge",
+                    "whenNotMatched": "discard"
+                }}
+            ]
+            await database.pothole_reports.aggregate(pipeline).to_list(length=None)
+            # Invalidate report ETags held by clients
+            await collection_versions.bump(database, "pothole_reports")
+
+        remaining = await database.pothole_reports.count_documents(MISSING_AI_FIELDS)
+        print(f"✅ Reports backfilled: {missing - remaining} (remaining: {remaining})")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
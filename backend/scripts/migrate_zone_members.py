@@ -0,0 +1,79 @@
+"""
+Move embedded zone report_ids into the zone_members collection
+Usage (from backend directory): python scripts/migrate_zone_members.py
+
+Writes one zone_members document per report ({_id: report ID, zone_id,
+report_date}), adds first/last report dates to each zone and removes
+report_ids from zone documents. Safe to run repeatedly; running a zone
+recalculation instead has the same effect.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services.version_service import collection_versions  # noqa: E402
+
+
+async def migrate():
+    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    database = client[settings.MONGODB_DB_NAME]
+
+    try:
+        embedded = await database.risk_zones.count_documents({"report_ids": {"$exists": True}})
+        print(f"🔍 Zones with embedded report_ids: {embedded}")
+
+        if embedded:
+            # Older zone documents may hold report IDs as strings
+            await database.risk_zones.aggregate([
+                {"$match": {"report_ids.0": {"$exists": True}}},
+                {"$unwind": "$report_ids"},
+                {"$project": {
+                    "_id": 0,
+                    "zone_id": "$_id",
+                    "report_id": {"$convert": {"input": "$report_ids", "to": "objectId", "onError": "$report_ids"}}
+                }},
+                {"$lookup": {
+                    "from": "pothole_reports",
+                    "localField": "report_id",
+                    "foreignField": "_id",
+                    "as": "report"
+                }},
+                {"$project": {
+                    "_id": "$report_id",
+                    "zone_id": 1,
+                    "report_date": {"$arrayElemAt": ["$report.report_date", 0]}
+                }},
+                {"$merge": {"into": "zone_members", "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+            ]).to_list(length=None)
+
+            # Summary dates on the zones themselves
+            await database.zone_members.aggregate([
+                {"$group": {
+                    "_id": "$zone_id",
+                    "first_report_date": {"$min": "$report_date"},
+                    "last_report_date": {"$max": "$report_date"}
+                }},
+                {"$merge": {"into": "risk_zones", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}}
+            ]).to_list(length=None)
+
+            result = await database.risk_zones.update_many(
+                {"report_ids": {"$exists": True}},
+                {"$unset": {"report_ids": ""}}
+            )
+            print(f"✅ Zones migrated: {result.modified_count}")
+
+            # Drop cached zone listings in running workers
+            await collection_versions.bump(database, "risk_zones")
+
+        await database.zone_members.create_index([("zone_id", 1), ("report_date", -1), ("_id", -1)])
+        print(f"✅ Zone memberships: {await database.zone_members.count_documents({})}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,7 @@
+"""
+Shared test setup; these tests need neither MongoDB nor a running server
+"""
+import os
+
+# Settings are loaded at import time and require a signing key
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
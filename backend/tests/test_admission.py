@@ -0,0 +1,148 @@
+"""
+Report admission: slots, pixel budget and the FIFO wait queue
+"""
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.config import settings
+from app.services.admission_service import AdmissionController
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(settings, "REPORT_MAX_QUEUED", 2)
+    monkeypatch.setattr(settings, "REPORT_QUEUE_TIMEOUT_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "REPORT_PIXEL_BUDGET_MEGAPIXELS", 10.0)
+    monkeypatch.setattr(settings, "REPORT_RATE_PER_MINUTE", 60)
+    monkeypatch.setattr(settings, "REPORT_RATE_BURST", 2)
+
+
+async def _hold(controller, pixels, order, name, release):
+    async with controller.admit(pixels):
+        order.append(name)
+        await release.wait()
+
+
+def test_waiters_are_admitted_in_order(limits):
+    async def scenario():
+        controller = AdmissionController()
+        order = []
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(_hold(controller, 1_000_000, order, name, release))
+            for name in ("a", "b", "c")
+        ]
+        await asyncio.sleep(0)
+        assert order == ["a"]
+        assert len(controller._waiters) == 2
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "c"]
+        assert controller._active == 0 and controller._pixels == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_sheds_with_retry_after(limits):
+    async def scenario():
+        controller = AdmissionController()
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(_hold(controller, 1_000_000, [], name, release))
+            for name in ("a", "b", "c")
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as error:
+            async with controller.admit(1_000_000):
+                pass
+        assert error.value.status_code == 503
+        assert int(error.value.headers["Retry-After"]) >= 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+
+def test_image_over_budget_is_413(limits):
+    async def scenario():
+        controller = AdmissionController()
+        with pytest.raises(HTTPException) as error:
+            async with controller.admit(11_000_000):
+                pass
+        assert error.value.status_code == 413
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_sheds(limits, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_QUEUE_TIMEOUT_SECONDS", 0.01)
+
+    async def scenario():
+        controller = AdmissionController()
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, 1_000_000, [], "a", release))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as error:
+            async with controller.admit(1_000_000):
+                pass
+        assert error.value.status_code == 503
+        assert not controller._waiters
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_head_admits_smaller_waiter(limits, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_MAX_CONCURRENT", 4)
+
+    async def scenario():
+        controller = AdmissionController()
+        order = []
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, 6_000_000, order, "holder", release))
+        await asyncio.sleep(0)
+        # The large head does not fit; the small one behind it waits for FIFO order
+        large = asyncio.create_task(_hold(controller, 8_000_000, order, "large", release))
+        small = asyncio.create_task(_hold(controller, 1_000_000, order, "small", release))
+        await asyncio.sleep(0)
+        assert order == ["holder"]
+
+        large.cancel()
+        await asyncio.sleep(0.01)
+        assert order == ["holder", "small"]
+
+        release.set()
+        await asyncio.gather(holder, small)
+        assert controller._active == 0 and controller._pixels == 0
+
+    asyncio.run(scenario())
+
+
+def test_rate_limit_is_429_after_burst(limits):
+    controller = AdmissionController()
+    controller.check_rate("user")
+    controller.check_rate("user")
+    with pytest.raises(HTTPException) as error:
+        controller.check_rate("user")
+    assert error.value.status_code == 429
+    assert "Retry-After" in error.value.headers
+    # Other users have their own bucket
+    controller.check_rate("other")
+
+
+def test_rejected_submission_keeps_rate_token(limits, monkeypatch):
+    monkeypatch.setattr(settings, "REPORT_RATE_BURST", 1)
+
+    async def scenario():
+        controller = AdmissionController()
+        controller.check_rate("user")
+        with pytest.raises(HTTPException) as error:
+            async with controller.admit(11_000_000, "user"):
+                pass
+        assert error.value.status_code == 413
+        # The rejected image did not use up the user's only token
+        controller.check_rate("user")
+
+    asyncio.run(scenario())
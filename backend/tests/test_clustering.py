@@ -0,0 +1,61 @@
+"""
+Parallel clustering must produce exactly the serial clusters
+"""
+import random
+from app.config import settings
+from app.services.clustering_service import ClusteringService
+from app.utils.geo import cluster_points, cluster_points_parallel
+
+
+def _points(count: int, seed: int):
+    rng = random.Random(seed)
+    # Dense groups around a few centers plus scattered noise
+    centers = [(rng.uniform(-60, 60), rng.uniform(-170, 170)) for _ in range(8)]
+    points = []
+    for index in range(count):
+        if index % 5 == 0:
+            points.append((rng.uniform(-80, 80), rng.uniform(-180, 180)))
+        else:
+            lat, lon = rng.choice(centers)
+            points.append((lat + rng.gauss(0, 0.01), lon + rng.gauss(0, 0.01)))
+    return points
+
+
+def test_parallel_matches_serial():
+    points = _points(2000, seed=1)
+    expected = cluster_points(points, 0.05)
+    for tile_km in (0.2, 1.0, 20.0):
+        assert cluster_points_parallel(points, 0.05, workers=1, tile_km=tile_km) == expected
+
+
+def test_parallel_matches_serial_with_processes():
+    points = _points(600, seed=2)
+    assert cluster_points_parallel(points, 0.05, workers=2, tile_km=0.5) == cluster_points(points, 0.05)
+
+
+def test_clusters_chain_across_tile_borders():
+    # A line of points 40 m apart crossing many tiles is one cluster
+    points = [(10.0, 20.0 + i * 0.00036) for i in range(300)]
+    assert cluster_points_parallel(points, 0.05, workers=1, tile_km=0.2) == [list(range(300))]
+
+
+def test_cluster_points_is_single_linkage():
+    points = [(0.0, 0.0), (0.0, 0.0004), (0.0, 0.0008), (1.0, 1.0)]
+    assert cluster_points(points, 0.05) == [[0, 1, 2], [3]]
+
+
+def test_cluster_reports_same_with_parallel_path(monkeypatch):
+    reports = [
+        {"_id": index, "location": {"latitude": lat, "longitude": lon}}
+        for index, (lat, lon) in enumerate(_points(400, seed=3))
+    ]
+    service = ClusteringService()
+
+    monkeypatch.setattr(settings, "CLUSTERING_WORKERS", 1)
+    serial = service.cluster_reports(reports)
+
+    monkeypatch.setattr(settings, "CLUSTERING_WORKERS", 2)
+    monkeypatch.setattr(ClusteringService, "PARALLEL_MIN_REPORTS", 0)
+    parallel = service.cluster_reports(reports)
+
+    assert [[r["_id"] for r in group] for group in parallel] == [[r["_id"] for r in group] for group in serial]
@@ -0,0 +1,49 @@
+"""
+Response compression keeps representations apart for caches
+"""
+import asyncio
+from starlette.responses import PlainTextResponse, Response
+from app.utils.compression import CompressionMiddleware
+
+
+def _request(response: Response, accept_encoding: str):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else [],
+    }
+    asyncio.run(CompressionMiddleware(response)(scope, receive, send))
+    return {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+
+
+def test_large_body_is_compressed():
+    headers = _request(PlainTextResponse("x" * 5000), "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+
+
+def test_small_body_still_varies():
+    headers = _request(PlainTextResponse("ok"), "gzip")
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+
+
+def test_identity_request_still_varies():
+    headers = _request(PlainTextResponse("x" * 5000), "")
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+
+
+def test_incompressible_type_does_not_vary():
+    headers = _request(Response(b"\xff" * 5000, media_type="image/jpeg"), "gzip")
+    assert "content-encoding" not in headers
+    assert "vary" not in headers
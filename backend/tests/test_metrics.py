@@ -0,0 +1,84 @@
+"""
+Worker metrics merge into one registry
+"""
+import json
+import os
+import subprocess
+import sys
+from app.utils.metrics import MetricsRegistry, SharedMetrics, merge
+
+
+def _registry(requests: float, latency: float, active: float) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(requests, route="/a")
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)).observe(latency)
+    registry.gauge("active", "Active").set(active)
+    return registry
+
+
+def test_merge_sums_counters_and_histograms():
+    dumps = {1: _registry(2, 0.05, 3).dump(), 2: _registry(5, 0.5, 7).dump()}
+    combined = merge(dumps, live=[1, 2])
+
+    assert combined.counter("requests_total", "").value(route="/a") == 7
+    series = dict(combined.histogram("latency_seconds", "").samples())[()]
+    assert series["count"] == 2
+    assert series["sum"] == 0.55
+    assert list(series["buckets"].values()) == [1, 2]
+
+
+def test_merge_labels_gauges_by_live_worker():
+    dumps = {1: _registry(1, 0.1, 3).dump(), 2: _registry(1, 0.1, 7).dump()}
+    combined = merge(dumps, live=[2])
+
+    gauge = combined.gauge("active", "")
+    assert gauge.samples() == [((("worker", "2"),), 7)]
+    # Counters of exited workers still count
+    assert combined.counter("requests_total", "").value(route="/a") == 2
+
+
+def test_shared_metrics_combines_other_workers(tmp_path):
+    other = _registry(4, 0.5, 1).dump()
+    (tmp_path / "1.json").write_text(json.dumps(other))
+
+    shared = SharedMetrics(_registry(1, 0.05, 2), str(tmp_path))
+    combined = shared.combined()
+
+    assert combined.counter("requests_total", "").value(route="/a") == 5
+    assert dict(combined.histogram("latency_seconds", "").samples())[()]["count"] == 2
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_exited_workers_are_retired(tmp_path):
+    dead = _dead_pid()
+    (tmp_path / f"{dead}.json").write_text(json.dumps(_registry(4, 0.5, 1).dump()))
+    shared = SharedMetrics(_registry(1, 0.05, 2), str(tmp_path))
+
+    for _ in range(2):
+        combined = shared.combined()
+        assert combined.counter("requests_total", "").value(route="/a") == 5
+        assert dict(combined.histogram("latency_seconds", "").samples())[()]["count"] == 2
+        # Gauges of the exited worker are gone with it
+        assert [dict(key)["worker"] for key, _ in combined.gauge("active", "").samples()] == [str(os.getpid())]
+
+    assert not (tmp_path / f"{dead}.json").exists()
+    assert (tmp_path / SharedMetrics.RETIRED_FILE).exists()
+
+
+def test_reused_pid_does_not_lose_counts(tmp_path):
+    # A previous worker with this PID left its dump behind
+    (tmp_path / f"{os.getpid()}.json").write_text(json.dumps(_registry(4, 0.5, 1).dump()))
+    combined = SharedMetrics(_registry(1, 0.05, 2), str(tmp_path)).combined()
+    assert combined.counter("requests_total", "").value(route="/a") == 5
+
+
+def test_reset_clears_dumps(tmp_path):
+    SharedMetrics(_registry(1, 0.1, 1), str(tmp_path)).write()
+    (tmp_path / "notes.txt").write_text("kept")
+    SharedMetrics.reset(str(tmp_path))
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.txt"]
@@ -0,0 +1,75 @@
+"""
+Continuation tokens round-trip and restrict queries to the next page
+"""
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_cursor, decode_cursor, encode_cursor, set_next_cursor
+
+
+def test_round_trip_object_id():
+    created = datetime(2024, 5, 1, 12, 30, 15, 123000)
+    doc_id = ObjectId()
+    assert decode_cursor(encode_cursor(created, doc_id)) == (created, doc_id)
+
+
+def test_round_trip_string_id():
+    created = datetime(2024, 5, 1)
+    sort_value, doc_id = decode_cursor(encode_cursor(created, "abc"))
+    assert (sort_value, doc_id) == (created, "abc")
+    assert isinstance(doc_id, str)
+
+
+def test_round_trip_missing_sort_value():
+    doc_id = ObjectId()
+    assert decode_cursor(encode_cursor(None, doc_id)) == (None, doc_id)
+
+
+def test_apply_cursor_after_null_sort_value():
+    doc_id = ObjectId()
+    query = apply_cursor({"zone_id": 1}, "report_date", encode_cursor(None, doc_id))
+    assert query == {"zone_id": 1, "report_date": None, "_id": {"$lt": doc_id}}
+
+
+def test_invalid_cursor_is_400():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor")
+    assert error.value.status_code == 400
+
+
+def test_apply_cursor_without_cursor_keeps_query():
+    query = {"status": "verified"}
+    assert apply_cursor(query, "created_at", None) is query
+
+
+def test_apply_cursor_restricts_to_rows_after():
+    created = datetime(2024, 5, 1)
+    doc_id = ObjectId()
+    query = apply_cursor({"status": "verified"}, "created_at", encode_cursor(created, doc_id))
+    assert query == {
+        "status": "verified",
+        "$or": [
+            {"created_at": {"$lt": created}},
+            {"created_at": None},
+            {"created_at": created, "_id": {"$lt": doc_id}}
+        ]
+    }
+
+
+def test_apply_cursor_keeps_existing_or():
+    base = {"$or": [{"a": 1}, {"b": 2}]}
+    query = apply_cursor(base, "created_at", encode_cursor(datetime(2024, 5, 1), ObjectId()))
+    assert query["$and"][0] == base
+
+
+def test_next_cursor_only_on_full_page():
+    rows = [{"_id": ObjectId(), "created_at": datetime(2024, 5, day)} for day in (3, 2)]
+
+    response = Response()
+    set_next_cursor(response, rows, 3, "created_at")
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+    response = Response()
+    set_next_cursor(response, rows, 2, "created_at")
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == (rows[-1]["created_at"], rows[-1]["_id"])
@@ -85,6 +85,69 @@ const ApiService = {
     getById: (id) => apiClient.get(`/zones/${id}`),
     getRiskZones: () => apiClient.get('/zones/risk-zones'),
   },
+
+  // Live change events (server-sent events)
+  events: {
+    /**
+     * Open a live stream of report/zone/repair changes
+     * handlers: { 'report.created': (data) => ..., 'reset': () => ... }
+     * Every connection uses a new single-use ticket, so reconnecting is
+     * done here rather than by EventSource. Returns { close() }.
+     */
+    subscribe: (params, handlers) => {
+      let source = null
+      let lastEventId = null
+      let retryTimer = null
+      let closed = false
+
+      const reconnect = () => {
+        if (!closed) {
+          retryTimer = setTimeout(connect, 3000)
+        }
+      }
+
+      const connect = async () => {
+        try {
+          const { data } = await apiClient.post('/events/ticket')
+          if (closed) {
+            return
+          }
+          const query = new URLSearchParams(params)
+          query.set('ticket', data.ticket)
+          if (lastEventId) {
+            query.set('last_event_id', lastEventId)
+          }
+          source = new EventSource(`${CONFIG.API_BASE_URL}${CONFIG.API_VERSION}/events?${query}`)
+          Object.entries(handlers).forEach(([type, handler]) => {
+            source.addEventListener(type, (event) => {
+              if (event.lastEventId) {
+                lastEventId = event.lastEventId
+              }
+              handler(event.data ? JSON.parse(event.data) : null)
+            })
+          })
+          // The ticket is spent, so EventSource cannot reconnect by itself
+          source.onerror = () => {
+            source.close()
+            reconnect()
+          }
+        } catch (error) {
+          reconnect()
+        }
+      }
+
+      connect()
+      return {
+        close: () => {
+          closed = true
+          clearTimeout(retryTimer)
+          if (source) {
+            source.close()
+          }
+        },
+      }
+    },
+  },
 }
 
 export default ApiService